@@ -0,0 +1,204 @@
+"""
+Mode batch: menjalankan pipeline deteksi pada seluruh citra dalam satu folder
+secara paralel menggunakan process pool, lalu mencetak vonis per citra.
+
+Dengan satu worker (`-j 1`) citra diproses di proses utama tanpa pool, dan
+decode citra berikutnya berjalan di thread latar (`loader.PrefetchLoader`)
+selagi pipeline memproses citra sekarang.
+"""
+import contextlib
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import batch_report
+import loader
+import pipeline
+import profiling
+import result_cache
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+# Cache hasil per proses worker (dibuat saat file pertama diproses)
+_worker_cache = None
+
+
+def list_images(directory):
+    """Daftar path citra di `directory` (tidak rekursif), terurut nama."""
+    names = sorted(os.listdir(directory))
+    return [os.path.join(directory, n) for n in names if n.lower().endswith(IMAGE_EXTENSIONS)]
+
+
+def process_file(path, cache_dir=None, collect_timings=False, decode_scale=1, use_mmap=False, report_dir=None,
+                 report_details="flagged", **detect_options):
+    """
+    Worker: baca satu file dan kembalikan `(path, ringkasan)`; ringkasan None jika gagal dimuat.
+
+    Dengan `cache_dir`, citra yang isinya tidak berubah sejak run sebelumnya
+    diambil dari cache disk tanpa menjalankan pipeline. Dengan
+    `collect_timings`, ringkasan berisi `"stages"` (baris `StageTimings.to_rows`).
+    `decode_scale` < 1 men-decode citra pada resolusi tereduksi (lihat
+    `loader.load_image`); koordinat di ringkasan mengikuti citra yang diperkecil.
+    Dengan `report_dir`, thumbnail dan halaman detail citra ditulis ke folder
+    laporan batch (lihat `batch_report.image_assets`) dan path-nya masuk ringkasan.
+    """
+    image = loader.load_image(path, decode_scale, use_mmap)
+    return process_image(path, image, cache_dir, collect_timings, decode_scale, report_dir, report_details,
+                         **detect_options)
+
+
+def process_image(path, image, cache_dir=None, collect_timings=False, decode_scale=1, report_dir=None,
+                  report_details="flagged", **detect_options):
+    """Seperti `process_file` untuk citra yang sudah di-decode (None = gagal dimuat)."""
+    global _worker_cache
+    if image is None:
+        return path, None
+    detect_options["config"] = loader.scaled_config(detect_options.get("config"), decode_scale)
+    workspace = pipeline.workspace_for(image.shape)
+    if collect_timings:
+        timings = profiling.StageTimings()
+    else:
+        # Laporan batch butuh waktu per tahap, tetapi tanpa overhead tracemalloc
+        timings = profiling.StageTimings(trace_memory=False) if report_dir is not None else None
+    if cache_dir is None:
+        result = pipeline.detect(image, keep_steps=False, workspace=workspace, timings=timings, **detect_options)
+    else:
+        if _worker_cache is None or _worker_cache.directory != cache_dir:
+            _worker_cache = result_cache.ResultCache(cache_dir)
+        result = _worker_cache.detect(image, keep_steps=False, workspace=workspace, timings=timings, **detect_options)
+    summary = result.summary()
+    if collect_timings:
+        summary["stages"] = timings.to_rows()
+    if report_dir is not None:
+        summary.update(batch_report.image_assets(report_dir, path, image, result, report_details, timings,
+                                                 decode_scale))
+    return path, summary
+
+
+def try_process_file(path, **options):
+    """
+    Seperti `process_file`, tetapi error dikembalikan, bukan dilempar:
+    `(path, ringkasan, pesan error)`. Dipakai run panjang (daemon, shard) agar
+    satu file rusak tidak menghentikan seluruh run.
+    """
+    try:
+        _, summary = process_file(path, **options)
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+    return path, summary, None if summary is not None else "Gagal memuat gambar."
+
+
+def format_line(path, summary):
+    if summary is None:
+        return f"{path}\tERROR\tGagal memuat gambar."
+    verdict = "SUNU" if summary["is_kerapu_sunu"] else "BUKAN"
+    return f"{path}\t{verdict}\t{summary['spot_percent']:.2f}%\t{summary['result_text']}"
+
+
+def run_batch(directory, workers=None, chunksize=1, timings_path=None, decode_scale=1, use_mmap=False,
+              prefetch=loader.PREFETCH_QUEUE_SIZE, report_dir=None, report_details="flagged", report_parquet=False,
+              **detect_options):
+    """
+    Proses semua citra di `directory` (atau satu file citra), cetak hasil per citra sesuai urutan nama file.
+
+    `detect_options` diteruskan ke `pipeline.detect` (mis. `color_lut=True`).
+    `timings_path` (.csv/.json) menyimpan waktu & memori per tahap setiap citra.
+    `decode_scale` dan `use_mmap` diteruskan ke `loader.load_image`; `prefetch`
+    adalah panjang antrian decode saat `workers == 1`. `report_dir` menulis
+    laporan batch agregat (`batch_report.BatchReport`) selama run berjalan.
+    """
+    paths = [directory] if os.path.isfile(directory) else list_images(directory)
+    if not paths:
+        print(f"Tidak ada citra di {directory}")
+        return 1
+    # Pool proses tidak berguna untuk satu citra: jalankan langsung (tanpa biaya spawn worker)
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+
+    n_sunu = n_error = 0
+    stage_rows = []
+    collect_timings = timings_path is not None
+    report_options = dict(report_dir=report_dir, report_details=report_details)
+    with contextlib.ExitStack() as stack:
+        aggregate = None
+        if report_dir is not None:
+            try:
+                aggregate = stack.enter_context(batch_report.BatchReport(
+                    report_dir, directory, report_details, report_parquet))
+            except ImportError as e:
+                print(e)
+                return 1
+        if workers == 1:
+            images = stack.enter_context(loader.PrefetchLoader(paths, decode_scale, use_mmap, queue_size=prefetch))
+            results = (process_image(path, image, collect_timings=collect_timings, decode_scale=decode_scale,
+                                     **report_options, **detect_options) for path, image in images)
+        else:
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+            worker = functools.partial(process_file, collect_timings=collect_timings, decode_scale=decode_scale,
+                                       use_mmap=use_mmap, **report_options, **detect_options)
+            results = pool.map(worker, paths, chunksize=chunksize)
+        for path, summary in results:
+            print(format_line(path, summary), flush=True)
+            if aggregate is not None:
+                aggregate.add(path, summary)
+            if summary is None:
+                n_error += 1
+                continue
+            if summary["is_kerapu_sunu"]:
+                n_sunu += 1
+            stage_rows.extend(dict(path=path, **row) for row in summary.get("stages", ()))
+
+    if timings_path is not None:
+        profiling.dump_rows(stage_rows, timings_path)
+    if report_dir is not None:
+        print(f"Laporan batch: {os.path.join(report_dir, 'index.html')}")
+
+    print(f"Selesai: {len(paths)} citra, {n_sunu} Kerapu Sunu, {n_error} gagal dimuat.")
+    return 0 if n_error == 0 else 2
+
+
+def add_detect_arguments(parser):
+    """Opsi `pipeline.detect` yang dipakai bersama oleh sub-perintah CLI (lihat `detect_options`)."""
+    parser.add_argument("--color-lut", action="store_true",
+                        help="Mask warna lewat tabel BGR 16 MB (tanpa citra HSV penuh)")
+    parser.add_argument("--pyramid-scale", type=float, default=1.0,
+                        help="Segmentasi tubuh ikan pada citra diperkecil (mis. 0.5); bintik tetap resolusi penuh")
+    parser.add_argument("--memory-budget", type=int, default=None, metavar="MB",
+                        help="Proses per strip agar memori per citra (termasuk frame input) kira-kira di bawah MB "
+                             "megabyte; minimal ~14 byte/piksel, mis. 560 MB untuk 40 MP")
+
+
+def detect_options(args):
+    """Argumen hasil `add_detect_arguments` -> kwargs untuk `pipeline.detect`."""
+    return dict(color_lut=args.color_lut, pyramid_scale=args.pyramid_scale,
+                memory_budget=args.memory_budget and args.memory_budget * 1024 * 1024)
+
+
+def add_arguments(parser):
+    parser.add_argument("directory", help="Folder berisi citra (*.png, *.jpg, *.jpeg) atau satu file citra")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="Jumlah proses worker (default: jumlah CPU)")
+    parser.add_argument("--chunksize", type=int, default=1,
+                        help="Jumlah citra per tugas yang dikirim ke worker")
+    add_detect_arguments(parser)
+    parser.add_argument("--cache-dir", nargs="?", const=result_cache.DEFAULT_CACHE_DIR, default=None,
+                        help=f"Pakai cache hasil di folder ini (tanpa nilai: {result_cache.DEFAULT_CACHE_DIR})")
+    parser.add_argument("--timings", metavar="FILE",
+                        help="Simpan waktu & memori per tahap tiap citra ke FILE (.csv atau .json)")
+    parser.add_argument("--decode-scale", type=float, default=1.0,
+                        help="Decode citra pada skala ini (mis. 0.5, 0.25) memakai IMREAD_REDUCED_COLOR_*")
+    parser.add_argument("--mmap", action="store_true", help="Baca file lewat memory-map lalu decode dari buffer")
+    parser.add_argument("--prefetch", type=int, default=loader.PREFETCH_QUEUE_SIZE,
+                        help="Jumlah citra yang di-decode di depan pipeline saat -j 1 (default: %(default)s)")
+    parser.add_argument("--report", metavar="FOLDER",
+                        help="Tulis laporan batch (index.html, ringkasan.csv, thumbnail) ke FOLDER")
+    parser.add_argument("--report-details", choices=batch_report.DETAIL_MODES, default="flagged",
+                        help="Citra yang mendapat halaman detail 9 langkah (default: Sunu dan gagal dimuat)")
+    parser.add_argument("--parquet", action="store_true",
+                        help="Ekspor juga ringkasan.parquet ke folder laporan (butuh pyarrow)")
+
+
+def main(args):
+    return run_batch(args.directory, workers=args.workers, chunksize=args.chunksize,
+                     cache_dir=args.cache_dir, timings_path=args.timings, decode_scale=args.decode_scale,
+                     use_mmap=args.mmap, prefetch=args.prefetch, report_dir=args.report,
+                     report_details=args.report_details, report_parquet=args.parquet, **detect_options(args))
@@ -0,0 +1,340 @@
+"""
+Laporan agregat mode batch: satu laporan HTML untuk seluruh citra satu run.
+
+    python detect_sunu.py batch dataset/ --report laporan_batch/
+
+Isi folder laporan:
+
+    index.html          tabel ringkasan (bisa diurutkan per kolom) + thumbnail
+    ringkasan.csv       baris yang sama dengan tabel (juga .parquet bila diminta)
+    thumbs/             thumbnail input dan hasil deteksi (di-cache antar run)
+    detail/             laporan 9 langkah, hanya untuk citra yang ditandai/gagal
+
+Bagian yang butuh piksel (thumbnail, halaman detail) dikerjakan di worker
+yang memegang citra, sehingga hanya ringkasan kecil yang kembali ke proses
+utama. Proses utama menulis satu baris HTML/CSV per citra begitu hasilnya
+datang, jadi memori tidak bertambah seiring jumlah citra. Citra langkah
+untuk halaman detail diambil dari `LazySteps` dan baru dirender untuk citra
+yang memang mendapat halaman detail.
+"""
+import csv
+import hashlib
+import html
+import os
+from urllib.parse import quote
+
+import cv2
+
+import pipeline
+import report
+
+THUMB_SIDE = 160
+THUMB_OPTIONS = report.ReportImageOptions(max_side=THUMB_SIDE, quality=80)
+# Citra yang mendapat halaman detail: "flagged" = vonis Sunu atau gagal dimuat
+DETAIL_MODES = ("flagged", "all", "none")
+PARQUET_ROW_GROUP = 1024
+
+# Nama tahap `pipeline.detect`/`result_cache` (keep_steps=False) yang menjadi kolom waktu; tahap lain -> "lainnya"
+STAGE_COLUMNS = ("Blur + threshold adaptif", "Komponen terbesar (CCL)", "Fill holes (flood fill)",
+                 "Mask warna HSV", "AND mask + close", "Kontur", "Analisis bentuk kontur", "CCL bintik",
+                 "Cache hit", "lainnya")
+FIELDS = ("file", "vonis", "spot_percent", "fish_area", "total_spot_area", "num_fish", "total_ms",
+          *(f"ms_{name}" for name in STAGE_COLUMNS), "thumb_input", "thumb_deteksi", "detail")
+
+_DETECTION_COLOR = (0, 255, 0)
+_OTHER_FISH_COLOR = (0, 200, 255)
+
+
+def stage_milliseconds(timings):
+    """`{kolom tahap: ms}` dari `profiling.StageTimings` (tahap berulang dijumlahkan)."""
+    totals = dict.fromkeys(STAGE_COLUMNS, 0.0)
+    for name, (_, seconds, _) in timings.totals().items():
+        totals[name if name in totals else "lainnya"] += seconds * 1000
+    return totals
+
+
+def _file_key(path, decode_scale):
+    """Kunci cache thumbnail: berubah bila isi file (ukuran/mtime) atau skala decode berubah."""
+    st = os.stat(path)
+    text = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}|{decode_scale}"
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:20]
+
+
+def _write_file(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)  # worker lain yang menulis thumbnail yang sama tidak melihat file setengah jadi
+
+
+def detection_thumbnail(thumb, fishes, scale):
+    """Gambar bbox ikan (hijau = Sunu, oranye = bukan) di atas thumbnail input yang diperkecil `scale`."""
+    thumb = thumb.copy()
+    for fish in fishes:
+        x, y, w, h = (round(v * scale) for v in fish.bbox)
+        color = _DETECTION_COLOR if fish.is_kerapu_sunu else _OTHER_FISH_COLOR
+        cv2.rectangle(thumb, (x, y), (x + max(w, 1), y + max(h, 1)), color, 2 if fish.is_kerapu_sunu else 1)
+    return thumb
+
+
+def write_thumbnails(report_dir, path, image, result, decode_scale=1):
+    """
+    Simpan thumbnail input dan hasil deteksi di `report_dir/thumbs/`; kembalikan path relatif keduanya.
+
+    Thumbnail input di-cache berdasarkan path, ukuran dan mtime file, jadi run
+    ulang pada folder yang sama tidak memperkecil citra resolusi penuh lagi.
+    """
+    thumbs_dir = os.path.join(report_dir, "thumbs")
+    key = _file_key(path, decode_scale)
+    input_name = f"{key}.jpg"
+    input_path = os.path.join(thumbs_dir, input_name)
+    thumb = cv2.imread(input_path) if os.path.exists(input_path) else None
+    if thumb is None:
+        thumb = report.display_image(image, THUMB_SIDE)
+        _write_file(input_path, report.encode_image(thumb, THUMB_OPTIONS)[0])
+
+    boxes = ";".join(f"{fish.bbox}{fish.is_kerapu_sunu}" for fish in result.fishes)
+    detection_name = f"{key}_{hashlib.sha1(boxes.encode('utf-8')).hexdigest()[:8]}.jpg"
+    detection_path = os.path.join(thumbs_dir, detection_name)
+    if not os.path.exists(detection_path):
+        scale = thumb.shape[1] / image.shape[1]
+        _write_file(detection_path, report.encode_image(detection_thumbnail(thumb, result.fishes, scale),
+                                                        THUMB_OPTIONS)[0])
+    return f"thumbs/{input_name}", f"thumbs/{detection_name}"
+
+
+def detail_name(path):
+    """Nama halaman detail untuk citra `path` (ekstensi ikut agar `a.png` dan `a.jpg` tidak bentrok)."""
+    stem, ext = os.path.splitext(os.path.basename(path))
+    return f"{stem}{ext.replace('.', '_')}.html"
+
+
+def wants_detail(mode, is_kerapu_sunu=None):
+    """Apakah citra mendapat halaman detail; `is_kerapu_sunu=None` berarti gagal dimuat."""
+    if mode == "all":
+        return True
+    if mode == "flagged":
+        return is_kerapu_sunu is None or is_kerapu_sunu
+    return False
+
+
+def write_detail(report_dir, path, result, timings=None):
+    """Laporan 9 langkah untuk satu citra di `report_dir/detail/` (citra langkah sebagai file terpisah)."""
+    name = detail_name(path)
+    steps = [result.steps[title] for title in pipeline.STEP_TITLES]  # LazySteps: dirender di sini
+    report.write_report(os.path.join(report_dir, "detail", name), steps, result.result_text, result.spot_percent,
+                        result.config, timings, assets="files")
+    return f"detail/{name}"
+
+
+def write_failed_detail(report_dir, path, message="Gagal memuat gambar."):
+    name = detail_name(path)
+    with open(os.path.join(report_dir, "detail", name), "w", encoding="utf-8") as f:
+        f.write(f"<!DOCTYPE html>\n<html lang=\"id\"><head><meta charset=\"UTF-8\">"
+                f"<title>{html.escape(os.path.basename(path))}</title></head><body>"
+                f"<h1>{html.escape(path)}</h1><p><strong>ERROR:</strong> {html.escape(message)}</p>"
+                f"<p><a href=\"../index.html\">Kembali ke ringkasan</a></p></body></html>\n")
+    return f"detail/{name}"
+
+
+def prepare_dir(report_dir):
+    for sub in ("thumbs", "detail"):
+        os.makedirs(os.path.join(report_dir, sub), exist_ok=True)
+
+
+def image_assets(report_dir, path, image, result, details="flagged", timings=None, decode_scale=1):
+    """Dipanggil worker: thumbnail + (bila perlu) halaman detail; hasilnya digabung ke ringkasan citra."""
+    thumb_input, thumb_detection = write_thumbnails(report_dir, path, image, result, decode_scale)
+    assets = {"thumb_input": thumb_input, "thumb_deteksi": thumb_detection, "detail": ""}
+    if wants_detail(details, result.is_kerapu_sunu):
+        assets["detail"] = write_detail(report_dir, path, result, timings)
+    if timings is not None:
+        assets["stage_ms"] = stage_milliseconds(timings)
+    return assets
+
+
+def summary_row(path, summary):
+    """Satu baris tabel/CSV dari ringkasan `batch.process_image` (None = gagal dimuat)."""
+    if summary is None:
+        return dict(dict.fromkeys(FIELDS, ""), file=path, vonis="ERROR")
+    stage_ms = summary.get("stage_ms", {})
+    row = {
+        "file": path,
+        "vonis": "SUNU" if summary["is_kerapu_sunu"] else "BUKAN",
+        "spot_percent": round(summary["spot_percent"], 4),
+        "fish_area": summary["fish_area"],
+        "total_spot_area": summary["total_spot_area"],
+        "num_fish": summary["num_fish"],
+        "total_ms": round(sum(stage_ms.values()), 3),
+    }
+    row.update((f"ms_{name}", round(stage_ms.get(name, 0.0), 3)) for name in STAGE_COLUMNS)
+    row.update(thumb_input=summary.get("thumb_input", ""), thumb_deteksi=summary.get("thumb_deteksi", ""),
+               detail=summary.get("detail", ""))
+    return row
+
+
+class _ParquetSink:
+    """Penulis Parquet bertahap (satu row group per `PARQUET_ROW_GROUP` baris); butuh `pyarrow`."""
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Ekspor Parquet membutuhkan pyarrow (pip install pyarrow)") from e
+        self._pa = pa
+        types = {"file": pa.string(), "vonis": pa.string(), "num_fish": pa.int64(), "total_spot_area": pa.int64(),
+                 "thumb_input": pa.string(), "thumb_deteksi": pa.string(), "detail": pa.string()}
+        self._schema = pa.schema([(name, types.get(name, pa.float64())) for name in FIELDS])
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._rows = []
+
+    def add(self, row):
+        # Baris ERROR berisi "" untuk kolom angka; di Parquet menjadi null
+        self._rows.append({k: (None if v == "" and self._schema.field(k).type != self._pa.string() else v)
+                           for k, v in row.items()})
+        if len(self._rows) >= PARQUET_ROW_GROUP:
+            self.flush()
+
+    def flush(self):
+        if self._rows:
+            self._writer.write_table(self._pa.Table.from_pylist(self._rows, schema=self._schema))
+            self._rows = []
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+
+_STYLE = """
+        body { font-family: Arial, sans-serif; margin: 20px; background-color: #f4f7f6; color: #333; }
+        h1 { color: #004d40; border-bottom: 3px solid #004d40; padding-bottom: 8px; }
+        table { border-collapse: collapse; background: #fff; font-size: 12px; }
+        th, td { border: 1px solid #ddd; padding: 4px 6px; text-align: right; vertical-align: middle; }
+        th { background: #00796b; color: #fff; cursor: pointer; position: sticky; top: 0; white-space: nowrap; }
+        td.file { text-align: left; }
+        tr.sunu td { background: #e8f5e9; }
+        tr.error td { background: #ffebee; }
+        img { display: block; max-width: 160px; max-height: 120px; }
+        .totals { margin: 12px 0; padding: 10px; background: #e0f2f1; border-left: 5px solid #00796b; }
+"""
+
+# Klik judul kolom untuk mengurutkan; angka diurutkan lewat atribut data-v
+_SORT_SCRIPT = """
+    <script>
+    document.querySelectorAll("th").forEach(function (th, col) {
+        th.addEventListener("click", function () {
+            var body = th.closest("table").tBodies[0];
+            var asc = th.dataset.asc !== "1";
+            th.dataset.asc = asc ? "1" : "0";
+            var key = function (tr) {
+                var td = tr.cells[col], v = td.dataset.v;
+                return v === undefined ? td.textContent : (v === "" ? -Infinity : parseFloat(v));
+            };
+            var rows = Array.prototype.slice.call(body.rows);
+            rows.sort(function (a, b) {
+                var x = key(a), y = key(b);
+                return (x < y ? -1 : x > y ? 1 : 0) * (asc ? 1 : -1);
+            });
+            rows.forEach(function (tr) { body.appendChild(tr); });
+        });
+    });
+    </script>
+"""
+
+
+class BatchReport:
+    """
+    Penulis laporan batch; `add(path, ringkasan)` menulis satu baris HTML dan
+    CSV (serta Parquet bila `parquet=True`) langsung ke disk.
+    """
+
+    def __init__(self, report_dir, source="", details="flagged", parquet=False):
+        if details not in DETAIL_MODES:
+            raise ValueError(f"details harus salah satu dari {DETAIL_MODES}, bukan {details!r}")
+        prepare_dir(report_dir)
+        self.report_dir = report_dir
+        self.details = details
+        self.counts = {"total": 0, "sunu": 0, "error": 0}
+        self.total_ms = 0.0
+        self._parquet = _ParquetSink(os.path.join(report_dir, "ringkasan.parquet")) if parquet else None
+        self._csv_file = open(os.path.join(report_dir, "ringkasan.csv"), "w", newline="", encoding="utf-8")
+        self._csv = csv.DictWriter(self._csv_file, fieldnames=FIELDS)
+        self._csv.writeheader()
+        self._html = open(os.path.join(report_dir, "index.html"), "w", encoding="utf-8")
+        self._html.write(self._head_html(source))
+
+    @staticmethod
+    def _head_html(source):
+        headers = ["#", "Input", "Deteksi", "File", "Vonis", "Bintik (%)", "Luas ikan (px)", "Ikan", "Total (ms)",
+                   *(f"{name} (ms)" for name in STAGE_COLUMNS)]
+        return f"""<!DOCTYPE html>
+<html lang="id">
+<head>
+    <meta charset="UTF-8">
+    <title>Laporan Batch Deteksi Kerapu Sunu</title>
+    <style>{_STYLE}    </style>
+</head>
+<body>
+    <h1>Laporan Batch Deteksi Kerapu Sunu</h1>
+    <p><strong>Sumber:</strong> {html.escape(source)} &nbsp; <a href="ringkasan.csv">ringkasan.csv</a></p>
+    <table>
+        <thead><tr>{"".join(f"<th>{html.escape(h)}</th>" for h in headers)}</tr></thead>
+        <tbody>
+"""
+
+    def add(self, path, summary):
+        row = summary_row(path, summary)
+        if summary is None and wants_detail(self.details):
+            row["detail"] = write_failed_detail(self.report_dir, path)
+        self.counts["total"] += 1
+        if summary is None:
+            self.counts["error"] += 1
+        elif summary["is_kerapu_sunu"]:
+            self.counts["sunu"] += 1
+        self.total_ms += row["total_ms"] or 0.0
+
+        self._csv.writerow(row)
+        if self._parquet is not None:
+            self._parquet.add(row)
+        self._html.write(self._row_html(self.counts["total"], row))
+
+    @staticmethod
+    def _row_html(index, row):
+        css = {"SUNU": "sunu", "ERROR": "error"}.get(row["vonis"], "")
+
+        def image(src):
+            return f'<img src="{quote(src)}" loading="lazy" alt="">' if src else ""
+
+        name = html.escape(os.path.basename(row["file"]))
+        if row["detail"]:
+            name = f'<a href="{quote(row["detail"])}">{name}</a>'
+        numbers = [row["spot_percent"], row["fish_area"], row["num_fish"], row["total_ms"],
+                   *(row[f"ms_{n}"] for n in STAGE_COLUMNS)]
+        formats = ["{:.2f}", "{:.0f}", "{}", "{:.1f}", *["{:.1f}"] * len(STAGE_COLUMNS)]
+        cells = "".join(f'<td data-v="{v}">{fmt.format(v) if v != "" else ""}</td>' for v, fmt in zip(numbers, formats))
+        return (f'        <tr class="{css}"><td data-v="{index}">{index}</td><td>{image(row["thumb_input"])}</td>'
+                f'<td>{image(row["thumb_deteksi"])}</td><td class="file" title="{html.escape(row["file"])}">{name}</td>'
+                f'<td>{row["vonis"]}</td>{cells}</tr>\n')
+
+    def close(self):
+        counts = self.counts
+        self._html.write(f"""        </tbody>
+    </table>
+    <div class="totals">
+        <strong>Total:</strong> {counts["total"]} citra, {counts["sunu"]} Kerapu Sunu, {counts["error"]} gagal dimuat.
+        Waktu pipeline: {self.total_ms / 1000:.1f} detik.
+    </div>
+{_SORT_SCRIPT}</body>
+</html>
+""")
+        self._html.close()
+        self._csv_file.close()
+        if self._parquet is not None:
+            self._parquet.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,259 @@
+"""
+Benchmark pipeline deteksi yang bisa diulang dan dibandingkan antar-run.
+
+Kelompok citra yang diukur:
+
+    dataset   semua citra di folder dataset (ukuran asli)
+    <N>MP     satu citra sumber yang diperbesar ke N megapiksel (default 1, 12, 50)
+
+Untuk tiap kelompok dicatat persentil latensi end-to-end dan per tahap
+(`profiling.StageTimings`) serta RSS puncak. Setiap kelompok diukur di proses
+baru (spawn) agar RSS puncaknya tidak tercampur. Throughput (citra/detik,
+termasuk decode) diukur untuk 1..N proses worker seperti mode batch.
+
+Cold start (proses Python baru sampai selesai) diukur untuk
+`detect_sunu.py --help` dan deteksi satu citra lewat CLI, lalu dibandingkan
+dengan `COLD_START_TARGETS`.
+
+Hasil disimpan sebagai JSON; `--compare LAMA.json` menandai regresi yang
+melebihi `--threshold` persen dan keluar dengan kode 1.
+"""
+import functools
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+import batch
+import pipeline
+import profiling
+
+DEFAULT_SIZES_MP = (1, 12, 50)
+PERCENTILES = (50, 90, 99)
+DEFAULT_THRESHOLD_PERCENT = 10.0
+# Target cold start (detik, median) di mesin pengembangan 1 core; --help tidak boleh mengimpor OpenCV/Qt
+COLD_START_TARGETS = {"help": 0.1, "detect_single": 0.35}
+CLI_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "detect_sunu.py")
+
+
+def percentile_summary(samples):
+    """Statistik latensi (detik) dari daftar sampel."""
+    values = np.asarray(samples, dtype=np.float64)
+    summary = {f"p{p}": float(np.percentile(values, p)) for p in PERCENTILES}
+    summary.update(mean=float(values.mean()), min=float(values.min()), n=int(values.size))
+    return summary
+
+
+def synthetic_image(source_path, megapixels):
+    """Citra sumber diperbesar (INTER_LINEAR, rasio aspek tetap) hingga kira-kira `megapixels` MP."""
+    image = cv2.imread(source_path)
+    if image is None:
+        raise ValueError(f"Gagal memuat {source_path}")
+    h, w = image.shape[:2]
+    scale = (megapixels * 1e6 / (h * w)) ** 0.5
+    return cv2.resize(image, (int(round(w * scale)), int(round(h * scale))), interpolation=cv2.INTER_LINEAR)
+
+
+def peak_rss_mb():
+    # ru_maxrss dalam KB di Linux, byte di macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == "darwin" else rss / 1024
+
+
+def measure_latency(images, repeat, detect_options):
+    """Latensi `detect` (citra sudah di-decode) per citra, diulang `repeat` kali setelah satu pemanasan."""
+    end_to_end = []
+    stages = {}
+    for image in images:
+        workspace = pipeline.workspace_for(image.shape)
+        pipeline.detect(image, keep_steps=False, workspace=workspace, **detect_options)  # pemanasan
+        for _ in range(repeat):
+            timings = profiling.StageTimings(trace_memory=False)
+            start = time.perf_counter()
+            pipeline.detect(image, keep_steps=False, workspace=workspace, timings=timings, **detect_options)
+            end_to_end.append(time.perf_counter() - start)
+            for name, (_, seconds, _) in timings.totals().items():
+                stages.setdefault(name, []).append(seconds)
+    return {
+        "end_to_end": percentile_summary(end_to_end),
+        "stages": {name: percentile_summary(samples) for name, samples in stages.items()},
+    }
+
+
+def _run_group(group, paths, source, repeat, detect_options):
+    """Dijalankan di proses baru: muat/buat citra kelompok, ukur latensi dan RSS puncak."""
+    if group == "dataset":
+        images = [image for image in map(cv2.imread, paths) if image is not None]
+    else:
+        images = [synthetic_image(source, float(group[:-2]))]
+    shape = list(images[0].shape)
+    result = measure_latency(images, repeat, detect_options)
+    result.update(images=len(images), shape=shape, peak_rss_mb=peak_rss_mb())
+    return result
+
+
+def measure_throughput(paths, workers, rounds, detect_options):
+    """Citra/detik (termasuk decode) dengan `workers` proses, memproses `paths` sebanyak `rounds` kali."""
+    jobs = list(paths) * rounds
+    worker = functools.partial(batch.process_file, **detect_options)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(worker, paths))  # pemanasan: import dan workspace di setiap proses
+        start = time.perf_counter()
+        list(pool.map(worker, jobs))
+        elapsed = time.perf_counter() - start
+    return len(jobs) / elapsed
+
+
+def measure_cold_start(image_path, repeat=5):
+    """Median/min waktu dinding proses baru untuk `--help` dan deteksi satu citra (`batch FILE`)."""
+    commands = {
+        "help": [sys.executable, CLI_SCRIPT, "--help"],
+        "detect_single": [sys.executable, CLI_SCRIPT, "batch", image_path],
+    }
+    results = {}
+    for name, command in commands.items():
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+            samples.append(time.perf_counter() - start)
+        summary = percentile_summary(samples)
+        summary["target"] = COLD_START_TARGETS[name]
+        results[name] = summary
+    return results
+
+
+def run_benchmark(directory, sizes_mp=DEFAULT_SIZES_MP, source=None, repeat=3, max_workers=None,
+                  rounds=3, detect_options=None, log=print):
+    """Jalankan seluruh benchmark dan kembalikan dict hasil (siap disimpan sebagai JSON)."""
+    detect_options = detect_options or {}
+    paths = batch.list_images(directory)
+    if not paths:
+        raise ValueError(f"Tidak ada citra di {directory}")
+    if source is None:
+        source = next((p for p in paths if os.path.basename(p).lower().startswith("sunu")), paths[0])
+    max_workers = max_workers or os.cpu_count() or 1
+
+    results = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "directory": directory,
+            "source": source,
+            "repeat": repeat,
+            "detect_options": detect_options,
+        },
+        "groups": {},
+        "throughput": {},
+        "cold_start": {},
+    }
+    # spawn: setiap kelompok mulai dari proses bersih, jadi RSS puncaknya terpisah
+    context = multiprocessing.get_context("spawn")
+    for group in ["dataset"] + [f"{size:g}MP" for size in sizes_mp]:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(_run_group, group, paths, source, repeat, detect_options).result()
+        results["groups"][group] = result
+        e2e = result["end_to_end"]
+        log(f"{group:<8} p50 {e2e['p50'] * 1000:8.1f} ms  p90 {e2e['p90'] * 1000:8.1f} ms  "
+            f"RSS puncak {result['peak_rss_mb']:7.1f} MB")
+
+    for workers in range(1, max_workers + 1):
+        ips = measure_throughput(paths, workers, rounds, detect_options)
+        results["throughput"][str(workers)] = ips
+        log(f"{workers} worker: {ips:.2f} citra/detik")
+
+    results["cold_start"] = measure_cold_start(source, repeat)
+    for name, stats in results["cold_start"].items():
+        status = "OK" if stats["p50"] <= stats["target"] else "MELEBIHI TARGET"
+        log(f"cold start {name:<14} p50 {stats['p50'] * 1000:7.1f} ms (target {stats['target'] * 1000:.0f} ms) {status}")
+    return results
+
+
+def compare(old, new, threshold=DEFAULT_THRESHOLD_PERCENT):
+    """
+    Bandingkan dua hasil `run_benchmark`.
+
+    Mengembalikan daftar `(metrik, lama, baru, perubahan %, regresi?)`.
+    Latensi dan RSS: naik = lebih buruk; throughput: turun = lebih buruk.
+    """
+    rows = []
+
+    def add(metric, old_value, new_value, higher_is_worse=True):
+        if not old_value:
+            return
+        change = (new_value - old_value) / old_value * 100
+        worse = change if higher_is_worse else -change
+        rows.append((metric, old_value, new_value, change, worse > threshold))
+
+    for group, new_group in new["groups"].items():
+        old_group = old["groups"].get(group)
+        if old_group is None:
+            continue
+        for p in PERCENTILES:
+            add(f"{group} p{p} (s)", old_group["end_to_end"][f"p{p}"], new_group["end_to_end"][f"p{p}"])
+        for name, stats in new_group["stages"].items():
+            if name in old_group["stages"]:
+                add(f"{group} {name} p50 (s)", old_group["stages"][name]["p50"], stats["p50"])
+        add(f"{group} RSS puncak (MB)", old_group["peak_rss_mb"], new_group["peak_rss_mb"])
+    for name, stats in new.get("cold_start", {}).items():
+        if name in old.get("cold_start", {}):
+            add(f"cold start {name} p50 (s)", old["cold_start"][name]["p50"], stats["p50"])
+    for workers, ips in new["throughput"].items():
+        if workers in old["throughput"]:
+            add(f"throughput {workers} worker (citra/s)", old["throughput"][workers], ips, higher_is_worse=False)
+    return rows
+
+
+def format_comparison(rows):
+    lines = []
+    for metric, old_value, new_value, change, regressed in rows:
+        flag = "  << REGRESI" if regressed else ""
+        lines.append(f"{metric:<48}{old_value:>12.4g}{new_value:>12.4g}{change:>+9.1f}%{flag}")
+    return "\n".join(lines)
+
+
+def add_arguments(parser):
+    parser.add_argument("directory", nargs="?", default="dataset", help="Folder citra dataset (default: dataset)")
+    parser.add_argument("-o", "--output", help="Simpan hasil ke file JSON ini")
+    parser.add_argument("--compare", metavar="LAMA.json", help="Bandingkan dengan hasil benchmark sebelumnya")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD_PERCENT,
+                        help="Ambang regresi dalam persen (default: %(default)s)")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES_MP)),
+                        help="Ukuran citra sintetis dalam MP, dipisah koma (kosong: tanpa citra sintetis)")
+    parser.add_argument("--source", help="Citra sumber untuk citra sintetis (default: citra sunu* pertama)")
+    parser.add_argument("--repeat", type=int, default=3, help="Pengulangan per citra untuk persentil latensi")
+    parser.add_argument("--max-workers", type=int, default=None,
+                        help="Ukur throughput untuk 1..N worker (default: jumlah CPU)")
+    parser.add_argument("--rounds", type=int, default=3, help="Berapa kali dataset diproses per ukuran pool")
+    batch.add_detect_arguments(parser)
+
+
+def main(args):
+    sizes = [float(s) for s in args.sizes.split(",") if s]
+    results = run_benchmark(args.directory, sizes, args.source, args.repeat, args.max_workers, args.rounds,
+                            batch.detect_options(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Hasil disimpan ke {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        rows = compare(old, results, args.threshold)
+        print(format_comparison(rows))
+        n_regressed = sum(1 for row in rows if row[4])
+        print(f"{n_regressed} regresi di atas {args.threshold:g}%.")
+        return 1 if n_regressed else 0
+    return 0
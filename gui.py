@@ -0,0 +1,557 @@
+"""
+GUI desktop (PyQt5): 9 slot citra langkah, laporan HTML, dan mode stream.
+
+Hanya modul ini yang mengimpor Qt; `detect_sunu.py` baru mengimpornya saat
+GUI benar-benar dibuka, sehingga CLI dan worker proses tetap ringan.
+"""
+import sys
+import threading
+import cv2
+import numpy as np
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
+                             QHBoxLayout, QPushButton, QLabel, QFileDialog, 
+                             QScrollArea, QMessageBox, QSizePolicy)
+from PyQt5.QtGui import QPixmap, QImage
+from PyQt5.QtCore import Qt, QSize, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+import loader
+import pipeline
+import profiling
+import report
+import result_cache
+import stream
+from pipeline import STEP_TITLES, DetectionCancelled
+
+# Atribut GUI yang menyimpan citra tiap slot, urutannya sama dengan STEP_TITLES
+STEP_ATTRS = ("original_image", "processed_step_a", "processed_step_b", "processed_step_c",
+              "processed_step_d", "processed_step_e", "processed_step_f", "processed_step_g",
+              "detected_img")
+
+# Sisi terpanjang salinan pratinjau yang dipakai selama jendela sedang di-resize
+PREVIEW_MAX_SIDE = 480
+# Jeda (ms) setelah resize terakhir sebelum slot digambar ulang dengan smooth scaling
+RESIZE_SETTLE_MS = 150
+# Filter dialog simpan untuk laporan dengan citra sebagai file terpisah (report.write_report(assets="files"))
+REPORT_FILES_FILTER = "HTML + folder gambar (*.html)"
+
+
+# --- Worker Latar Belakang (QThreadPool) ---
+
+class WorkerSignals(QObject):
+    """Sinyal dari worker ke thread GUI. Argumen pertama selalu `job_id` agar hasil basi bisa diabaikan."""
+    step_ready = pyqtSignal(int, int, object)   # job_id, indeks langkah, citra
+    finished = pyqtSignal(int, object)          # job_id, hasil (DetectionResult / path laporan)
+    failed = pyqtSignal(int, str)               # job_id, pesan error
+    cancelled = pyqtSignal(int)                 # job_id
+    frame_ready = pyqtSignal(int, object)       # job_id, (FrameResult, citra hasil, StreamStats)
+
+
+class DetectionWorker(QRunnable):
+    """Menjalankan deteksi (lewat `ResultCache`) di thread pool dan mengalirkan citra tiap langkah lewat sinyal."""
+
+    def __init__(self, job_id, image, cache, config):
+        super().__init__()
+        self.job_id = job_id
+        self.image = image
+        self.cache = cache
+        self.config = config
+        self.signals = WorkerSignals()
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def run(self):
+        try:
+            result = self.cache.detect(
+                self.image,
+                on_step=lambda index, title, img: self.signals.step_ready.emit(self.job_id, index, img),
+                is_cancelled=self._cancel_event.is_set,
+                config=self.config,
+                timings=profiling.StageTimings(),
+            )
+        except DetectionCancelled:
+            self.signals.cancelled.emit(self.job_id)
+        except Exception as e:
+            self.signals.failed.emit(self.job_id, str(e))
+        else:
+            self.signals.finished.emit(self.job_id, result)
+
+
+class StreamWorker(QRunnable):
+    """
+    Menjalankan `stream.StreamDetector` dan mengirim frame terbaru ke GUI.
+
+    Frame baru hanya dikirim setelah GUI selesai menampilkan frame sebelumnya
+    (`frame_shown`), jadi antrian sinyal Qt tidak menumpuk saat GUI lambat;
+    frame di antaranya tetap dideteksi tetapi tidak ditampilkan.
+    """
+
+    def __init__(self, job_id, source, config):
+        super().__init__()
+        self.job_id = job_id
+        self.source = source
+        self.config = config
+        self.signals = WorkerSignals()
+        self._stop_event = threading.Event()
+        self._display_idle = threading.Event()
+        self._display_idle.set()
+
+    def cancel(self):
+        self._stop_event.set()
+
+    def frame_shown(self):
+        self._display_idle.set()
+
+    def run(self):
+        try:
+            with stream.StreamDetector(self.source, config=self.config) as detector:
+                for frame_result in detector:
+                    if self._stop_event.is_set():
+                        break
+                    if self._display_idle.is_set():
+                        self._display_idle.clear()
+                        payload = (frame_result, stream.render_frame(frame_result), detector.stats)
+                        self.signals.frame_ready.emit(self.job_id, payload)
+        except Exception as e:
+            self.signals.failed.emit(self.job_id, str(e))
+        else:
+            self.signals.finished.emit(self.job_id, detector.stats)
+
+
+class ReportWorker(QRunnable):
+    """Menyusun dan menulis laporan HTML (encode 9 citra) di luar thread GUI."""
+
+    def __init__(self, job_id, file_path, step_images, result_text, spot_percent, config, timings=None,
+                 assets="inline"):
+        super().__init__()
+        self.job_id = job_id
+        self.file_path = file_path
+        self.step_images = step_images
+        self.result_text = result_text
+        self.spot_percent = spot_percent
+        self.config = config
+        self.timings = timings
+        self.assets = assets
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            report.write_report(self.file_path, self.step_images, self.result_text, self.spot_percent, self.config,
+                                self.timings, assets=self.assets)
+        except Exception as e:
+            self.signals.failed.emit(self.job_id, str(e))
+        else:
+            self.signals.finished.emit(self.job_id, self.file_path)
+
+
+class KerapuSunuDetector(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Deteksi Kerapu Sunu (Tahap Akhir: 9 Langkah Visual)")
+        # Menyesuaikan lebar untuk 9 kolom
+        self.setGeometry(100, 100, 2200, 900) 
+        
+        # Variabel untuk menyimpan hasil setiap langkah
+        self.original_image = None
+        self.processed_step_a = None # 2. Mask Adaptif
+        self.processed_step_b = None # 3. Mask CCL
+        self.processed_step_c = None # 4. Mask Fill Holes
+        self.processed_step_d = None # 5. Mask Warna Murni (HSV)
+        self.processed_step_e = None # 6. Mask Warna Ikan (Final)
+        self.processed_step_f = None # 7. Ikan Tersegmentasi (Masked) - BARU
+        self.processed_step_g = None # 8. Bintik Terdeteksi (Visual)
+        self.detected_img = None     # 9. Hasil Akhir
+        
+        self.result_text_string = "Silakan Input Gambar dan Proses Deteksi."
+        self.total_spot_area_detected = 0
+        self.current_spot_percent = 0.0 
+        # Parameter pipeline (ambang persentase, pita HSV, ukuran blok) untuk deteksi dan laporan
+        self.config = pipeline.DEFAULT_CONFIG
+        # Waktu/memori per tahap dari deteksi terakhir (profiling.StageTimings)
+        self.detection_timings = None
+
+        # Pool khusus (bukan globalInstance): Qt memakai pool global untuk
+        # smooth-scaling QPixmap, sehingga berbagi pool bisa membuat deadlock.
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(2)
+        # Worker yang sedang berjalan (referensi disimpan agar tidak di-GC)
+        self.detection_worker = None
+        self.report_worker = None
+        self.stream_worker = None
+        self._job_id = 0
+        # Citra yang sama tidak diproses ulang (hash isi citra + parameter pipeline)
+        self.result_cache = result_cache.ResultCache(result_cache.DEFAULT_CACHE_DIR)
+
+        # Cache pixmap per slot: judul -> {"img", "full", "preview", "smooth_size"}
+        self._pixmap_cache = {}
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(RESIZE_SETTLE_MS)
+        self._resize_timer.timeout.connect(self.update_all_processed_images)
+        
+        self.init_ui()
+
+    # --- Bagian UI dan Utilities ---
+
+    def init_ui(self):
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        
+        main_layout = QHBoxLayout(central_widget)
+        
+        control_widget = QWidget()
+        control_layout = QVBoxLayout(control_widget)
+        
+        self.btn_input = QPushButton("1. Input Gambar")
+        self.btn_input.clicked.connect(self.load_image)
+        control_layout.addWidget(self.btn_input)
+        
+        self.btn_process = QPushButton("2. Proses Deteksi")
+        self.btn_process.clicked.connect(self.process_detection)
+        self.btn_process.setEnabled(False) 
+        control_layout.addWidget(self.btn_process)
+        
+        self.btn_report = QPushButton("3. Generate Laporan (HTML)")
+        self.btn_report.clicked.connect(self.generate_report)
+        self.btn_report.setEnabled(False) 
+        control_layout.addWidget(self.btn_report)
+
+        self.btn_stream = QPushButton("4. Stream Video")
+        self.btn_stream.clicked.connect(self.toggle_stream)
+        control_layout.addWidget(self.btn_stream)
+        
+        control_layout.addStretch(1)
+        self.result_label = QLabel("### Hasil Analisis:")
+        self.result_text = QLabel(self.result_text_string)
+        self.result_text.setWordWrap(True)
+        self.result_text.setStyleSheet("font-size: 14pt; font-weight: bold; color: navy;")
+        control_layout.addWidget(self.result_label)
+        control_layout.addWidget(self.result_text)
+        # Tabel waktu & memori per tahap dari deteksi terakhir
+        self.timing_text = QLabel("")
+        self.timing_text.setStyleSheet("font-family: monospace; font-size: 9pt; color: #444;")
+        self.timing_text.setTextInteractionFlags(Qt.TextSelectableByMouse) # type: ignore
+        control_layout.addWidget(self.timing_text)
+        control_layout.addStretch(3)
+        main_layout.addWidget(control_widget, 1)
+
+        self.image_widgets = {}
+        # 9 Slot Gambar
+        image_titles = STEP_TITLES
+        
+        scroll_area = QScrollArea()
+        scroll_area.setWidgetResizable(True)
+        scroll_content = QWidget()
+        self.image_grid_layout = QHBoxLayout(scroll_content)
+        
+        for title in image_titles:
+            step_layout = QVBoxLayout()
+            title_label = QLabel(f"### {title}")
+            title_label.setAlignment(Qt.AlignCenter) # type: ignore
+            
+            image_label = QLabel("Tidak Ada Gambar")
+            image_label.setAlignment(Qt.AlignCenter) # type: ignore
+            image_label.setMinimumSize(150, 150)
+            image_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding) 
+            image_label.setStyleSheet("border: 1px solid gray;")
+            
+            self.image_widgets[title] = image_label
+            step_layout.addWidget(title_label)
+            step_layout.addWidget(image_label)
+            self.image_grid_layout.addLayout(step_layout, 1)
+        
+        scroll_area.setWidget(scroll_content)
+        main_layout.addWidget(scroll_area, 9) # Stretch 9
+
+    def convert_cv_to_qt(self, cv_img, color_fmt=cv2.COLOR_BGR2RGB):
+        if cv_img is None: return QPixmap()
+        if len(cv_img.shape) == 3:
+            cv_img = cv2.cvtColor(cv_img, color_fmt)
+            height, width, channel = cv_img.shape
+            bytes_per_line = 3 * width
+            q_img = QImage(cv_img.data, width, height, bytes_per_line, QImage.Format_RGB888)
+        else:
+            if cv_img.dtype != np.uint8:
+                cv_img = cv2.normalize(cv_img, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8) # type: ignore
+            height, width = cv_img.shape
+            bytes_per_line = width
+            q_img = QImage(cv_img.data, width, height, bytes_per_line, QImage.Format_Grayscale8)
+        return QPixmap.fromImage(q_img)
+
+    def get_cached_pixmaps(self, title, img):
+        """Pixmap ukuran penuh + pratinjau untuk slot; konversi cv->Qt hanya diulang jika citranya berganti."""
+        entry = self._pixmap_cache.get(title)
+        if entry is None or entry["img"] is not img:
+            full = self.convert_cv_to_qt(img)
+            if max(full.width(), full.height()) > PREVIEW_MAX_SIDE:
+                preview = full.scaled(PREVIEW_MAX_SIDE, PREVIEW_MAX_SIDE, Qt.KeepAspectRatio, Qt.SmoothTransformation) # type: ignore
+            else:
+                preview = full
+            entry = {"img": img, "full": full, "preview": preview, "smooth_size": None}
+            self._pixmap_cache[title] = entry
+        return entry
+
+    def update_image_display(self, title, img, fast=False):
+        label = self.image_widgets[title]
+        if img is None:
+            self._pixmap_cache.pop(title, None)
+            label.setPixmap(QPixmap())
+            label.setText("Tidak Ada Gambar")
+            return
+        entry = self.get_cached_pixmaps(title, img)
+        size = label.size()
+        if fast:
+            # Selama resize: skala murah dari salinan pratinjau
+            scaled_pixmap = entry["preview"].scaled(size, Qt.KeepAspectRatio, Qt.FastTransformation) # type: ignore
+            entry["smooth_size"] = None
+        elif entry["smooth_size"] == size:
+            return
+        else:
+            scaled_pixmap = entry["full"].scaled(
+                size, Qt.KeepAspectRatio, Qt.SmoothTransformation # type: ignore
+            )
+            entry["smooth_size"] = size
+        label.setPixmap(scaled_pixmap)
+        label.setText("")
+
+    def update_all_processed_images(self, fast=False):
+        for attr, title in zip(STEP_ATTRS, STEP_TITLES):
+            img = getattr(self, attr)
+            if img is not None:
+                self.update_image_display(title, img, fast=fast)
+
+    def clear_processed_images(self):
+        """Kosongkan slot langkah 2-9 (citra input tetap)."""
+        for attr, title in zip(STEP_ATTRS[1:], STEP_TITLES[1:]):
+            setattr(self, attr, None)
+            self.update_image_display(title, None)
+
+    def resizeEvent(self, event): # type: ignore
+        super().resizeEvent(event)
+        # Gambar cepat dari pratinjau, lalu smooth scaling setelah resize berhenti
+        self.update_all_processed_images(fast=True)
+        self._resize_timer.start()
+
+    def closeEvent(self, event): # type: ignore
+        self.cancel_detection()
+        self.stop_stream()
+        self.thread_pool.waitForDone()
+        super().closeEvent(event)
+
+    def load_image(self):
+        options = QFileDialog.Options()
+        file_path, _ = QFileDialog.getOpenFileName(self, "Pilih Gambar", "",
+                                                   "Image Files (*.png *.jpg *.jpeg);;All Files (*)", 
+                                                   options=options)
+        
+        if file_path:
+            self.original_image = loader.load_image(file_path)
+            if self.original_image is not None:
+                self.cancel_detection()
+                self.clear_processed_images()
+                self.update_image_display("1. Input Citra (RGB)", self.original_image)
+                self.btn_process.setEnabled(True)
+                self.btn_report.setEnabled(False)
+                self.result_text.setText("Gambar siap diproses.")
+            else:
+                QMessageBox.critical(self, "Error", "Gagal memuat gambar.")
+                self.btn_process.setEnabled(False)
+
+    # --- FUNGSI ALGORITMA PCD UTAMA (9 Langkah, di Worker Thread) ---
+
+    def process_detection(self):
+        if self.original_image is None:
+            QMessageBox.warning(self, "Perhatian", "Mohon input gambar terlebih dahulu.")
+            return
+
+        self.cancel_detection()
+        self._job_id += 1
+        worker = DetectionWorker(self._job_id, self.original_image, self.result_cache, self.config)
+        worker.signals.step_ready.connect(self.on_detection_step)
+        worker.signals.finished.connect(self.on_detection_finished)
+        worker.signals.failed.connect(self.on_detection_failed)
+        self.detection_worker = worker
+
+        self.clear_processed_images()
+        self.btn_process.setEnabled(False)
+        self.btn_report.setEnabled(False)
+        self.result_text.setText("Memproses deteksi...")
+        self.result_text.setStyleSheet("font-size: 14pt; font-weight: bold; color: navy;")
+        self.timing_text.setText("")
+        self.detection_timings = None
+        self.thread_pool.start(worker)
+
+    def cancel_detection(self):
+        """Hentikan worker deteksi yang sedang berjalan; sinyal darinya akan diabaikan."""
+        if self.detection_worker is not None:
+            self.detection_worker.cancel()
+            self.detection_worker = None
+        self._job_id += 1
+
+    def on_detection_step(self, job_id, index, img):
+        if job_id != self._job_id:
+            return
+        setattr(self, STEP_ATTRS[index], img)
+        self.update_image_display(STEP_TITLES[index], img)
+        self.result_text.setText(f"Memproses deteksi... (langkah {index + 1}/{len(STEP_TITLES)})")
+
+    def on_detection_failed(self, job_id, message):
+        if job_id != self._job_id:
+            return
+        self.detection_worker = None
+        self.btn_process.setEnabled(True)
+        self.result_text.setText("Deteksi gagal.")
+        QMessageBox.critical(self, "Error", f"Deteksi gagal: {message}")
+
+    def on_detection_finished(self, job_id, result):
+        if job_id != self._job_id:
+            return
+        self.detection_worker = None
+        self.total_spot_area_detected = result.total_spot_area
+        self.current_spot_percent = result.spot_percent
+        self.result_text_string = result.result_text
+        self.detection_timings = result.timings
+        if result.timings is not None:
+            self.timing_text.setText(result.timings.format_table())
+
+        if result.is_kerapu_sunu:
+            self.result_text.setText(f"✅ {self.result_text_string}")
+            self.result_text.setStyleSheet("font-size: 16pt; font-weight: bold; color: green;")
+        else:
+            self.result_text.setText(f"❌ {self.result_text_string}")
+            self.result_text.setStyleSheet("font-size: 16pt; font-weight: bold; color: red;")
+            
+        self.btn_process.setEnabled(True)
+        self.btn_report.setEnabled(True)
+
+    # --- Mode Streaming (Video / Kamera) ---
+
+    def toggle_stream(self):
+        if self.stream_worker is not None:
+            self.stop_stream()
+            return
+        options = QFileDialog.Options()
+        file_path, _ = QFileDialog.getOpenFileName(self, "Pilih Video", "",
+                                                   "Video Files (*.mp4 *.avi *.mov *.mkv);;All Files (*)",
+                                                   options=options)
+        if file_path:
+            self.start_stream(file_path)
+
+    def start_stream(self, source):
+        """Mulai deteksi live dari `source` (path video atau indeks kamera)."""
+        self.cancel_detection()
+        self.stop_stream()
+        self._job_id += 1
+        worker = StreamWorker(self._job_id, source, self.config)
+        worker.signals.frame_ready.connect(self.on_stream_frame)
+        worker.signals.finished.connect(self.on_stream_finished)
+        worker.signals.failed.connect(self.on_stream_failed)
+        self.stream_worker = worker
+
+        self.clear_processed_images()
+        self.btn_input.setEnabled(False)
+        self.btn_process.setEnabled(False)
+        self.btn_report.setEnabled(False)
+        self.btn_stream.setText("Hentikan Stream")
+        self.result_text.setText("Membuka stream...")
+        self.result_text.setStyleSheet("font-size: 14pt; font-weight: bold; color: navy;")
+        self.timing_text.setText("")
+        self.thread_pool.start(worker)
+
+    def stop_stream(self):
+        if self.stream_worker is not None:
+            self.stream_worker.cancel()
+            self.stream_worker = None
+        self.btn_stream.setText("4. Stream Video")
+        self.btn_input.setEnabled(True)
+        self.btn_process.setEnabled(self.original_image is not None)
+
+    def on_stream_frame(self, job_id, payload):
+        if self.stream_worker is None or job_id != self.stream_worker.job_id:
+            return
+        frame_result, rendered, stats = payload
+        result = frame_result.result
+        self.original_image = frame_result.frame
+        self.detected_img = rendered
+        self.update_image_display(STEP_TITLES[0], self.original_image)
+        self.update_image_display(STEP_TITLES[-1], self.detected_img)
+
+        mark, color = ("✅", "green") if result.is_kerapu_sunu else ("❌", "red")
+        self.result_text.setText(f"{mark} {result.result_text}")
+        self.result_text.setStyleSheet(f"font-size: 16pt; font-weight: bold; color: {color};")
+        mode = "ROI pelacakan" if frame_result.roi is not None else "frame penuh"
+        self.timing_text.setText(
+            f"Frame {frame_result.index} ({mode})\n"
+            f"Latensi {frame_result.latency * 1000:.1f} ms, {stats.fps:.1f} frame/detik\n"
+            f"Diproses {stats.frames_processed}, dibuang {stats.frames_dropped}, lewat ROI {stats.frames_tracked}")
+        self.stream_worker.frame_shown()
+
+    def on_stream_finished(self, job_id, stats):
+        if self.stream_worker is None or job_id != self.stream_worker.job_id:
+            return
+        self.stop_stream()
+        self.timing_text.setText(
+            f"Stream selesai: {stats.frames_processed} frame diproses, {stats.frames_dropped} dibuang, "
+            f"{stats.frames_tracked} lewat ROI pelacakan.")
+
+    def on_stream_failed(self, job_id, message):
+        if self.stream_worker is None or job_id != self.stream_worker.job_id:
+            return
+        self.stop_stream()
+        self.result_text.setText("Stream gagal.")
+        QMessageBox.critical(self, "Error", f"Stream gagal: {message}")
+
+    # --- Fungsi Generate Laporan HTML (di Worker Thread) ---
+
+    def generate_report(self):
+        if self.original_image is None or self.detected_img is None:
+            QMessageBox.warning(self, "Perhatian", "Mohon proses deteksi terlebih dahulu.")
+            return
+
+        result_text_final = getattr(self, 'result_text_string', 'Analisis tidak dijalankan.')
+        current_spot_percent = getattr(self, 'current_spot_percent', 0.0)
+        
+        options = QFileDialog.Options()
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Simpan Laporan HTML", "Laporan_Deteksi_Kerapu_Sunu_CCL.html",
+            f"HTML Files (*.html);;{REPORT_FILES_FILTER};;All Files (*)", options=options)
+        
+        if file_path:
+            step_images = [getattr(self, attr) for attr in STEP_ATTRS]
+            # Mode folder gambar: HTML kecil + citra sebagai file terpisah di <nama>_files/
+            assets = "files" if selected_filter == REPORT_FILES_FILTER else "inline"
+            worker = ReportWorker(0, file_path, step_images, result_text_final, current_spot_percent, self.config,
+                                  self.detection_timings, assets)
+            worker.signals.finished.connect(self.on_report_finished)
+            worker.signals.failed.connect(self.on_report_failed)
+            self.report_worker = worker
+            self.btn_report.setEnabled(False)
+            self.btn_report.setText("Menyimpan Laporan...")
+            self.thread_pool.start(worker)
+
+    def _report_done(self):
+        self.report_worker = None
+        self.btn_report.setText("3. Generate Laporan (HTML)")
+        self.btn_report.setEnabled(self.detected_img is not None and self.detection_worker is None)
+
+    def on_report_finished(self, _job_id, file_path):
+        self._report_done()
+        QMessageBox.information(self, "Sukses", f"Laporan berhasil disimpan ke:\n{file_path}")
+
+    def on_report_failed(self, _job_id, message):
+        self._report_done()
+        QMessageBox.critical(self, "Error", f"Gagal menyimpan file: {message}")
+
+def run_gui(stream_source=None):
+    if hasattr(Qt, 'AA_EnableHighDpiScaling'):
+        QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True) # type: ignore
+    if hasattr(Qt, 'AA_UseHighDpiPixmaps'):
+        QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True) # type: ignore
+        
+    app = QApplication(sys.argv[:1])
+    detector = KerapuSunuDetector()
+    detector.show()
+    if stream_source is not None:
+        detector.start_stream(stream_source)
+    return app.exec_()
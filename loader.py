@@ -0,0 +1,148 @@
+"""
+Pemuatan citra: decode resolusi tereduksi, sumber bytes/mmap, dan prefetch.
+
+    image = load_image("dataset/sunu2.png")              # seperti cv2.imread
+    image = load_image(data_bytes, scale=0.25)            # dari buffer, decode 1/4
+    with PrefetchLoader(paths, scale=0.5) as images:
+        for path, image in images:                        # decode berjalan di depan
+            ...
+
+`scale` adalah skala pemrosesan yang diizinkan (0 < scale <= 1). Faktor
+`IMREAD_REDUCED_COLOR_2/4/8` terbesar yang tidak melewati skala itu dipakai
+langsung oleh decoder (JPEG men-decode koefisien DCT yang lebih sedikit);
+sisa skala yang tidak pas dikecilkan dengan `INTER_AREA`. Karena citra jadi
+lebih kecil, `scaled_config` menyesuaikan parameter yang berupa piksel
+absolut (ambang luas ikan dan ukuran kernel/blok).
+"""
+import dataclasses
+import mmap
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+import pipeline
+
+DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+PREFETCH_WORKERS = 2
+PREFETCH_QUEUE_SIZE = 4
+
+
+def reduction_factor(scale):
+    """Faktor reduksi decode terbesar (1, 2, 4, 8) dengan 1/faktor >= `scale`."""
+    if not 0 < scale <= 1:
+        raise ValueError(f"scale harus di (0, 1], bukan {scale}")
+    return max(f for f in DECODE_FLAGS if f * scale <= 1 + 1e-9)
+
+
+# Ukuran kernel/blok `DetectionConfig` dalam piksel absolut (diskalakan seperti mode piramida)
+KERNEL_FIELDS = ("blur_size", "object_block_size", "close_size", "spot_block_size", "spot_median_size")
+
+
+def scaled_config(config, scale):
+    """
+    `config` untuk citra yang diperkecil `scale`: `min_fish_contour_area`
+    dikali `scale`², ukuran kernel/blok lewat `pipeline.scaled_ksize`.
+    Ambang persentase dan HSV tidak bergantung resolusi, jadi tidak diubah.
+    """
+    config = config or pipeline.DEFAULT_CONFIG
+    if scale == 1:
+        return config
+    kernels = {name: pipeline.scaled_ksize(getattr(config, name), scale) for name in KERNEL_FIELDS}
+    return dataclasses.replace(config, min_fish_contour_area=config.min_fish_contour_area * scale * scale, **kernels)
+
+
+def map_file(path):
+    """Buffer read-only hasil memory-map file `path` (untuk `load_image`); tidak menyalin isi file."""
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def load_image(source, scale=1, use_mmap=False):
+    """
+    Decode citra BGR dari path, `bytes`/`bytearray`/`memoryview`/`mmap`, atau array uint8.
+
+    Mengembalikan None jika gagal dimuat (seperti `cv2.imread`). Dengan
+    `use_mmap=True` file di-memory-map lalu di-decode dari buffer itu.
+    """
+    factor = reduction_factor(scale)
+    flag = DECODE_FLAGS[factor]
+    if isinstance(source, (str, os.PathLike)):
+        if not use_mmap:
+            image = cv2.imread(os.fspath(source), flag)
+        else:
+            try:
+                buffer = map_file(source)
+            except (OSError, ValueError):  # file tidak ada atau kosong
+                return None
+            with buffer:
+                image = cv2.imdecode(np.frombuffer(buffer, np.uint8), flag)
+    else:
+        image = cv2.imdecode(np.frombuffer(source, np.uint8), flag)
+    if image is None:
+        return None
+
+    remaining = scale * factor
+    if remaining < 1 - 1e-9:
+        h, w = image.shape[:2]
+        size = (max(1, round(w * remaining)), max(1, round(h * remaining)))
+        image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+    return image
+
+
+class PrefetchLoader:
+    """
+    Iterator `(sumber, citra)` yang men-decode hingga `queue_size` citra di depan
+    pemakai pada `workers` thread latar (decode OpenCV melepas GIL).
+
+    Urutan keluaran sama dengan urutan `sources`; citra None berarti gagal dimuat.
+    Antrian dibatasi, jadi memori maksimal kira-kira `queue_size` citra.
+    """
+
+    def __init__(self, sources, scale=1, use_mmap=False, workers=PREFETCH_WORKERS, queue_size=PREFETCH_QUEUE_SIZE):
+        reduction_factor(scale)  # validasi lebih awal, bukan di thread latar
+        self.sources = iter(sources)
+        self.scale = scale
+        self.use_mmap = use_mmap
+        self.queue_size = max(1, queue_size)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._pending = deque()
+
+    def _fill(self):
+        while len(self._pending) < self.queue_size:
+            try:
+                source = next(self.sources)
+            except StopIteration:
+                return
+            self._pending.append((source, self._pool.submit(load_image, source, self.scale, self.use_mmap)))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        self._fill()
+        if not self._pending:
+            raise StopIteration
+        source, future = self._pending.popleft()
+        image = future.result()
+        self._fill()
+        return source, image
+
+    def close(self):
+        for _, future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,950 @@
+"""
+Inti algoritma PCD deteksi Kerapu Sunu (9 langkah) tanpa ketergantungan Qt.
+
+Modul ini dipakai bersama oleh GUI (`KerapuSunuDetector`) dan mode batch CLI.
+Input berupa citra BGR (array NumPy hasil `cv2.imread`), output berupa
+`DetectionResult` yang berisi vonis, metrik bintik, dan citra setiap langkah.
+"""
+import dataclasses
+import functools
+import os
+import threading
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import cv2
+import numpy as np
+
+from profiling import NULL_TIMINGS
+
+# --- KONSTANTA PERSENTASE ---
+MIN_TOTAL_SPOT_AREA_PERCENT = 1.0
+MAX_AREA_PER_SPOT_PERCENT = 0.5
+MIN_AREA_PER_SPOT_PERCENT = 0.01
+MIN_FISH_CONTOUR_AREA = 5000
+# ----------------------------
+
+# Pita hue merah/oranye (HSV OpenCV 8-bit, H 0-179): ((lower), (upper)) per pita
+RED_HSV_RANGES = (
+    ((0, 100, 100), (10, 255, 255)),
+    ((160, 100, 100), (179, 255, 255)),
+)
+
+# Parameter filter/threshold (ukuran kernel pada resolusi penuh)
+BLUR_SIZE = 5                  # GaussianBlur sebelum threshold objek
+OBJECT_BLOCK_SIZE = 25         # blok threshold adaptif segmentasi objek
+OBJECT_THRESHOLD_C = 10
+CLOSE_SIZE = 5                 # kernel CLOSE mask warna ikan
+SPOT_BLOCK_SIZE = 11           # blok threshold adaptif bintik (kanal V)
+SPOT_THRESHOLD_C = -2
+SPOT_MEDIAN_SIZE = 3
+
+# Margin (piksel) di sekitar bbox objek terbesar untuk ROI tahap CCL/fill holes
+ROI_MARGIN = 8
+
+# Mode tile (strip horizontal) untuk citra sangat besar
+TILE_MIN_ROWS = 64
+TILE_STRIP_BYTES_PER_PIXEL = 10   # gray + blur + threshold + HSV + 2 mask + BGRA (LUT) per strip
+# Mask global 1 B/piksel: awal, terbesar, objek, floodfill, warna, ikan, salinan findContours
+# ditambah label CCL 4 B/piksel
+TILE_GLOBAL_BYTES_PER_PIXEL = 11
+# Mask bintik (1 B) + label CCL bintik (4 B) per piksel ROI ikan; memakai buffer `color_mask`/`labels`
+# workspace yang sudah bebas, jadi hanya dihitung untuk bagian ROI resolusi penuh di luar citra kerja (piramida)
+TILE_SPOT_BYTES_PER_PIXEL = 5
+
+# Judul 9 slot visual, urutannya sama dengan urutan langkah pipeline
+STEP_TITLES = [
+    "1. Input Citra (RGB)",
+    "2. Segmentation Awal (Adaptif)",
+    "3. Objek Terbesar (CCL)",
+    "4. Fill Holes (Mask Objek)",
+    "5. Mask Warna Murni (HSV)",
+    "6. Mask Warna Ikan (Final)",
+    "7. Ikan Tersegmentasi (Masked)",
+    "8. Bintik Terdeteksi (Visual)",
+    "9. Hasil Deteksi Akhir",
+]
+
+
+@dataclass(frozen=True)
+class DetectionConfig:
+    """
+    Parameter pipeline deteksi. Default-nya konstanta modul di atas.
+
+    Objek ini immutable dan hashable; buat varian dengan `dataclasses.replace`
+    (lihat `sweep.grid`). `red_hsv_ranges` harus berupa tuple bertingkat.
+    """
+    min_total_spot_area_percent: float = MIN_TOTAL_SPOT_AREA_PERCENT
+    max_area_per_spot_percent: float = MAX_AREA_PER_SPOT_PERCENT
+    min_area_per_spot_percent: float = MIN_AREA_PER_SPOT_PERCENT
+    min_fish_contour_area: float = MIN_FISH_CONTOUR_AREA
+    red_hsv_ranges: tuple = RED_HSV_RANGES
+    blur_size: int = BLUR_SIZE
+    object_block_size: int = OBJECT_BLOCK_SIZE
+    object_threshold_c: float = OBJECT_THRESHOLD_C
+    close_size: int = CLOSE_SIZE
+    spot_block_size: int = SPOT_BLOCK_SIZE
+    spot_threshold_c: float = SPOT_THRESHOLD_C
+    spot_median_size: int = SPOT_MEDIAN_SIZE
+
+
+DEFAULT_CONFIG = DetectionConfig()
+
+
+def parameter_fingerprint(config=DEFAULT_CONFIG):
+    """Semua parameter yang memengaruhi hasil deteksi (dipakai sebagai bagian kunci cache)."""
+    return dataclasses.astuple(config)
+
+
+class DetectionCancelled(Exception):
+    """Dilempar oleh `detect` ketika callback `is_cancelled` meminta proses dihentikan."""
+
+
+@dataclass(slots=True)
+class FishResult:
+    """Hasil analisis satu kontur ikan yang lolos filter bentuk."""
+    bbox: tuple
+    area: float
+    circularity: float
+    aspect_ratio: float
+    total_spot_area: int
+    spot_percent: float
+    is_kerapu_sunu: bool
+    spot_boxes: np.ndarray = field(default_factory=lambda: np.zeros((0, 4), np.int32))  # (x, y, w, h) absolut
+
+    def summary(self):
+        return {
+            "bbox": [int(v) for v in self.bbox],
+            "area": float(self.area),
+            "total_spot_area": int(self.total_spot_area),
+            "spot_percent": float(self.spot_percent),
+            "is_kerapu_sunu": self.is_kerapu_sunu,
+        }
+
+
+@dataclass(slots=True)
+class DetectionResult:
+    """
+    Hasil lengkap satu kali deteksi.
+
+    `fishes` berisi satu `FishResult` per ikan. Metrik tingkat atas
+    (`total_spot_area`, `fish_area`, `spot_percent`) diambil dari ikan dengan
+    persentase bintik tertinggi, sehingga konsisten dengan vonis "ada ikan Sunu".
+    """
+    is_kerapu_sunu: bool = False
+    total_spot_area: int = 0
+    fish_area: float = 0
+    spot_percent: float = 0.0
+    result_text: str = ""
+    fishes: list = field(default_factory=list)
+    steps: Mapping = field(default_factory=dict)  # judul langkah -> citra (dict atau LazySteps)
+    config: DetectionConfig = DEFAULT_CONFIG
+    timings: object = None  # profiling.StageTimings bila instrumentasi diminta
+
+    def summary(self):
+        """Ringkasan tanpa citra langkah (ringan untuk dikirim antar proses)."""
+        return {
+            "is_kerapu_sunu": self.is_kerapu_sunu,
+            "total_spot_area": int(self.total_spot_area),
+            "fish_area": float(self.fish_area),
+            "spot_percent": float(self.spot_percent),
+            "result_text": self.result_text,
+            "num_fish": len(self.fishes),
+            "fishes": [fish.summary() for fish in self.fishes],
+        }
+
+
+class Workspace:
+    """
+    Buffer kerja pipeline untuk satu resolusi frame.
+
+    Semua tahap per-piksel menulis ke buffer ini lewat argumen `dst=` OpenCV,
+    sehingga frame berikutnya dengan ukuran sama tidak perlu alokasi baru.
+    Isi buffer ditimpa setiap kali `detect` dipanggil dengan workspace yang sama.
+    """
+
+    # nama buffer -> (jumlah kanal, dtype, padding tiap sisi-dimensi)
+    BUFFERS = {
+        "hsv": (3, np.uint8, 0),
+        "bgra": (4, np.uint8, 0),
+        "gray": (1, np.uint8, 0),
+        "blur": (1, np.uint8, 0),
+        "initial_mask": (1, np.uint8, 0),
+        "largest_mask": (1, np.uint8, 0),
+        "object_mask": (1, np.uint8, 0),
+        "color_mask": (1, np.uint8, 0),
+        "color_tmp": (1, np.uint8, 0),
+        "fish_mask": (1, np.uint8, 0),
+        "labels": (1, np.int32, 0),
+        "floodfill": (1, np.uint8, 2),
+    }
+
+    def __init__(self, shape, _storage=None):
+        h, w = shape[:2]
+        self.shape = (h, w)
+        if _storage is None:
+            _storage = {name: np.empty((h + pad) * (w + pad) * ch, dtype)
+                        for name, (ch, dtype, pad) in self.BUFFERS.items()}
+        self._storage = _storage
+        for name, (ch, dtype, pad) in self.BUFFERS.items():
+            dims = (h + pad, w + pad) if ch == 1 else (h + pad, w + pad, ch)
+            setattr(self, name, _storage[name][:int(np.prod(dims))].reshape(dims))
+
+    def fits(self, shape):
+        return self.shape == tuple(shape[:2])
+
+    def can_hold(self, shape):
+        """Apakah memori buffer ini cukup untuk resolusi `shape` (jumlah piksel, orientasi bebas)."""
+        h, w = shape[:2]
+        return all((h + pad) * (w + pad) * ch <= self._storage[name].size
+                   for name, (ch, _, pad) in self.BUFFERS.items())
+
+    def view(self, shape):
+        """Workspace lebih kecil (mis. ROI ikan) yang memakai memori buffer ini; semua buffer tetap kontigu."""
+        h, w = shape[:2]
+        if h > self.shape[0] or w > self.shape[1]:
+            raise ValueError(f"View {shape[:2]} lebih besar dari workspace {self.shape}")
+        return Workspace((h, w), self._storage)
+
+
+# Analisis bintik per ikan berjalan paralel (OpenCV melepas GIL)
+CONTOUR_WORKERS = min(4, os.cpu_count() or 1)
+_contour_pools = {}
+_contour_pools_lock = threading.Lock()
+
+
+def contour_pool(workers):
+    """Thread pool bersama untuk analisis kontur dengan `workers` thread."""
+    with _contour_pools_lock:
+        pool = _contour_pools.get(workers)
+        if pool is None:
+            pool = _contour_pools[workers] = ThreadPoolExecutor(workers, thread_name_prefix="kontur")
+        return pool
+
+
+_thread_workspaces = threading.local()
+
+
+def workspace_for(shape):
+    """
+    Workspace milik thread pemanggil untuk resolusi `shape`.
+
+    Setiap thread menyimpan satu buffer saja (~15 B/piksel, mis. ~180 MB
+    untuk 12 MP) dan memakainya ulang untuk frame yang tidak lebih besar;
+    frame yang lebih besar menggantikannya. Jadi memori yang tertahan di
+    proses yang berjalan lama (server, daemon) sebanding dengan frame
+    terbesar terakhir, bukan dengan jumlah resolusi berbeda.
+    """
+    key = tuple(shape[:2])
+    ws = getattr(_thread_workspaces, "workspace", None)
+    if ws is None or not ws.can_hold(key):
+        ws = _thread_workspaces.workspace = None  # lepaskan buffer lama sebelum alokasi baru
+        ws = _thread_workspaces.workspace = Workspace(key)
+    return ws if ws.fits(key) else Workspace(key, ws._storage)
+
+
+def find_largest_component(mask, labels=None):
+    """CCL pada mask; kembalikan `(labels, label_terbesar, bbox)`; label 0 dan bbox None jika mask kosong."""
+    num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(
+        mask, labels=labels, connectivity=8, ltype=cv2.CV_32S) # type: ignore
+
+    if num_labels <= 1:
+        return labels, 0, None
+
+    # argmax mengembalikan indeks pertama bila ada area yang sama (seperti loop `>`)
+    largest_label = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+    x, y, w, h = (int(v) for v in stats[largest_label, :4])
+    return labels, largest_label, (x, y, w, h)
+
+
+def get_largest_component(mask, out=None, labels=None):
+    """Menggunakan CCL untuk mengisolasi komponen foreground terbesar (ikan) dari mask."""
+    if out is None:
+        out = np.empty_like(mask, dtype=np.uint8)
+    labels, largest_label, bbox = find_largest_component(mask, labels)
+
+    out[:] = 0
+    if bbox is not None:
+        # Perbandingan label cukup di dalam bounding box komponen
+        x, y, w, h = bbox
+        cv2.compare(labels[y:y+h, x:x+w], largest_label, cv2.CMP_EQ, dst=out[y:y+h, x:x+w])
+    return out
+
+
+def object_roi(bbox, shape, margin=None):
+    """
+    ROI `(x0, y0, x1, y1)` = bbox objek + margin, dipotong ke batas citra.
+
+    Di luar ROI, mask objek terbesar bernilai 0 dan mask Fill Holes bernilai
+    255 (background yang terhubung ke (0, 0)). Jika objek menyentuh tepi citra
+    hal itu tidak lagi terjamin, jadi ROI dikembalikan seluas citra.
+    """
+    h_img, w_img = shape[:2]
+    if margin is None:
+        margin = ROI_MARGIN
+    if bbox is None:
+        return 0, 0, w_img, h_img
+    x, y, w, h = bbox
+    if x < 1 or y < 1 or x + w > w_img - 1 or y + h > h_img - 1:
+        return 0, 0, w_img, h_img
+    return max(x - margin, 0), max(y - margin, 0), min(x + w + margin, w_img), min(y + h + margin, h_img)
+
+
+def paste_roi(roi_img, roi, shape, fill=0):
+    """Tempel citra ROI ke kanvas bernilai `fill` seukuran citra penuh."""
+    full = np.full(shape[:2] + roi_img.shape[2:], fill, roi_img.dtype)
+    x0, y0, x1, y1 = roi
+    full[y0:y1, x0:x1] = roi_img
+    return full
+
+
+def fill_holes(mask, out=None, floodfill=None):
+    """Menutup lubang di dalam mask dengan flood fill dari pojok (0, 0)."""
+    h, w = mask.shape[:2]
+    if floodfill is None:
+        floodfill = np.empty((h + 2, w + 2), np.uint8)
+    floodfill[:] = 0
+
+    mask_floodfill_inv = cv2.bitwise_not(mask, dst=out)
+    cv2.floodFill(mask_floodfill_inv, floodfill, (0, 0), 0)
+    return cv2.bitwise_not(mask_floodfill_inv, dst=mask_floodfill_inv)
+
+
+def scaled_ksize(size, scale):
+    """Ukuran kernel/blok ganjil (minimal 3) untuk citra yang diperkecil dengan faktor `scale`."""
+    if scale == 1:
+        return size
+    return max(3, int(round(size * scale)) | 1)
+
+
+def downscale(image, scale):
+    """Perkecil citra dengan INTER_AREA; `scale` = 1 mengembalikan citra apa adanya."""
+    if scale == 1:
+        return image
+    h, w = image.shape[:2]
+    size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+def upscale_mask(mask, shape):
+    """Perbesar mask biner ke ukuran `shape` (INTER_NEAREST, nilai tetap 0/255)."""
+    if mask.shape[:2] == tuple(shape[:2]):
+        return mask
+    return cv2.resize(mask, (shape[1], shape[0]), interpolation=cv2.INTER_NEAREST)
+
+
+def threshold_object(gray_img, out=None, blur_out=None, scale=1, config=DEFAULT_CONFIG):
+    """Langkah 2: GaussianBlur lalu threshold adaptif (objek gelap/bertekstur -> 255)."""
+    blur_size = scaled_ksize(config.blur_size, scale)
+    blur = cv2.GaussianBlur(gray_img, (blur_size, blur_size), 0, dst=blur_out)
+    return cv2.adaptiveThreshold(
+        blur, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV,
+        scaled_ksize(config.object_block_size, scale), config.object_threshold_c, dst=out
+    )
+
+
+def segment_object(gray_img, ws=None, scale=1, config=DEFAULT_CONFIG):
+    """Langkah 2-4: adaptive threshold, objek terbesar (CCL), fill holes."""
+    if ws is None:
+        ws = Workspace(gray_img.shape)
+    # 1. TAHAP SEGMENTASI OBJEK AWAL (Adaptive Thresholding)
+    initial_mask = threshold_object(gray_img, ws.initial_mask, ws.blur, scale, config)
+
+    # 2. TAHAP PEMURNIAN MASK (Pilih Komponen Terbesar)
+    largest_component_mask = get_largest_component(initial_mask, out=ws.largest_mask, labels=ws.labels)
+
+    # 3. TAHAP PERBAIKAN MASK (Fill Holes)
+    final_object_mask = fill_holes(largest_component_mask, out=ws.object_mask, floodfill=ws.floodfill)
+    return initial_mask, largest_component_mask, final_object_mask
+
+
+def red_color_mask(hsv_img, ws=None, ranges=RED_HSV_RANGES):
+    """Langkah 5: mask warna merah/oranye murni (dua pita hue HSV)."""
+    if ws is None:
+        ws = Workspace(hsv_img.shape)
+    (lower_red1, upper_red1), (lower_red2, upper_red2) = ranges
+    mask1 = cv2.inRange(hsv_img, np.array(lower_red1), np.array(upper_red1), dst=ws.color_mask)
+    mask2 = cv2.inRange(hsv_img, np.array(lower_red2), np.array(upper_red2), dst=ws.color_tmp)
+
+    # Kedua pita hue tidak beririsan, jadi OR sama dengan penjumlahan mask
+    return cv2.bitwise_or(mask1, mask2, dst=mask1)
+
+
+@functools.lru_cache(maxsize=2)
+def red_color_lut(ranges=RED_HSV_RANGES):
+    """
+    Tabel 2^24 entri (16 MB): warna BGR -> 0/255 sesuai `ranges` HSV.
+
+    Dibangun sekali dengan `red_color_mask` atas semua warna 24-bit, jadi
+    hasilnya identik bit-per-bit dengan jalur cvtColor + inRange. Indeks
+    tabel = B | G << 8 | R << 16 (urutan byte piksel BGRA little-endian).
+    """
+    levels = np.arange(256, dtype=np.uint8)
+    all_colors = np.empty((256, 256, 256, 3), np.uint8)  # [R, G, B, kanal]
+    all_colors[..., 0] = levels[None, None, :]
+    all_colors[..., 1] = levels[None, :, None]
+    all_colors[..., 2] = levels[:, None, None]
+    all_colors = all_colors.reshape(4096, 4096, 3)
+    hsv_all = cv2.cvtColor(all_colors, cv2.COLOR_BGR2HSV)
+    ws = Workspace(hsv_all.shape)
+    (lower_red1, upper_red1), (lower_red2, upper_red2) = ranges
+    mask1 = cv2.inRange(hsv_all, np.array(lower_red1), np.array(upper_red1), dst=ws.color_mask)
+    mask2 = cv2.inRange(hsv_all, np.array(lower_red2), np.array(upper_red2), dst=ws.color_tmp)
+    return cv2.bitwise_or(mask1, mask2).reshape(-1)
+
+
+def red_color_mask_lut(original_image, ws=None, ranges=RED_HSV_RANGES):
+    """Langkah 5 langsung dari citra BGR lewat `red_color_lut`, tanpa citra HSV dan mask antara."""
+    if ws is None:
+        ws = Workspace(original_image.shape)
+    h, w = original_image.shape[:2]
+    bgra = cv2.cvtColor(original_image, cv2.COLOR_BGR2BGRA, dst=ws.bgra)
+    index = bgra.view(np.uint32).reshape(h, w)
+    np.bitwise_and(index, 0xFFFFFF, out=index)
+    return np.take(red_color_lut(ranges), index, out=ws.color_mask)
+
+
+def min_memory_budget(shape, fixed_bytes=0):
+    """
+    Anggaran terkecil (byte) yang bisa dipenuhi mode tile untuk citra kerja
+    `shape`: `fixed_bytes` (frame input dsb.) + buffer global + satu strip
+    `TILE_MIN_ROWS` baris. Kira-kira 14 B/piksel frame untuk citra BGR.
+    """
+    h, w = shape[:2]
+    return fixed_bytes + h * w * TILE_GLOBAL_BYTES_PER_PIXEL + min(h, TILE_MIN_ROWS) * w * TILE_STRIP_BYTES_PER_PIXEL
+
+
+def tile_rows(shape, memory_budget, fixed_bytes=0):
+    """
+    Tinggi strip (baris) agar `fixed_bytes` + buffer global + buffer satu strip muat di `memory_budget` byte.
+
+    `fixed_bytes` adalah memori yang sudah terpakai di luar buffer kerja
+    (frame input, citra piramida). Mask global (1 B/piksel) dan label CCL
+    (4 B/piksel) selalu seukuran citra; sisa anggaran dibagi ke buffer
+    per-strip. ValueError bila anggaran di bawah `min_memory_budget`.
+    """
+    h, w = shape[:2]
+    minimum = min_memory_budget(shape, fixed_bytes)
+    if memory_budget < minimum:
+        raise ValueError(f"memory_budget {memory_budget / 2**20:.0f} MB terlalu kecil untuk citra {w}x{h}; "
+                         f"minimal {-(-minimum // 2**20)} MB")
+    remaining = memory_budget - fixed_bytes - h * w * TILE_GLOBAL_BYTES_PER_PIXEL
+    return int(min(h, max(TILE_MIN_ROWS, remaining // (w * TILE_STRIP_BYTES_PER_PIXEL))))
+
+
+def iter_strips(height, rows, halo):
+    """Pecah `height` baris menjadi strip: `(y0, y1, in_y0, in_y1)` = baris inti dan baris input (+halo)."""
+    for y0 in range(0, height, rows):
+        y1 = min(y0 + rows, height)
+        yield y0, y1, max(y0 - halo, 0), min(y1 + halo, height)
+
+
+def tiled_initial_mask(image, out, rows, scale=1, config=DEFAULT_CONFIG):
+    """Langkah 2 per strip. Halo = radius blur + radius blok adaptif, jadi hasilnya identik."""
+    h, w = image.shape[:2]
+    halo = scaled_ksize(config.blur_size, scale) // 2 + scaled_ksize(config.object_block_size, scale) // 2
+    strip_ws = Workspace((min(rows + 2 * halo, h), w))
+    for y0, y1, in_y0, in_y1 in iter_strips(h, rows, halo):
+        sws = strip_ws.view((in_y1 - in_y0, w))
+        gray = cv2.cvtColor(image[in_y0:in_y1], cv2.COLOR_BGR2GRAY, dst=sws.gray)
+        mask = threshold_object(gray, sws.initial_mask, sws.blur, scale, config)
+        out[y0:y1] = mask[y0 - in_y0:y1 - in_y0]
+    return out
+
+
+def tiled_color_mask(image, out, rows, color_lut=False, ranges=RED_HSV_RANGES):
+    """Langkah 5 per strip (operasi per-piksel, tanpa halo)."""
+    h, w = image.shape[:2]
+    strip_ws = Workspace((min(rows, h), w))
+    for y0, y1, _, _ in iter_strips(h, rows, 0):
+        sws = strip_ws.view((y1 - y0, w))
+        if color_lut:
+            mask = red_color_mask_lut(image[y0:y1], sws, ranges)
+        else:
+            mask = red_color_mask(cv2.cvtColor(image[y0:y1], cv2.COLOR_BGR2HSV, dst=sws.hsv), sws, ranges)
+        out[y0:y1] = mask
+    return out
+
+
+def tiled_close(mask, out, rows, kernel):
+    """Morfologi CLOSE per strip. Halo = 2x radius kernel (dilate lalu erode), jadi hasilnya identik."""
+    h, w = mask.shape[:2]
+    halo = 2 * (kernel.shape[0] // 2)
+    strip_ws = Workspace((min(rows + 2 * halo, h), w))
+    for y0, y1, in_y0, in_y1 in iter_strips(h, rows, halo):
+        closed = cv2.morphologyEx(mask[in_y0:in_y1], cv2.MORPH_CLOSE, kernel,
+                                  dst=strip_ws.view((in_y1 - in_y0, w)).fish_mask)
+        out[y0:y1] = closed[y0 - in_y0:y1 - in_y0]
+    return out
+
+
+def spot_mask(original_image, body_mask_roi, hsv_img, bbox, config=DEFAULT_CONFIG):
+    """Mask bintik terang di dalam tubuh ikan untuk ROI `bbox` (koordinat resolusi penuh)."""
+    x, y, w, h = bbox
+    if hsv_img is not None:
+        v_roi = np.ascontiguousarray(hsv_img[y:y+h, x:x+w, 2])
+    else:
+        v_roi = cv2.cvtColor(original_image[y:y+h, x:x+w], cv2.COLOR_BGR2HSV)[..., 2].copy()
+
+    spot_value_mask_adaptif = cv2.adaptiveThreshold(
+        v_roi, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, config.spot_block_size, config.spot_threshold_c
+    )
+    spot_value_mask_cleaned = cv2.medianBlur(spot_value_mask_adaptif, config.spot_median_size)
+
+    # Masking Ganda Akhir: Bintik harus ada di Mask Warna Final
+    return cv2.bitwise_and(spot_value_mask_cleaned, body_mask_roi)
+
+
+def tiled_spot_mask(bgr_roi, body_mask_roi, rows, config=DEFAULT_CONFIG, out=None):
+    """`spot_mask` per strip ROI. Halo = radius blok adaptif + radius median, jadi hasilnya identik."""
+    h, w = bgr_roi.shape[:2]
+    halo = config.spot_block_size // 2 + config.spot_median_size // 2
+    if out is None:
+        out = np.empty((h, w), np.uint8)
+    for y0, y1, in_y0, in_y1 in iter_strips(h, rows, halo):
+        v = cv2.cvtColor(bgr_roi[in_y0:in_y1], cv2.COLOR_BGR2HSV)[..., 2].copy()
+        spots = cv2.adaptiveThreshold(v, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY,
+                                      config.spot_block_size, config.spot_threshold_c)
+        spots = cv2.medianBlur(spots, config.spot_median_size)
+        cv2.bitwise_and(spots[y0 - in_y0:y1 - in_y0], body_mask_roi[y0:y1], dst=out[y0:y1])
+    return out
+
+
+def contour_shape(contour, to_full=(1, 1)):
+    """
+    Fitur bentuk satu kontur: `(area, circularity, aspect_ratio, bbox)`.
+
+    Area diskalakan ke resolusi penuh dengan `to_full`; `bbox` tetap di
+    koordinat mask. None jika keliling nol atau bentuk tidak cocok.
+    """
+    fx, fy = to_full
+    area = cv2.contourArea(contour) * fx * fy
+    perimeter = cv2.arcLength(contour, True) * (fx * fy) ** 0.5
+    if perimeter == 0: return None
+
+    circularity = 4 * np.pi * area / (perimeter ** 2)
+    x, y, w, h = cv2.boundingRect(contour)
+    aspect_ratio = float(w) / h
+
+    is_shape_ok = (0.1 < circularity < 0.5) and (aspect_ratio > 0.8)
+    if not is_shape_ok: return None
+    return area, circularity, aspect_ratio, (x, y, w, h)
+
+
+def fish_body_roi(bbox, final_mask_ikan, full_shape, to_full=(1, 1)):
+    """Bbox ikan di resolusi penuh dan mask tubuhnya (diperbesar INTER_NEAREST pada mode piramida)."""
+    x, y, w, h = bbox
+    body_mask_roi = final_mask_ikan[y:y+h, x:x+w]
+    if to_full != (1, 1):
+        fx, fy = to_full
+        full_h, full_w = full_shape[:2]
+        x0, y0 = int(round(x * fx)), int(round(y * fy))
+        x1, y1 = min(full_w, int(round((x + w) * fx))), min(full_h, int(round((y + h) * fy)))
+        body_mask_roi = cv2.resize(body_mask_roi, (x1 - x0, y1 - y0), interpolation=cv2.INTER_NEAREST)
+        bbox = (x0, y0, x1 - x0, y1 - y0)
+    return bbox, body_mask_roi
+
+
+def spot_components(original_image, body_mask_roi, bbox, hsv_img=None, rows=None, config=DEFAULT_CONFIG,
+                    spot_workspace=None):
+    """
+    Statistik CCL (`connectedComponentsWithStats`) bintik di ROI ikan, tanpa label background.
+
+    Dengan `spot_workspace` (mode tile) mask bintik dan label CCL ditulis ke
+    buffer `color_mask`/`labels` workspace itu, bukan alokasi seukuran ROI.
+    """
+    x, y, w, h = bbox
+    labels = None
+    # Deteksi Bintik Kecerahan Tinggi (Adaptif di ROI V) di dalam Mask Warna Final
+    if rows is not None:
+        out = None
+        if spot_workspace is not None:
+            sws = spot_workspace.view((h, w))
+            out, labels = sws.color_mask, sws.labels
+        final_spot_mask = tiled_spot_mask(original_image[y:y+h, x:x+w], body_mask_roi, rows, config, out)
+    else:
+        final_spot_mask = spot_mask(original_image, body_mask_roi, hsv_img, bbox, config)
+
+    # Penerapan CCL
+    num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(
+        final_spot_mask, labels=labels, connectivity=8, ltype=cv2.CV_32S) # type: ignore
+    return stats[1:num_labels]
+
+
+def classify_spots(spot_stats, area, circularity, aspect_ratio, bbox, config=DEFAULT_CONFIG):
+    """Filter area bintik dan vonis satu ikan dari statistik CCL (`spot_components`)."""
+    x, y, w, h = bbox
+    required_min_total_spot_area = area * (config.min_total_spot_area_percent / 100)
+    required_max_area_per_spot = area * (config.max_area_per_spot_percent / 100)
+    required_min_area_per_spot = area * (config.min_area_per_spot_percent / 100)
+
+    # Filter area bintik sekaligus untuk semua label
+    spot_areas = spot_stats[:, cv2.CC_STAT_AREA]
+    is_spot = (spot_areas > required_min_area_per_spot) & (spot_areas < required_max_area_per_spot)
+    total_spot_area = int(spot_areas[is_spot].sum())
+
+    # Kolom LEFT, TOP, WIDTH, HEIGHT -> koordinat absolut
+    spot_boxes = spot_stats[is_spot, :4] + np.array([x, y, 0, 0], np.int32)
+
+    # --- Kriteria Deteksi Akhir ---
+    return FishResult(
+        bbox=(int(x), int(y), int(w), int(h)), area=area, circularity=circularity,
+        aspect_ratio=aspect_ratio, total_spot_area=int(total_spot_area),
+        spot_percent=total_spot_area / area * 100,
+        is_kerapu_sunu=bool(total_spot_area > required_min_total_spot_area),
+        spot_boxes=spot_boxes.astype(np.int32),
+    )
+
+
+def analyze_contour(contour, original_image, final_mask_ikan, hsv_img=None, to_full=(1, 1), rows=None,
+                    config=DEFAULT_CONFIG, timings=None, spot_workspace=None):
+    """
+    Analisis bentuk dan tekstur (CCL bintik) satu kontur; None jika bukan kandidat ikan.
+
+    Kanal V diambil dari `hsv_img` bila tersedia; jika tidak, HSV hanya
+    dihitung untuk ROI kontur dari `original_image`.
+
+    Pada mode piramida, `contour` dan `final_mask_ikan` berada di citra kecil
+    dan `to_full` = (fx, fy) faktor ke resolusi penuh. Area diskalakan ke
+    resolusi penuh, lalu deteksi bintik dijalankan pada ROI resolusi penuh
+    dengan mask tubuh yang diperbesar.
+
+    `rows` (mode tile) membangun mask bintik per strip ROI setinggi `rows`
+    baris, di buffer `spot_workspace` bila diberikan (lihat `spot_components`).
+    """
+    stage = (timings or NULL_TIMINGS).stage
+    fx, fy = to_full
+    if cv2.contourArea(contour) * fx * fy < config.min_fish_contour_area: return None
+
+    with stage("Analisis bentuk kontur"):
+        shape = contour_shape(contour, to_full)
+        if shape is None: return None
+        area, circularity, aspect_ratio, bbox = shape
+        bbox, body_mask_roi = fish_body_roi(bbox, final_mask_ikan, original_image.shape, to_full)
+
+    with stage("CCL bintik") as record:
+        spot_stats = spot_components(original_image, body_mask_roi, bbox, hsv_img, rows, config, spot_workspace)
+        record.note(body_mask_roi, spot_stats)
+        return classify_spots(spot_stats, area, circularity, aspect_ratio, bbox, config)
+
+
+def summarize_fishes(result):
+    """Isi metrik tingkat atas dan kalimat vonis `result` dari `result.fishes`."""
+    if result.fishes:
+        strongest = max(result.fishes, key=lambda fish: fish.spot_percent)
+        result.total_spot_area = strongest.total_spot_area
+        result.fish_area = strongest.area
+        result.is_kerapu_sunu = strongest.is_kerapu_sunu
+    result.spot_percent = (result.total_spot_area / result.fish_area * 100) if result.fish_area > 0 else 0
+    result.result_text = format_result_text(result)
+    return result
+
+
+def render_masked_fish(original_image, final_mask_ikan):
+    """Langkah 7: ikan tersegmentasi dengan background hitam."""
+    return cv2.bitwise_and(original_image, original_image, mask=final_mask_ikan)
+
+
+def render_spot_visual(shape, fishes):
+    """Langkah 8: bounding box setiap bintik yang dihitung, di atas kanvas hitam."""
+    spot_detection_visual = np.zeros(shape, np.uint8)
+    boxes = [fish.spot_boxes for fish in fishes if len(fish.spot_boxes)]
+    if boxes:
+        # Satu panggilan polylines (4 titik tertutup per kotak) identik dengan cv2.rectangle tebal 1
+        sx, sy, sw, sh = np.concatenate(boxes).T
+        corners = np.stack([np.c_[sx, sy], np.c_[sx + sw, sy], np.c_[sx + sw, sy + sh], np.c_[sx, sy + sh]], axis=1)
+        cv2.polylines(spot_detection_visual, list(corners.astype(np.int32)), True, (0, 0, 255), 1)
+    return spot_detection_visual
+
+
+def render_detections(original_image, fishes):
+    """Langkah 9: kotak dan label untuk setiap ikan yang terdeteksi sebagai Kerapu Sunu."""
+    detected_img = original_image.copy()
+    for fish in fishes:
+        if not fish.is_kerapu_sunu:
+            continue
+        x, y, w, h = fish.bbox
+        cv2.rectangle(detected_img, (x, y), (x + w, y + h), (0, 255, 0), 2)
+        cv2.putText(detected_img, f'K. SUNU ({fish.spot_percent:.2f}%)', (x, y - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+    return detected_img
+
+
+class LazySteps(Mapping):
+    """
+    Pengganti dict `steps` untuk mode `keep_steps=False`.
+
+    Hanya menyimpan citra input, mask ikan final, dan hasil per ikan; citra
+    langkah lain baru dibuat (lalu di-cache) ketika benar-benar diakses,
+    misalnya oleh slot GUI atau laporan.
+
+    `masks` (indeks langkah -> mask) mengisi cache di awal, misalnya dengan
+    mask langkah 2-5 yang dipulihkan dari `result_cache`.
+    """
+
+    def __init__(self, original_image, final_mask_ikan, fishes, scale=1, masks=None, config=DEFAULT_CONFIG):
+        self._original_image = original_image
+        self._final_mask_ikan = final_mask_ikan
+        self._fishes = fishes
+        self._scale = scale
+        self._config = config
+        self._cache = {STEP_TITLES[0]: original_image, STEP_TITLES[5]: final_mask_ikan}
+        for index, mask in (masks or {}).items():
+            self._cache[STEP_TITLES[index]] = mask
+
+    def __getitem__(self, title):
+        if title not in self._cache:
+            self._cache[title] = self._materialize(STEP_TITLES.index(title))
+        return self._cache[title]
+
+    def __iter__(self):
+        return iter(STEP_TITLES)
+
+    def __len__(self):
+        return len(STEP_TITLES)
+
+    def is_materialized(self, title):
+        return title in self._cache
+
+    def _materialize(self, index):
+        image = self._original_image
+        if index in (1, 2, 3):
+            # Langkah 2-4 dihitung ulang sekaligus dari citra input (pada skala segmentasi)
+            gray_img = cv2.cvtColor(downscale(image, self._scale), cv2.COLOR_BGR2GRAY)
+            for i, mask in zip((1, 2, 3), segment_object(gray_img, scale=self._scale, config=self._config)):
+                self._cache[STEP_TITLES[i]] = mask
+            return self._cache[STEP_TITLES[index]]
+        if index == 4:
+            hsv_img = cv2.cvtColor(downscale(image, self._scale), cv2.COLOR_BGR2HSV)
+            return red_color_mask(hsv_img, ranges=self._config.red_hsv_ranges)
+        if index == 6:
+            return render_masked_fish(image, upscale_mask(self._final_mask_ikan, image.shape))
+        if index == 7:
+            return render_spot_visual(image.shape, self._fishes)
+        return render_detections(image, self._fishes)
+
+
+def detect(original_image, on_step=None, is_cancelled=None, keep_steps=True, workspace=None,
+           crop_to_object=True, color_lut=False, pyramid_scale=1, memory_budget=None,
+           contour_workers=None, config=None, timings=None):
+    """
+    Menjalankan 9 langkah PCD pada citra BGR dan mengembalikan `DetectionResult`.
+
+    `on_step(index, title, image)` dipanggil setiap kali satu langkah selesai
+    (dipakai GUI untuk mengisi slot gambar secara bertahap). `is_cancelled()`
+    diperiksa di antara langkah; jika True, `DetectionCancelled` dilempar.
+
+    Dengan `keep_steps=False` hanya data yang dibutuhkan vonis yang dihitung;
+    `result.steps` menjadi `LazySteps` dan `on_step` tidak dipanggil.
+
+    `workspace` (lihat `workspace_for`) memakai ulang buffer antar-frame
+    beresolusi sama. Citra yang disimpan di hasil selalu disalin keluar dari
+    workspace bersama, sehingga aman ditimpa oleh frame berikutnya.
+
+    Dengan `crop_to_object=True` pemilihan komponen terbesar, Fill Holes dan
+    AND mask objek hanya dijalankan pada ROI (bbox objek + `ROI_MARGIN`);
+    hasilnya identik dengan citra penuh.
+
+    Dengan `color_lut=True` mask warna dibuat dari tabel BGR (`red_color_lut`)
+    dan HSV hanya dihitung di ROI tiap kontur; hasilnya identik.
+
+    `pyramid_scale` < 1 mengaktifkan mode piramida: segmentasi tubuh ikan
+    (langkah 2-6) dijalankan pada citra yang diperkecil dengan ukuran kernel
+    dan `min_fish_contour_area` yang ikut diskalakan; deteksi bintik tetap di
+    resolusi penuh di dalam ROI ikan. Hasilnya aproksimasi, tidak identik.
+
+    `memory_budget` (byte) mengaktifkan mode tile untuk citra sangat besar:
+    tahap per-piksel (threshold adaptif, mask warna, CLOSE) dijalankan per
+    strip horizontal dengan halo yang cukup agar hasilnya identik, sedangkan
+    CCL, Fill Holes dan kontur bekerja pada mask global 1 byte/piksel.
+    Buffer HSV/gray/blur seukuran frame di workspace tetap dipesan
+    (`np.empty`), tetapi tidak pernah ditulis, jadi tidak menambah memori
+    resident. Kandidat ikan dianalisis serial, dan mask serta label CCL
+    bintik memakai ulang buffer `color_mask`/`labels` workspace. Anggaran
+    mencakup frame input; di bawah `min_memory_budget` (~14 B/piksel)
+    ValueError dilempar.
+
+    Kandidat ikan (kontur yang lolos batas area) dianalisis paralel di
+    `contour_pool` dengan `contour_workers` thread (default `CONTOUR_WORKERS`;
+    1 = serial). Setiap ikan menghasilkan satu `FishResult` di `result.fishes`.
+
+    `config` (`DetectionConfig`, default `DEFAULT_CONFIG`) berisi semua
+    ambang dan ukuran kernel; ikut disimpan di `result.config`.
+
+    `timings` (`profiling.StageTimings`) mencatat waktu, alokasi memori dan
+    ukuran array setiap tahap; ikut disimpan di `result.timings`.
+    """
+    if not 0 < pyramid_scale <= 1:
+        raise ValueError(f"pyramid_scale harus di (0, 1], bukan {pyramid_scale}")
+    if config is None:
+        config = DEFAULT_CONFIG
+    result = DetectionResult(config=config, timings=timings)
+    stage = (timings or NULL_TIMINGS).stage
+    steps = result.steps
+    shared_workspace = workspace is not None
+    if workspace is None:
+        workspace = Workspace(original_image.shape)
+    elif not workspace.fits(original_image.shape):
+        raise ValueError(f"Workspace {workspace.shape} tidak cocok untuk citra {original_image.shape[:2]}")
+    # Citra kerja untuk segmentasi (sama dengan input bila pyramid_scale = 1)
+    work_image = downscale(original_image, pyramid_scale)
+    work_shape = work_image.shape
+    to_full = (original_image.shape[1] / work_shape[1], original_image.shape[0] / work_shape[0])
+    ws = workspace.view(work_shape)
+
+    def emit(index, image):
+        if is_cancelled is not None and is_cancelled():
+            raise DetectionCancelled()
+        if not keep_steps:
+            return
+        steps[STEP_TITLES[index]] = image
+        if on_step is not None:
+            on_step(index, STEP_TITLES[index], image)
+
+    emit(0, original_image)
+    shape = work_shape
+
+    rows = None
+    if memory_budget is not None:
+        # Frame input (dan citra piramida) ikut dihitung dalam anggaran
+        fixed_bytes = original_image.nbytes
+        if work_image is not original_image:
+            # ROI bintik resolusi penuh bisa lebih besar dari buffer citra kerja yang sudah terpakai
+            full_pixels = original_image.shape[0] * original_image.shape[1]
+            fixed_bytes += work_image.nbytes + (full_pixels - shape[0] * shape[1]) * TILE_SPOT_BYTES_PER_PIXEL
+        rows = tile_rows(shape, memory_budget, fixed_bytes)
+
+    # 0. Pra-proses Umum
+    # 1. TAHAP SEGMENTASI OBJEK AWAL (Adaptive Thresholding)
+    with stage("Blur + threshold adaptif") as record:
+        if rows is not None:
+            initial_mask = tiled_initial_mask(work_image, ws.initial_mask, rows, pyramid_scale, config)
+        else:
+            gray_img = cv2.cvtColor(work_image, cv2.COLOR_BGR2GRAY, dst=ws.gray)
+            initial_mask = threshold_object(gray_img, ws.initial_mask, ws.blur, pyramid_scale, config)
+        record.note(work_image, initial_mask)
+    if keep_steps:
+        emit(1, initial_mask.copy() if shared_workspace else initial_mask)
+
+
+    # 2. TAHAP PEMURNIAN MASK (Pilih Komponen Terbesar)
+    # CCL dan Fill Holes cukup dijalankan di ROI sekitar bbox komponen terbesar
+    with stage("Komponen terbesar (CCL)") as record:
+        labels, largest_label, bbox = find_largest_component(initial_mask, ws.labels)
+        roi = object_roi(bbox, shape) if crop_to_object else (0, 0, shape[1], shape[0])
+        x0, y0, x1, y1 = roi
+        rws = ws.view((y1 - y0, x1 - x0))
+
+        largest_component_mask = rws.largest_mask
+        if largest_label:
+            cv2.compare(labels[y0:y1, x0:x1], largest_label, cv2.CMP_EQ, dst=largest_component_mask)
+        else:
+            largest_component_mask[:] = 0
+        record.note(labels, largest_component_mask)
+    if keep_steps:
+        emit(2, paste_roi(largest_component_mask, roi, shape))
+
+
+    # 3. TAHAP PERBAIKAN MASK (Fill Holes)
+    with stage("Fill holes (flood fill)") as record:
+        final_object_mask = fill_holes(largest_component_mask, out=rws.object_mask, floodfill=rws.floodfill)
+        record.note(final_object_mask)
+    if keep_steps:
+        emit(3, paste_roi(final_object_mask, roi, shape, fill=255))
+
+
+    # 4. TAHAP SEGMENTASI WARNA MURNI (HSV Filtering)
+    with stage("Mask warna HSV") as record:
+        if rows is not None:
+            hsv_img = None
+            hsv_color_mask = tiled_color_mask(work_image, ws.color_mask, rows, color_lut, config.red_hsv_ranges)
+        elif color_lut:
+            hsv_img = None
+            hsv_color_mask = red_color_mask_lut(work_image, ws, config.red_hsv_ranges)
+        else:
+            hsv_img = cv2.cvtColor(work_image, cv2.COLOR_BGR2HSV, dst=ws.hsv)
+            hsv_color_mask = red_color_mask(hsv_img, ws, config.red_hsv_ranges)
+        record.note(hsv_img, hsv_color_mask)
+    if keep_steps:
+        emit(4, hsv_color_mask.copy())
+
+
+    # 6. TAHAP SEGMENTASI WARNA FINAL (Gabungan)
+    # Mask objek bernilai 255 di luar ROI, jadi AND cukup dilakukan (in-place) di dalam ROI
+    with stage("AND mask + close") as record:
+        color_roi = hsv_color_mask[y0:y1, x0:x1]
+        color_roi &= final_object_mask
+        close_size = scaled_ksize(config.close_size, pyramid_scale)
+        kernel = np.ones((close_size, close_size), np.uint8)
+        if rows is not None:
+            final_mask_ikan = tiled_close(hsv_color_mask, ws.fish_mask, rows, kernel)
+        else:
+            final_mask_ikan = cv2.morphologyEx(hsv_color_mask, cv2.MORPH_CLOSE, kernel, dst=ws.fish_mask)
+        record.note(final_mask_ikan)
+    if keep_steps:
+        emit(5, final_mask_ikan.copy() if shared_workspace else final_mask_ikan)
+
+        # 7. Ikan Tersegmentasi (Masked)
+        with stage("Render visual"):
+            emit(6, render_masked_fish(original_image, upscale_mask(final_mask_ikan, original_image.shape)))
+
+    # Kanal V untuk bintik harus resolusi penuh; pada mode piramida HSV dihitung per ROI
+    if pyramid_scale != 1:
+        hsv_img = None
+
+
+    # --- Analisis Bentuk dan Tekstur (CCL Bintik) ---
+    with stage("Kontur") as record:
+        contours, _ = cv2.findContours(final_mask_ikan, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        # Saring kontur kecil (noise) dulu agar hanya kandidat ikan yang masuk thread pool
+        min_work_area = config.min_fish_contour_area / (to_full[0] * to_full[1])
+        candidates = [c for c in contours if cv2.contourArea(c) >= min_work_area]
+        record.note(*candidates)
+
+    def analyze(contour):
+        if is_cancelled is not None and is_cancelled():
+            raise DetectionCancelled()
+        return analyze_contour(contour, original_image, final_mask_ikan, hsv_img, to_full, rows, config, timings,
+                               spot_workspace)
+
+    workers = CONTOUR_WORKERS if contour_workers is None else contour_workers
+    spot_workspace = None
+    if rows is not None:
+        # Mask warna (langkah 5 sudah disalin) dan label CCL objek sudah bebas: pakai untuk bintik, satu ikan
+        # per kali agar anggaran memori tetap berlaku
+        spot_workspace = workspace
+        workers = 1
+    if workers > 1 and len(candidates) > 1:
+        analyses = contour_pool(workers).map(analyze, candidates)
+    else:
+        analyses = map(analyze, candidates)
+    result.fishes = [fish for fish in analyses if fish is not None]
+
+    if keep_steps:
+        with stage("Render visual"):
+            # 8. Visualisasi Bintik Deteksi
+            emit(7, render_spot_visual(original_image.shape, result.fishes))
+
+            # 9. Hasil Deteksi Akhir
+            emit(8, render_detections(original_image, result.fishes))
+    else:
+        if shared_workspace:
+            final_mask_ikan = final_mask_ikan.copy()
+        result.steps = LazySteps(original_image, final_mask_ikan, result.fishes, pyramid_scale, config=config)
+
+    return summarize_fishes(result)
+
+
+def format_result_text(result):
+    """Kalimat vonis yang ditampilkan di GUI, laporan, dan CLI."""
+    min_percent = result.config.min_total_spot_area_percent
+    if result.is_kerapu_sunu:
+        text = f"DETEKSI BERHASIL: Bintik terang ({result.spot_percent:.2f}%) memenuhi kriteria {min_percent}%."
+    else:
+        text = f"DETEKSI GAGAL: Total area bintik terang ({result.spot_percent:.2f}%) di bawah {min_percent}% atau bentuk tidak cocok."
+    if len(result.fishes) > 1:
+        n_sunu = sum(fish.is_kerapu_sunu for fish in result.fishes)
+        text += f" ({n_sunu} dari {len(result.fishes)} ikan adalah Kerapu Sunu.)"
+    return text
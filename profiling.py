@@ -0,0 +1,154 @@
+"""
+Instrumentasi per tahap pipeline: waktu, alokasi memori, dan ukuran array.
+
+    timings = StageTimings()
+    result = pipeline.detect(image, timings=timings)
+    print(timings.format_table())
+    timings.to_csv("tahap.csv")
+
+Alokasi diukur dengan `tracemalloc` (NumPy melaporkan alokasinya ke sana,
+termasuk array keluaran OpenCV). Tracing hanya aktif selama ada tahap yang
+sedang diukur, karena memperlambat alokasi Python lain. Saat analisis ikan
+berjalan paralel, angka memori tahap yang tumpang-tindih bisa bercampur.
+"""
+import contextlib
+import csv
+import json
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+
+_trace_lock = threading.Lock()
+_trace_users = 0
+
+
+@dataclass
+class StageRecord:
+    """Satu pengukuran tahap."""
+    name: str
+    seconds: float = 0.0
+    bytes_allocated: int = 0  # puncak alokasi baru selama tahap (0 jika memori tidak diukur)
+    shapes: list = field(default_factory=list)
+
+    def note(self, *arrays):
+        """Catat ukuran array keluaran tahap."""
+        self.shapes.extend(tuple(a.shape) for a in arrays if a is not None)
+
+
+class _NullRecord:
+    def note(self, *arrays):
+        pass
+
+
+class NullTimings:
+    """Pengganti `StageTimings` saat instrumentasi tidak diminta (tanpa overhead berarti)."""
+    _record = _NullRecord()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        yield self._record
+
+    def add(self, record):
+        pass
+
+
+NULL_TIMINGS = NullTimings()
+
+
+def _start_trace():
+    global _trace_users
+    with _trace_lock:
+        if _trace_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _trace_users = 1
+        elif _trace_users:
+            _trace_users += 1
+        # tracing milik pihak lain (mis. debugger): dipakai tanpa dihitung
+
+
+def _stop_trace():
+    global _trace_users
+    with _trace_lock:
+        if _trace_users:
+            _trace_users -= 1
+            if _trace_users == 0:
+                tracemalloc.stop()
+
+
+class StageTimings:
+    """Kumpulan `StageRecord` dari satu (atau beberapa) kali deteksi; aman dipakai dari banyak thread."""
+
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.records = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        record = StageRecord(name)
+        if self.trace_memory:
+            _start_trace()
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - start
+            if self.trace_memory:
+                record.bytes_allocated = max(0, tracemalloc.get_traced_memory()[1] - base)
+                _stop_trace()
+            self.add(record)
+
+    def add(self, record):
+        with self._lock:
+            self.records.append(record)
+
+    @property
+    def total_seconds(self):
+        return sum(r.seconds for r in self.records)
+
+    def totals(self):
+        """Agregat per nama tahap (urutan kemunculan): `{nama: (jumlah, detik, puncak byte)}`."""
+        totals = {}
+        for r in self.records:
+            count, seconds, peak = totals.get(r.name, (0, 0.0, 0))
+            totals[r.name] = (count + 1, seconds + r.seconds, max(peak, r.bytes_allocated))
+        return totals
+
+    def to_rows(self):
+        return [dict(asdict(r), shapes=";".join("x".join(map(str, s)) for s in r.shapes)) for r in self.records]
+
+    def to_json(self, path):
+        with open(path, "w") as f:
+            json.dump({"total_seconds": self.total_seconds, "stages": [asdict(r) for r in self.records]}, f, indent=2)
+
+    def to_csv(self, path):
+        _write_csv(self.to_rows(), path)
+
+    def format_table(self):
+        """Tabel teks ringkas (dipakai panel hasil GUI)."""
+        lines = [f"{'Tahap':<26}{'ms':>9}{'MB':>8}"]
+        for name, (count, seconds, peak) in self.totals().items():
+            label = f"{name} (x{count})" if count > 1 else name
+            lines.append(f"{label:<26}{seconds * 1000:>9.1f}{peak / 2**20:>8.1f}")
+        lines.append(f"{'Total':<26}{self.total_seconds * 1000:>9.1f}")
+        return "\n".join(lines)
+
+
+def dump_rows(rows, path):
+    """Tulis baris `to_rows()` (boleh dengan kolom tambahan) ke JSON atau CSV, sesuai ekstensi `path`."""
+    if path.lower().endswith(".json"):
+        with open(path, "w") as f:
+            json.dump(rows, f, indent=2)
+    else:
+        _write_csv(rows, path)
+
+
+def _write_csv(rows, path):
+    fieldnames = list(rows[0]) if rows else ["name", "seconds", "bytes_allocated", "shapes"]
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
@@ -0,0 +1,320 @@
+"""
+Pembuatan Laporan HTML (9 Langkah Visual + CSS) tanpa ketergantungan Qt,
+sehingga bisa dijalankan di worker thread GUI maupun dari CLI.
+
+Citra langkah di-encode paralel (OpenCV melepas GIL saat `imencode`) dan
+diperkecil ke ukuran tampilan (`ReportImageOptions.max_side`). HTML ditulis
+ke disk per bagian, tidak disusun sebagai satu string besar. Dengan
+`assets="files"` citra disimpan sebagai file terpisah di folder
+`<nama laporan>_files/` dan HTML hanya merujuknya, sehingga laporan ringan
+dibuka dan tidak ada inflasi base64.
+"""
+import base64
+import datetime
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from urllib.parse import quote
+
+import cv2
+import numpy as np
+
+from pipeline import DEFAULT_CONFIG
+
+# format -> (ekstensi, tipe MIME)
+IMAGE_FORMATS = {
+    "jpeg": (".jpg", "image/jpeg"),
+    "png": (".png", "image/png"),
+    "webp": (".webp", "image/webp"),
+}
+ASSET_MODES = ("inline", "files")
+
+
+@dataclass(frozen=True)
+class ReportImageOptions:
+    """Cara citra langkah disimpan di laporan."""
+    max_side: int = 960          # sisi terpanjang (px); None = resolusi asli. CSS menampilkan maks. 300 px tinggi
+    color_format: str = "jpeg"   # citra BGR
+    mask_format: str = "png"     # mask biner / grayscale (lossless, kecil untuk mask)
+    quality: int = 90            # kualitas JPEG/WebP (1-100)
+    png_compression: int = 3     # 0 (cepat) - 9 (kecil)
+
+
+DEFAULT_IMAGE_OPTIONS = ReportImageOptions()
+
+STEP_SECTIONS = (
+    ('1. Input Citra (A)',
+     '<strong>Analisa:</strong> Citra RGB masukan.',
+     'Input Citra'),
+    ('2. Segmentation Awal (Adaptif) (B)',
+     '<strong>Analisa:</strong> Segmentasi objek awal menggunakan **Adaptive Thresholding**. Metode ini mengatasi masalah pencahayaan tidak merata, menghasilkan mask *foreground* kasar.',
+     'Segmentation Awal Adaptif'),
+    ('3. Objek Terbesar (CCL) (C)',
+     '<strong>Analisa:</strong> Menggunakan **Connected Component Labeling (CCL)** untuk mengisolasi dan mempertahankan hanya **objek terbesar** (ikan). Ini membuang *noise* dan objek kecil dari *background*.',
+     'Objek Terbesar CCL'),
+    ('4. Fill Holes (Mask Objek) (D)',
+     '<strong>Analisa:</strong> Mask diperbaiki menggunakan **Flood Fill** untuk menutup lubang (*Fill Holes*). Mask ini kini menjadi batasan (Constraint) yang bersih untuk filtering warna.',
+     'Fill Holes Mask Objek'),
+    ('5. Mask Warna Murni (HSV) (E)',
+     '<strong>Analisa:</strong> **Thresholding HSV** (Warna Merah/Oranye) diterapkan secara **murni** pada citra asli untuk menunjukkan seberapa banyak *noise* yang ada di *background* sebelum *masking* ganda.',
+     'Mask Warna Murni HSV'),
+    ('6. Mask Warna Ikan (Final) (F)',
+     '<strong>Analisa:</strong> Mask Warna Murni (E) digabungkan (**bitwise AND**) dengan Mask Objek (D). Operasi ini memverifikasi warna dan secara efektif menghilangkan *noise* warna dari *background*.',
+     'Mask Warna Ikan Final'),
+    ('7. Ikan Tersegmentasi (Masked) (G)',
+     '<strong>Analisa:</strong> Mask Warna Final (F) diterapkan pada citra RGB asli. Hasilnya adalah ikan yang terisolasi dengan *background* hitam, siap untuk analisis bentuk dan deteksi bintik.',
+     'Ikan Tersegmentasi Masked'),
+    ('8. Deteksi Bintik (Visualisasi) (H)',
+     '<strong>Analisa:</strong> Bintik dideteksi dari piksel **Kecerahan Tinggi** menggunakan **CCL** (Area Kontur). **Masking Ganda** memastikan bintik hanya dihitung di dalam tubuh ikan. <br><br> Total Area Bintik Terukur: <strong>{current_spot_percent:.2f}%</strong>. <br> Ambang Batas Minimum: <strong>{min_spot_percent:.2f}%</strong>.',
+     'Bintik Terdeteksi Visual'),
+    ('9. Hasil Deteksi Akhir (I)',
+     '<strong>Kriteria Deteksi Final:</strong> <ul> <li>**Bentuk:** Circularity & Aspect Ratio ikan harus cocok.</li> <li>**Tekstur (CCL):** Total area bintik terang yang diukur harus melebihi ambang batas minimum.</li> </ul>',
+     'Hasil Deteksi Akhir'),
+)
+
+
+def display_image(cv_img, max_side):
+    """Perkecil citra agar sisi terpanjangnya <= `max_side` (mask memakai nearest agar tetap biner)."""
+    if cv_img.dtype != np.uint8:
+        cv_img = cv2.normalize(cv_img, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8) # type: ignore
+    h, w = cv_img.shape[:2]
+    if max_side is None or max(h, w) <= max_side:
+        return cv_img
+    scale = max_side / max(h, w)
+    interpolation = cv2.INTER_AREA if cv_img.ndim == 3 else cv2.INTER_NEAREST
+    return cv2.resize(cv_img, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=interpolation)
+
+
+def encode_image(cv_img, options=DEFAULT_IMAGE_OPTIONS):
+    """Citra -> `(bytes, ekstensi, MIME)` sesuai `options`; None jika citra kosong."""
+    if cv_img is None:
+        return None
+    cv_img = display_image(cv_img, options.max_side)
+    image_format = options.color_format if cv_img.ndim == 3 else options.mask_format
+    ext, mime_type = IMAGE_FORMATS[image_format]
+    if image_format == "jpeg":
+        params = [cv2.IMWRITE_JPEG_QUALITY, options.quality]
+    elif image_format == "webp":
+        params = [cv2.IMWRITE_WEBP_QUALITY, options.quality]
+    else:
+        params = [cv2.IMWRITE_PNG_COMPRESSION, options.png_compression]
+    ok, buffer = cv2.imencode(ext, cv_img, params)
+    if not ok:
+        raise ValueError(f"Gagal meng-encode citra sebagai {image_format}")
+    return buffer.tobytes(), ext, mime_type
+
+
+def encode_images(step_images, options=DEFAULT_IMAGE_OPTIONS, workers=None):
+    """Encode semua citra langkah secara paralel; urutan hasil sama dengan `step_images`."""
+    workers = workers or min(len(step_images), os.cpu_count() or 1) or 1
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="laporan") as pool:
+        return list(pool.map(lambda img: encode_image(img, options), step_images))
+
+
+def _data_uri(encoded):
+    if encoded is None:
+        return ""
+    data, _, mime_type = encoded
+    return f"data:{mime_type};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+def timing_table_html(timings):
+    """Tabel HTML waktu & memori per tahap (`profiling.StageTimings`); kosong jika tidak diukur."""
+    if timings is None or not timings.records:
+        return ""
+    rows = "".join(
+        f"<tr><td>{name}</td><td>{count}</td><td>{seconds * 1000:.1f}</td><td>{peak / 2**20:.1f}</td></tr>"
+        for name, (count, seconds, peak) in timings.totals().items()
+    )
+    return f"""
+            <div class="step">
+                <h2>Waktu Pemrosesan per Tahap</h2>
+                <table class="timing">
+                    <tr><th>Tahap</th><th>Jumlah</th><th>Waktu (ms)</th><th>Alokasi Puncak (MB)</th></tr>
+                    {rows}
+                    <tr><th>Total</th><th></th><th>{timings.total_seconds * 1000:.1f}</th><th></th></tr>
+                </table>
+            </div>"""
+
+
+def _head_html(result_text_final):
+    return f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Laporan Deteksi Ikan Kerapu Sunu</title>
+        <link href="https://fonts.googleapis.com/css2?family=Open+Sans:wght@400;600;700&display=swap" rel="stylesheet">
+        <style>
+            :root {{
+                --primary-color: #00796b; 
+                --secondary-color: #004d40; 
+                --accent-color: #ff9800; 
+                --background-light: #f4f6f8;
+            }}
+            body {{ 
+                font-family: 'Open Sans', sans-serif; 
+                margin: 0; 
+                padding: 0;
+                background-color: var(--background-light);
+                line-height: 1.6;
+            }}
+            .container {{
+                max-width: 1100px;
+                margin: 40px auto;
+                padding: 40px;
+                background-color: white;
+                border-radius: 12px;
+                box-shadow: 0 15px 40px rgba(0, 0, 0, 0.15);
+            }}
+            h1 {{ 
+                color: var(--secondary-color); 
+                border-bottom: 4px solid var(--primary-color); 
+                padding-bottom: 15px; 
+                text-align: center;
+                font-weight: 800;
+                margin-bottom: 40px;
+            }}
+            h2 {{ 
+                color: var(--primary-color); 
+                margin-top: 30px;
+                border-left: 5px solid var(--accent-color);
+                padding-left: 15px;
+                font-weight: 700;
+            }}
+            .step {{ 
+                margin-bottom: 40px; 
+                padding: 20px;
+                border-radius: 8px;
+                box-shadow: 0 4px 12px rgba(0, 0, 0, 0.05);
+                background-color: white;
+                border: 1px solid #eee;
+            }}
+            .step-content {{
+                display: flex;
+                flex-direction: row;
+                gap: 30px;
+                margin-top: 20px;
+            }}
+            .analysis {{ 
+                flex: 1;
+                background-color: #e8f5e9; 
+                padding: 20px; 
+                border-radius: 6px;
+                border: 1px solid #c8e6c9;
+                font-size: 1em;
+            }}
+            .image-container {{
+                flex: 1;
+                display: flex;
+                align-items: center;
+                justify-content: center;
+                min-height: 200px;
+            }}
+            .image-container img {{ 
+                max-width: 100%; 
+                max-height: 300px;
+                height: auto; 
+                display: block; 
+                border: 3px solid var(--primary-color); 
+                border-radius: 6px;
+                box-shadow: 0 4px 8px rgba(0, 0, 0, 0.15);
+            }}
+            .final-result {{
+                padding: 20px;
+                background-color: #f0f8ff; 
+                border: 2px solid var(--primary-color);
+                border-radius: 8px;
+                text-align: center;
+                font-size: 1.1em;
+                font-weight: 600;
+            }}
+            .timing {{
+                width: 100%;
+                border-collapse: collapse;
+                margin-top: 15px;
+            }}
+            .timing th, .timing td {{
+                padding: 6px 12px;
+                border-bottom: 1px solid #eee;
+                text-align: right;
+            }}
+            .timing th:first-child, .timing td:first-child {{ text-align: left; }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <h1>Laporan Proyek Akhir Mata Kuliah PCD: Deteksi Ikan Kerapu Sunu</h1>
+            <p><strong>Waktu Proses:</strong> {datetime.datetime.now().strftime("%d-%m-%Y %H:%M:%S")}</p>
+            <div class="final-result">
+                <strong>STATUS DETEKSI:</strong> {result_text_final}
+            </div>
+"""
+
+
+def _step_html(heading, analysis, src, alt):
+    return f"""
+            <div class="step">
+                <h2>{heading}</h2>
+                <div class="step-content">
+                    <div class="analysis">{analysis}</div>
+                    <div class="image-container"><img src="{src}" alt="{alt}"></div>
+                </div>
+            </div>
+"""
+
+
+def _tail_html(timings):
+    return f"""
+            {timing_table_html(timings)}
+        </div>
+    </body>
+    </html>
+    """
+
+
+def iter_report_html(image_sources, result_text_final, current_spot_percent, config=DEFAULT_CONFIG, timings=None):
+    """Bagian-bagian HTML laporan; `image_sources` = 9 nilai atribut `src` (data URI atau path relatif)."""
+    yield _head_html(result_text_final)
+    for (heading, analysis, alt), src in zip(STEP_SECTIONS, image_sources):
+        analysis = analysis.format(current_spot_percent=current_spot_percent,
+                                   min_spot_percent=config.min_total_spot_area_percent)
+        yield _step_html(heading, analysis, src, alt)
+    yield _tail_html(timings)
+
+
+def assets_dir_for(file_path):
+    """Folder citra side-car untuk laporan `file_path` (mis. `laporan.html` -> `laporan_files/`)."""
+    return os.path.splitext(file_path)[0] + "_files"
+
+
+def write_report(file_path, step_images, result_text_final, current_spot_percent, config=DEFAULT_CONFIG,
+                 timings=None, image_options=DEFAULT_IMAGE_OPTIONS, assets="inline"):
+    """
+    Tulis laporan ke `file_path`. `assets="inline"`: citra base64 di dalam HTML
+    (satu file); `assets="files"`: citra di folder `assets_dir_for(file_path)`.
+    """
+    if assets not in ASSET_MODES:
+        raise ValueError(f"assets harus salah satu dari {ASSET_MODES}, bukan {assets!r}")
+    encoded_images = encode_images(step_images, image_options)
+
+    if assets == "files":
+        assets_dir = assets_dir_for(file_path)
+        os.makedirs(assets_dir, exist_ok=True)
+        sources = []
+        for index, encoded in enumerate(encoded_images, start=1):
+            if encoded is None:
+                sources.append("")
+                continue
+            data, ext, _ = encoded
+            name = f"langkah_{index}{ext}"
+            with open(os.path.join(assets_dir, name), "wb") as f:
+                f.write(data)
+            sources.append(quote(f"{os.path.basename(assets_dir)}/{name}"))
+    else:
+        # Data URI dibuat per langkah saat ditulis, bukan sekaligus
+        sources = (_data_uri(encoded) for encoded in encoded_images)
+
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for chunk in iter_report_html(sources, result_text_final, current_spot_percent, config, timings):
+            f.write(chunk)
+    return file_path
@@ -0,0 +1,214 @@
+"""
+Cache hasil deteksi berbasis hash isi citra.
+
+Kunci = hash SHA-256 dari piksel citra + `pipeline.parameter_fingerprint(config)`
++ opsi `detect` yang memengaruhi hasil. Entri adalah `result_store.CompactResult`:
+vonis, metrik per ikan, kotak bintik, serta mask biner langkah 2-6 yang
+dikompresi (run-length atau bit-pack). Citra langkah 1 dan 7-9 dirender ulang
+dari citra input, jadi pada cache hit tidak ada tahap pipeline yang dijalankan
+ulang.
+
+Entri disimpan di LRU memori dan (opsional) di folder disk berukuran terbatas;
+file yang paling lama tidak dipakai dihapus lebih dulu. Cache disk bersifat
+best-effort: folder yang tidak bisa dibuat atau ditulis (HOME read-only, disk
+penuh) hanya dicatat lewat `log`, lalu cache berjalan di memori saja.
+"""
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict
+
+import numpy as np
+
+import pipeline
+from pipeline import STEP_TITLES, DetectionCancelled
+from profiling import NULL_TIMINGS
+from result_store import MASK_STEPS, CompactResult
+
+FORMAT_VERSION = 2
+# Opsi `detect` yang mengubah hasil beserta nilai default-nya; opsi lain hasilnya identik
+RESULT_OPTIONS = {"pyramid_scale": 1}
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "deteksi_kerapu_sunu")
+DEFAULT_MAX_ENTRIES = 32
+DEFAULT_MAX_DISK_BYTES = 256 * 1024 * 1024
+
+
+def image_key(image, **detect_options):
+    """Kunci cache (hex) untuk citra `image` dengan opsi `detect_options`."""
+    options = tuple(float(detect_options.get(name, default)) for name, default in RESULT_OPTIONS.items())
+    config = detect_options.get("config") or pipeline.DEFAULT_CONFIG
+    # SHA-256 memakai instruksi SHA CPU modern: ~2-3x lebih cepat dari BLAKE2b untuk citra besar
+    digest = hashlib.sha256()
+    digest.update(repr((FORMAT_VERSION, pipeline.parameter_fingerprint(config), options,
+                        image.shape, str(image.dtype))).encode())
+    digest.update(np.ascontiguousarray(image).data)
+    return digest.hexdigest()
+
+
+def pack_entry(result, pyramid_scale=1):
+    """`DetectionResult` -> `result_store.CompactResult` (mask langkah 2-6 yang sudah ada, terkompresi)."""
+    return CompactResult.from_result(result, pyramid_scale)
+
+
+def has_all_steps(entry):
+    return entry.has_masks(MASK_STEPS)
+
+
+def unpack_entry(entry, image, config=None):
+    """Kebalikan `pack_entry`: bangun `DetectionResult` dengan `LazySteps` yang sudah berisi mask."""
+    return entry.to_result(image, config)
+
+
+class ResultCache:
+    """
+    LRU di memori (`max_entries` entri) dengan penyimpanan disk opsional.
+
+    Folder `directory` dibatasi `max_disk_bytes`; aman dipakai bersama oleh
+    beberapa thread maupun proses (file ditulis atomik lewat `os.replace`).
+    Bila folder gagal dibuat atau ditulis, `directory` menjadi None dan
+    pesannya dikirim ke `log`.
+    """
+
+    def __init__(self, directory=None, max_entries=DEFAULT_MAX_ENTRIES, max_disk_bytes=DEFAULT_MAX_DISK_BYTES,
+                 log=print):
+        self.directory = directory
+        self.log = log
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            try:
+                os.makedirs(directory, exist_ok=True)
+            except OSError as e:
+                self._disable_disk(e)
+
+    def _disable_disk(self, error):
+        """Cache disk gagal dipakai: lanjut dengan LRU memori saja (hasil deteksi tidak ikut gagal)."""
+        if self.directory:
+            self.log(f"Cache disk {self.directory} tidak bisa dipakai ({error}); cache hanya di memori")
+            self.directory = None
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key):
+        """Entri untuk `key` atau None. Entri dari disk ikut dimasukkan ke LRU memori."""
+        with self._lock:
+            entry = self._memory.pop(key, None)
+            if entry is not None:
+                self._memory[key] = entry
+                return entry
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                entry = CompactResult.from_bytes(data["record"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, struct.error, zipfile.BadZipFile):
+            # File rusak (mis. proses mati saat menulis versi lama): buang saja
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)  # tandai baru dipakai untuk urutan LRU disk
+        except OSError:
+            pass  # cache read-only: urutan LRU disk tidak diperbarui
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key, entry):
+        self._remember(key, entry)
+        if not self.directory:
+            return
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(f, record=np.frombuffer(entry.to_bytes(), np.uint8))
+            os.replace(tmp_path, self._path(key))
+            self._trim_disk()
+        except OSError as e:
+            if tmp_path is not None:
+                self._remove(tmp_path)
+            self._disable_disk(e)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.directory:
+            for name in os.listdir(self.directory):
+                if name.endswith(".npz"):
+                    self._remove(os.path.join(self.directory, name))
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._memory.pop(key, None)
+            self._memory[key] = entry
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _trim_disk(self):
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".npz"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # sudah dihapus proses lain, atau folder read-only
+
+    def detect(self, image, **detect_options):
+        """
+        Seperti `pipeline.detect`, tetapi hasil diambil dari cache bila ada.
+
+        Pada cache hit `on_step` tetap dipanggil untuk setiap langkah (citra
+        dirender dari entri cache) dan `timings` hanya berisi tahap "Cache
+        hit". Entri tanpa mask langkah 2-5 (hasil mode `keep_steps=False`)
+        dianggap miss bila pemanggil butuh citra langkah.
+        """
+        key = image_key(image, **detect_options)
+        keep_steps = detect_options.get("keep_steps", True)
+        entry = self.get(key)
+        if entry is not None and (has_all_steps(entry) or not keep_steps):
+            self.hits += 1
+            timings = detect_options.get("timings")
+            with (timings or NULL_TIMINGS).stage("Cache hit"):
+                result = unpack_entry(entry, image, detect_options.get("config"))
+                result.timings = timings
+                on_step = detect_options.get("on_step")
+                is_cancelled = detect_options.get("is_cancelled")
+                if keep_steps and on_step is not None:
+                    for index, title in enumerate(STEP_TITLES):
+                        if is_cancelled is not None and is_cancelled():
+                            raise DetectionCancelled()
+                        on_step(index, title, result.steps[title])
+            return result
+
+        self.misses += 1
+        result = pipeline.detect(image, **detect_options)
+        pyramid_scale = detect_options.get("pyramid_scale", RESULT_OPTIONS["pyramid_scale"])
+        self.put(key, pack_entry(result, pyramid_scale))
+        return result
@@ -0,0 +1,348 @@
+"""
+Bentuk ringkas hasil deteksi untuk diarsipkan dalam jumlah besar.
+
+    compact = CompactResult.from_result(result)        # vonis, metrik ikan, bbox bintik, mask terkompresi
+    data = compact.to_bytes()                          # biner ringkas (ratusan byte tanpa mask)
+    compact = CompactResult.from_bytes(data)
+    mask = compact.step_image(5)                       # mask langkah 6 didekode saat diminta
+    result = compact.to_result(image)                  # DetectionResult + LazySteps untuk semua langkah
+
+    save_archive("shift_1.npz", compacts)              # banyak hasil dalam satu .npz kolumnar
+    archive = load_archive("shift_1.npz")
+    archive[123].is_kerapu_sunu
+
+Metrik per ikan disimpan sebagai satu array NumPy terstruktur (`FISH_DTYPE`)
+dan semua kotak bintik sebagai satu array `(N, 4)` int32. Mask biner
+disimpan sebagai run-length (`"rle"`, panjang run uint32 bergantian 0/1,
+mulai dari 0) atau bit-packed (`"bits"`, `np.packbits`), dipilih yang lebih
+kecil: mask ikan yang berupa blob padat biasanya jauh lebih kecil sebagai
+RLE, mask noise adaptif lebih kecil sebagai bit. Citra langkah 1, 7 dan 9
+butuh citra input; langkah 8 cukup dari ukuran citra dan kotak bintik.
+"""
+import struct
+from dataclasses import dataclass, field
+
+import numpy as np
+
+import pipeline
+from pipeline import STEP_TITLES
+
+MAGIC = b"KSR1"
+# Indeks STEP_TITLES yang berupa mask biner (bisa disimpan di `CompactResult.masks`)
+MASK_STEPS = (1, 2, 3, 4, 5)
+MASK_ENCODINGS = ("rle", "bits")
+
+FISH_DTYPE = np.dtype([
+    ("bbox", "<i4", (4,)),
+    ("area", "<f8"),
+    ("circularity", "<f8"),
+    ("aspect_ratio", "<f8"),
+    ("total_spot_area", "<i8"),
+    ("spot_percent", "<f8"),
+    ("is_kerapu_sunu", "?"),
+    ("num_spots", "<i4"),
+])
+# Satu baris per hasil di arsip .npz; `fish_start`/`box_start`/`mask_start` adalah offset ke tabel lain
+RESULT_DTYPE = np.dtype([
+    ("is_kerapu_sunu", "?"),
+    ("spot_percent", "<f8"),
+    ("total_spot_area", "<i8"),
+    ("fish_area", "<f8"),
+    ("height", "<i4"),
+    ("width", "<i4"),
+    ("pyramid_scale", "<f8"),
+    ("fish_start", "<i8"),
+    ("box_start", "<i8"),
+    ("mask_start", "<i8"),
+])
+MASK_DTYPE = np.dtype([
+    ("step", "u1"),
+    ("encoding", "u1"),
+    ("height", "<i4"),
+    ("width", "<i4"),
+    ("offset", "<i8"),
+    ("nbytes", "<i8"),
+])
+
+# magic, vonis, spot %, luas bintik, luas ikan, tinggi, lebar, pyramid_scale, jumlah ikan, jumlah kotak, jumlah mask
+_HEADER = struct.Struct("<4s?dqdiidiiB")
+# langkah, encoding, tinggi, lebar, jumlah byte data
+_MASK_HEADER = struct.Struct("<BBiiq")
+
+
+def rle_encode(mask):
+    """Panjang run (uint32) mask biner yang diratakan per baris; run pertama selalu run 0."""
+    flat = np.ascontiguousarray(mask).reshape(-1) != 0
+    if flat.size == 0:
+        return np.zeros(0, np.uint32)
+    changes = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    runs = np.diff(np.concatenate(([0], changes, [flat.size])))
+    if flat[0]:
+        runs = np.concatenate(([0], runs))
+    return runs.astype(np.uint32)
+
+
+def rle_decode(runs, shape):
+    """Kebalikan `rle_encode`: mask uint8 0/255 berukuran `shape`."""
+    values = np.zeros(len(runs), np.uint8)
+    values[1::2] = 255
+    return np.repeat(values, runs).reshape(shape)
+
+
+@dataclass(frozen=True, slots=True)
+class EncodedMask:
+    """Mask biner terkompresi: `data` berisi run-length uint32 atau bit-packed uint8."""
+    shape: tuple
+    encoding: str
+    data: np.ndarray
+
+    @classmethod
+    def encode(cls, mask, encoding=None):
+        """Encode `mask` (nilai != 0 = objek); tanpa `encoding` dipilih yang hasilnya lebih kecil."""
+        shape = tuple(mask.shape[:2])
+        if encoding in (None, "rle"):
+            runs = rle_encode(mask)
+            # Lebih dari 1 run per 32 piksel: bit-packing lebih kecil (4 byte per run vs 1 bit per piksel)
+            if encoding == "rle" or runs.nbytes <= (mask.size + 7) // 8:
+                return cls(shape, "rle", runs)
+        elif encoding != "bits":
+            raise ValueError(f"encoding harus salah satu dari {MASK_ENCODINGS}, bukan {encoding!r}")
+        return cls(shape, "bits", np.packbits(np.ascontiguousarray(mask).reshape(-1) != 0))
+
+    def decode(self):
+        """Mask uint8 0/255."""
+        h, w = self.shape
+        if self.encoding == "rle":
+            return rle_decode(self.data, (h, w))
+        mask = np.unpackbits(self.data, count=h * w).reshape(h, w)
+        mask *= 255
+        return mask
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+
+def _fish_table(fishes):
+    table = np.zeros(len(fishes), FISH_DTYPE)
+    for row, fish in zip(table, fishes):
+        row["bbox"] = fish.bbox
+        row["area"] = fish.area
+        row["circularity"] = fish.circularity
+        row["aspect_ratio"] = fish.aspect_ratio
+        row["total_spot_area"] = fish.total_spot_area
+        row["spot_percent"] = fish.spot_percent
+        row["is_kerapu_sunu"] = fish.is_kerapu_sunu
+        row["num_spots"] = len(fish.spot_boxes)
+    return table
+
+
+@dataclass(slots=True)
+class CompactResult:
+    """
+    Hasil deteksi tanpa citra dense: vonis, metrik per ikan (`FISH_DTYPE`),
+    kotak bintik `(N, 4)` int32 berurutan per ikan, dan mask langkah 2-6 yang
+    terkompresi (`masks`: indeks langkah -> `EncodedMask`, boleh kosong).
+    """
+    is_kerapu_sunu: bool
+    spot_percent: float
+    total_spot_area: int
+    fish_area: float
+    image_shape: tuple  # (tinggi, lebar) citra input
+    fishes: np.ndarray = field(default_factory=lambda: np.zeros(0, FISH_DTYPE))
+    spot_boxes: np.ndarray = field(default_factory=lambda: np.zeros((0, 4), np.int32))
+    masks: dict = field(default_factory=dict)
+    pyramid_scale: float = 1
+
+    @classmethod
+    def from_result(cls, result, pyramid_scale=1, mask_steps=MASK_STEPS, image_shape=None):
+        """
+        Ringkas `pipeline.DetectionResult`. Hanya mask di `mask_steps` yang
+        sudah ada di `result.steps` yang disimpan (mask LazySteps tidak dirender
+        hanya untuk diarsipkan); `mask_steps=()` menyimpan metrik saja.
+        """
+        steps = result.steps
+        if image_shape is None:
+            image_shape = steps[STEP_TITLES[0]].shape
+        is_materialized = getattr(steps, "is_materialized", lambda title: title in steps)
+        masks = {index: EncodedMask.encode(steps[STEP_TITLES[index]])
+                 for index in mask_steps if is_materialized(STEP_TITLES[index])}
+        boxes = [fish.spot_boxes for fish in result.fishes if len(fish.spot_boxes)]
+        return cls(
+            is_kerapu_sunu=bool(result.is_kerapu_sunu),
+            spot_percent=float(result.spot_percent),
+            total_spot_area=int(result.total_spot_area),
+            fish_area=float(result.fish_area),
+            image_shape=tuple(int(v) for v in image_shape[:2]),
+            fishes=_fish_table(result.fishes),
+            spot_boxes=np.concatenate(boxes).astype(np.int32) if boxes else np.zeros((0, 4), np.int32),
+            masks=masks,
+            pyramid_scale=float(pyramid_scale),
+        )
+
+    def has_masks(self, steps=MASK_STEPS):
+        return all(index in self.masks for index in steps)
+
+    def fish_results(self):
+        """Daftar `pipeline.FishResult` (kotak bintik berupa view ke `spot_boxes`)."""
+        fishes = []
+        start = 0
+        for row in self.fishes:
+            end = start + int(row["num_spots"])
+            fishes.append(pipeline.FishResult(
+                bbox=tuple(int(v) for v in row["bbox"]), area=float(row["area"]),
+                circularity=float(row["circularity"]), aspect_ratio=float(row["aspect_ratio"]),
+                total_spot_area=int(row["total_spot_area"]), spot_percent=float(row["spot_percent"]),
+                is_kerapu_sunu=bool(row["is_kerapu_sunu"]), spot_boxes=self.spot_boxes[start:end],
+            ))
+            start = end
+        return fishes
+
+    def to_result(self, image=None, config=None):
+        """
+        `pipeline.DetectionResult` dengan `result_text` dibuat ulang. Dengan
+        `image` (citra input yang sama), `steps` berupa `LazySteps` sehingga
+        semua 9 langkah bisa dirender; tanpa `image`, `steps` kosong.
+        """
+        config = config or pipeline.DEFAULT_CONFIG
+        fishes = self.fish_results()
+        result = pipeline.DetectionResult(
+            is_kerapu_sunu=self.is_kerapu_sunu, total_spot_area=self.total_spot_area, fish_area=self.fish_area,
+            spot_percent=self.spot_percent, fishes=fishes, config=config)
+        result.result_text = pipeline.format_result_text(result)
+        if image is not None:
+            if tuple(image.shape[:2]) != self.image_shape:
+                raise ValueError(f"Ukuran citra {image.shape[:2]} berbeda dari hasil {self.image_shape}")
+            masks = {index: mask.decode() for index, mask in self.masks.items()}
+            final_mask_ikan = masks.pop(5, None)
+            if final_mask_ikan is None:
+                raise ValueError("Mask langkah 6 tidak disimpan; langkah visual tidak bisa dibuat ulang")
+            result.steps = pipeline.LazySteps(image, final_mask_ikan, fishes, self.pyramid_scale, masks=masks,
+                                              config=config)
+        return result
+
+    def step_image(self, index, image=None, config=None):
+        """Citra langkah `index` (0-8). Langkah 2-6 yang tersimpan dan langkah 8 tidak butuh `image`."""
+        if index in self.masks:
+            return self.masks[index].decode()
+        if index == 7:
+            return pipeline.render_spot_visual((*self.image_shape, 3), self.fish_results())
+        if image is None:
+            raise ValueError(f"Langkah '{STEP_TITLES[index]}' butuh citra input")
+        return self.to_result(image, config).steps[STEP_TITLES[index]]
+
+    def to_bytes(self):
+        """Serialisasi biner: header tetap + tabel ikan + kotak bintik + mask (lihat `from_bytes`)."""
+        h, w = self.image_shape
+        parts = [_HEADER.pack(MAGIC, self.is_kerapu_sunu, self.spot_percent, self.total_spot_area, self.fish_area,
+                              h, w, self.pyramid_scale, len(self.fishes), len(self.spot_boxes), len(self.masks)),
+                 np.ascontiguousarray(self.fishes, FISH_DTYPE).tobytes(),
+                 np.ascontiguousarray(self.spot_boxes, "<i4").tobytes()]
+        for index, mask in sorted(self.masks.items()):
+            parts.append(_MASK_HEADER.pack(index, MASK_ENCODINGS.index(mask.encoding), *mask.shape, mask.nbytes))
+            parts.append(mask.data.tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Kebalikan `to_bytes`; array menjadi view read-only ke `data` (tanpa salinan)."""
+        buffer = memoryview(data).cast("B")
+        (magic, is_kerapu_sunu, spot_percent, total_spot_area, fish_area, h, w, pyramid_scale,
+         n_fish, n_boxes, n_masks) = _HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("Bukan data CompactResult")
+        offset = _HEADER.size
+        fishes = np.frombuffer(buffer, FISH_DTYPE, n_fish, offset)
+        offset += fishes.nbytes
+        spot_boxes = np.frombuffer(buffer, "<i4", n_boxes * 4, offset).reshape(n_boxes, 4)
+        offset += spot_boxes.nbytes
+        masks = {}
+        for _ in range(n_masks):
+            index, encoding, mh, mw, nbytes = _MASK_HEADER.unpack_from(buffer, offset)
+            offset += _MASK_HEADER.size
+            encoding = MASK_ENCODINGS[encoding]
+            dtype = np.uint32 if encoding == "rle" else np.uint8
+            masks[index] = EncodedMask((mh, mw), encoding, np.frombuffer(buffer, dtype, nbytes // np.dtype(dtype).itemsize,
+                                                                      offset))
+            offset += nbytes
+        return cls(is_kerapu_sunu, spot_percent, total_spot_area, fish_area, (h, w), fishes, spot_boxes, masks,
+                   pyramid_scale)
+
+
+def save_archive(path, results, compressed=False):
+    """
+    Simpan banyak `CompactResult` ke satu file `.npz` kolumnar: tabel hasil
+    (`RESULT_DTYPE`), tabel ikan, kotak bintik, tabel mask dan satu buffer byte
+    mask. Mengembalikan jumlah hasil.
+    """
+    rows, fish_tables, box_tables, mask_rows, mask_data = [], [], [], [], []
+    n_fish = n_boxes = mask_offset = 0
+    for r in results:
+        rows.append((r.is_kerapu_sunu, r.spot_percent, r.total_spot_area, r.fish_area, *r.image_shape,
+                     r.pyramid_scale, n_fish, n_boxes, len(mask_rows)))
+        fish_tables.append(r.fishes)
+        box_tables.append(r.spot_boxes)
+        n_fish += len(r.fishes)
+        n_boxes += len(r.spot_boxes)
+        for index, mask in sorted(r.masks.items()):
+            mask_rows.append((index, MASK_ENCODINGS.index(mask.encoding), *mask.shape, mask_offset, mask.nbytes))
+            mask_data.append(mask.data.view(np.uint8).reshape(-1))
+            mask_offset += mask.nbytes
+    # Baris penutup: offset akhir hasil terakhir
+    rows.append((False, 0.0, 0, 0.0, 0, 0, 0.0, n_fish, n_boxes, len(mask_rows)))
+    arrays = {
+        "results": np.array(rows, RESULT_DTYPE),
+        "fishes": np.concatenate(fish_tables) if fish_tables else np.zeros(0, FISH_DTYPE),
+        "spot_boxes": np.concatenate(box_tables) if box_tables else np.zeros((0, 4), np.int32),
+        "masks": np.array(mask_rows, MASK_DTYPE),
+        "mask_data": np.concatenate(mask_data) if mask_data else np.zeros(0, np.uint8),
+    }
+    (np.savez_compressed if compressed else np.savez)(path, **arrays)
+    return len(rows) - 1
+
+
+class ResultArchive:
+    """Arsip hasil `save_archive`; `archive[i]` membangun `CompactResult` ke-i dari tabel kolumnar."""
+
+    def __init__(self, arrays):
+        self.results = arrays["results"]
+        self.fishes = arrays["fishes"]
+        self.spot_boxes = arrays["spot_boxes"]
+        self.masks = arrays["masks"]
+        self.mask_data = arrays["mask_data"]
+
+    def __len__(self):
+        return len(self.results) - 1
+
+    def __getitem__(self, i):
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        i %= len(self)
+        row, end = self.results[i], self.results[i + 1]
+        masks = {}
+        for m in self.masks[row["mask_start"]:end["mask_start"]]:
+            data = self.mask_data[m["offset"]:m["offset"] + m["nbytes"]]
+            encoding = MASK_ENCODINGS[m["encoding"]]
+            masks[int(m["step"])] = EncodedMask((int(m["height"]), int(m["width"])), encoding,
+                                                data.view(np.uint32) if encoding == "rle" else data)
+        return CompactResult(
+            is_kerapu_sunu=bool(row["is_kerapu_sunu"]), spot_percent=float(row["spot_percent"]),
+            total_spot_area=int(row["total_spot_area"]), fish_area=float(row["fish_area"]),
+            image_shape=(int(row["height"]), int(row["width"])),
+            fishes=self.fishes[row["fish_start"]:end["fish_start"]],
+            spot_boxes=self.spot_boxes[row["box_start"]:end["box_start"]],
+            masks=masks, pyramid_scale=float(row["pyramid_scale"]))
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def verdicts(self):
+        """Vonis semua hasil sebagai array bool (tanpa membangun objek per hasil)."""
+        return self.results["is_kerapu_sunu"][:-1]
+
+
+def load_archive(path):
+    """Baca arsip `save_archive` ke memori."""
+    with np.load(path) as data:
+        return ResultArchive({name: data[name] for name in data.files})
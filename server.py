@@ -0,0 +1,425 @@
+"""
+Layanan HTTP lokal untuk deteksi (asyncio, tanpa Qt, tanpa dependensi tambahan).
+
+    python server.py --port 8080 -j 4
+
+Endpoint:
+
+    POST /detect      body = file citra (PNG/JPEG); `?annotated=1` menambahkan
+                      citra hasil (JPEG base64) ke respons JSON
+    GET  /health      status, jumlah worker, kedalaman antrian
+    GET  /metrics     metrik format teks Prometheus (antrian, histogram latensi,
+                      ukuran batch, citra/detik)
+
+Permintaan masuk ke antrian terbatas (penuh -> 503). Satu task pengumpul
+mengambil hingga `max_batch` permintaan yang menunggu (menunggu paling lama
+`batch_wait` detik untuk melengkapi batch) lalu mengirimnya sebagai satu tugas
+ke process pool, sehingga overhead pickling/IPC dibagi rata. Paling banyak
+`concurrency` batch berjalan bersamaan; selama semua slot terpakai permintaan
+baru menumpuk di antrian dan otomatis tergabung menjadi batch yang lebih besar.
+Saat server dihentikan, permintaan yang masih menunggu dijawab 503.
+"""
+import argparse
+import asyncio
+import base64
+import collections
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import cv2
+
+import batch
+import loader
+import pipeline
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_MAX_BATCH = 8
+DEFAULT_BATCH_WAIT = 0.005
+DEFAULT_MAX_QUEUE = 64
+MAX_BODY_BYTES = 64 * 1024 * 1024
+ANNOTATED_JPEG_QUALITY = 85
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Jendela (detik) untuk menghitung citra/detik terkini
+RATE_WINDOW = 60.0
+
+HTTP_STATUS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class ServerClosed(Exception):
+    """Dilempar ke permintaan yang masih menunggu hasil saat `DetectionServer.close` dipanggil."""
+
+
+# --- Worker (berjalan di process pool) ---
+
+def detect_batch(jobs, detect_options):
+    """
+    Deteksi satu batch `[(bytes citra, annotated?)]` -> daftar dict respons.
+
+    Citra dalam satu batch bisa berasal dari klien berbeda, jadi kegagalan
+    satu citra hanya menjadi `{"error": ...}` di responsnya sendiri (dengan
+    `"status": 500` bila deteksinya yang gagal, bukan decode).
+    """
+    responses = []
+    for data, annotated in jobs:
+        image = loader.load_image(data)
+        if image is None:
+            responses.append({"error": "Gagal men-decode citra"})
+            continue
+        try:
+            result = pipeline.detect(image, keep_steps=False, workspace=pipeline.workspace_for(image.shape),
+                                     **detect_options)
+            response = result.summary()
+            if annotated:
+                ok, encoded = cv2.imencode(".jpg", pipeline.render_detections(image, result.fishes),
+                                           [cv2.IMWRITE_JPEG_QUALITY, ANNOTATED_JPEG_QUALITY])
+                if ok:
+                    response["annotated_image"] = base64.b64encode(encoded.tobytes()).decode("ascii")
+        except Exception as e:
+            response = {"error": f"{type(e).__name__}: {e}", "status": 500}
+        responses.append(response)
+    return responses
+
+
+def _warm_up():
+    """Impor modul dan inisialisasi OpenCV di worker sebelum permintaan pertama."""
+    return os.getpid()
+
+
+# --- Metrik ---
+
+class Metrics:
+    def __init__(self):
+        self.started = time.time()
+        self.requests = collections.Counter()      # status HTTP -> jumlah
+        self.images = 0
+        self.batches = 0
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.batch_sizes = collections.Counter()
+        self._recent = collections.deque()          # waktu selesai tiap citra dalam RATE_WINDOW
+
+    def observe_request(self, status, seconds):
+        self.requests[status] += 1
+        index = next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound), len(LATENCY_BUCKETS))
+        self.latency_counts[index] += 1
+        self.latency_sum += seconds
+
+    def observe_batch(self, size):
+        now = time.time()
+        self.batches += 1
+        self.images += size
+        self.batch_sizes[size] += 1
+        self._recent.extend([now] * size)
+
+    def images_per_second(self):
+        now = time.time()
+        while self._recent and self._recent[0] < now - RATE_WINDOW:
+            self._recent.popleft()
+        window = min(RATE_WINDOW, now - self.started)
+        return len(self._recent) / window if window > 0 else 0.0
+
+    def to_prometheus(self, queue_depth, in_flight):
+        lines = [
+            "# TYPE kerapu_queue_depth gauge", f"kerapu_queue_depth {queue_depth}",
+            "# TYPE kerapu_batches_in_flight gauge", f"kerapu_batches_in_flight {in_flight}",
+            "# TYPE kerapu_images_total counter", f"kerapu_images_total {self.images}",
+            "# TYPE kerapu_batches_total counter", f"kerapu_batches_total {self.batches}",
+            "# TYPE kerapu_images_per_second gauge", f"kerapu_images_per_second {self.images_per_second():.3f}",
+            "# TYPE kerapu_uptime_seconds gauge", f"kerapu_uptime_seconds {time.time() - self.started:.1f}",
+            "# TYPE kerapu_requests_total counter",
+        ]
+        lines += [f'kerapu_requests_total{{status="{status}"}} {count}' for status, count in sorted(self.requests.items())]
+        lines.append("# TYPE kerapu_request_latency_seconds histogram")
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), self.latency_counts):
+            cumulative += count
+            lines.append(f'kerapu_request_latency_seconds_bucket{{le="{bound}"}} {cumulative}')
+        lines += [f"kerapu_request_latency_seconds_sum {self.latency_sum:.6f}",
+                  f"kerapu_request_latency_seconds_count {cumulative}",
+                  "# TYPE kerapu_batches_by_size_total counter"]
+        lines += [f'kerapu_batches_by_size_total{{size="{size}"}} {count}' for size, count in sorted(self.batch_sizes.items())]
+        return "\n".join(lines) + "\n"
+
+
+# --- Server ---
+
+class DetectionServer:
+    """
+    Server HTTP/1.1 sederhana (keep-alive) di atas `asyncio.start_server`.
+
+    `workers` proses deteksi; `concurrency` batch yang boleh berjalan
+    bersamaan (default = `workers`). `detect_options` diteruskan ke
+    `pipeline.detect`.
+    """
+
+    def __init__(self, workers=None, concurrency=None, max_batch=DEFAULT_MAX_BATCH, batch_wait=DEFAULT_BATCH_WAIT,
+                 max_queue=DEFAULT_MAX_QUEUE, **detect_options):
+        self.workers = workers or os.cpu_count() or 1
+        self.concurrency = concurrency or self.workers
+        self.max_batch = max(1, max_batch)
+        self.batch_wait = batch_wait
+        self.max_queue = max_queue
+        self.detect_options = detect_options
+        self.metrics = Metrics()
+        self.in_flight = 0
+        self._queue = None
+        self._pool = None
+        self._server = None
+        self._tasks = set()
+        self._closing = False
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        # spawn: worker tidak mewarisi state thread/event loop proses utama
+        self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _warm_up) for _ in range(self.workers)))
+        self._queue = asyncio.Queue(self.max_queue)
+        self._tasks.add(asyncio.create_task(self._batcher()))
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server
+
+    async def close(self):
+        """
+        Hentikan server. Permintaan di antrian dan di batch yang dibatalkan
+        mendapat `ServerClosed` (503), jadi tidak ada pemanggil yang menunggu
+        selamanya (di Python 3.10 `wait_closed` tidak menunggu koneksi terbuka).
+        """
+        self._closing = True
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, _, future = self._queue.get_nowait()
+                self._fail([future])
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+
+    async def detect(self, data, annotated=False):
+        """
+        Antrekan satu citra dan tunggu hasilnya; `asyncio.QueueFull` bila
+        antrian penuh, `ServerClosed` bila server sedang/sudah dihentikan.
+        """
+        if self._closing:
+            raise ServerClosed("Server dihentikan")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((data, annotated, future))
+        return await future
+
+    @staticmethod
+    def _fail(futures, message="Server dihentikan"):
+        for future in futures:
+            if not future.done():
+                future.set_exception(ServerClosed(message))
+
+    async def _batcher(self):
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.concurrency)
+        while True:
+            await slots.acquire()
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_wait
+            try:
+                while len(batch) < self.max_batch:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                        continue
+                    except asyncio.QueueEmpty:
+                        pass
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Dihentikan saat melengkapi batch: permintaan yang sudah diambil dari antrian ikut dijawab
+                self._fail(future for _, _, future in batch)
+                raise
+            task = asyncio.create_task(self._run_batch(batch, slots))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch, slots):
+        self.in_flight += 1
+        try:
+            jobs = [(data, annotated) for data, annotated, _ in batch]
+            responses = await asyncio.get_running_loop().run_in_executor(
+                self._pool, detect_batch, jobs, self.detect_options)
+        except asyncio.CancelledError:
+            self._fail(future for _, _, future in batch)
+            raise
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            self.metrics.observe_batch(len(batch))
+            for (_, _, future), response in zip(batch, responses):
+                if not future.done():
+                    future.set_result(response)
+        finally:
+            self.in_flight -= 1
+            slots.release()
+
+    # --- HTTP ---
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                start = time.perf_counter()
+                status, content_type, payload = await self._dispatch(method, target, body)
+                self.metrics.observe_request(status, time.perf_counter() - start)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(self._response(status, content_type, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except _HttpError as e:
+            writer.write(self._response(e.status, "application/json", _json({"error": e.message}), False))
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader):
+        """`(method, target, headers, body)` atau None bila koneksi ditutup klien."""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if e.partial.strip():
+                raise _HttpError(400, "Header tidak lengkap")
+            return None
+        except asyncio.LimitOverrunError:
+            raise _HttpError(400, "Header terlalu besar")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise _HttpError(400, "Baris permintaan tidak valid")
+        headers = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(":")
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise _HttpError(400, "Content-Length tidak valid")
+        if length > MAX_BODY_BYTES:
+            raise _HttpError(413, f"Citra lebih besar dari {MAX_BODY_BYTES // 2**20} MB")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    async def _dispatch(self, method, target, body):
+        url = urlsplit(target)
+        if url.path == "/health":
+            return 200, "application/json", _json({
+                "status": "ok", "workers": self.workers, "concurrency": self.concurrency,
+                "queue_depth": self._queue.qsize(), "batches_in_flight": self.in_flight,
+            })
+        if url.path == "/metrics":
+            return 200, "text/plain; version=0.0.4", self.metrics.to_prometheus(self._queue.qsize(),
+                                                                                self.in_flight).encode()
+        if url.path != "/detect":
+            return 404, "application/json", _json({"error": "Endpoint tidak dikenal"})
+        if method != "POST":
+            return 405, "application/json", _json({"error": "Gunakan POST dengan body berisi file citra"})
+        if not body:
+            return 400, "application/json", _json({"error": "Body kosong"})
+
+        query = parse_qs(url.query)
+        annotated = query.get("annotated", ["0"])[0].lower() in ("1", "true", "ya", "yes")
+        try:
+            response = await self.detect(body, annotated)
+        except asyncio.QueueFull:
+            return 503, "application/json", _json({"error": "Antrian penuh, coba lagi"})
+        except ServerClosed as e:
+            return 503, "application/json", _json({"error": str(e)})
+        except Exception as e:
+            return 500, "application/json", _json({"error": str(e)})
+        status = response.pop("status", 400 if "error" in response else 200)
+        return status, "application/json", _json(response)
+
+    @staticmethod
+    def _response(status, content_type, payload, keep_alive):
+        head = (f"HTTP/1.1 {status} {HTTP_STATUS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        return head.encode("latin-1") + payload
+
+
+class _HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _json(data):
+    return json.dumps(data).encode()
+
+
+def add_arguments(parser):
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Alamat bind (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port (default: %(default)s)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Jumlah proses deteksi (default: jumlah CPU)")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Batch yang boleh berjalan bersamaan (default: jumlah worker)")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH, help="Citra maksimal per batch")
+    parser.add_argument("--batch-wait-ms", type=float, default=DEFAULT_BATCH_WAIT * 1000,
+                        help="Waktu tunggu maksimal untuk melengkapi batch (default: %(default)s ms)")
+    parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE,
+                        help="Permintaan maksimal di antrian sebelum ditolak dengan 503")
+    batch.add_detect_arguments(parser)
+
+
+async def serve(args):
+    server = DetectionServer(args.workers, args.concurrency, args.max_batch, args.batch_wait_ms / 1000,
+                             args.max_queue, **batch.detect_options(args))
+    await server.start(args.host, args.port)
+    print(f"Layanan deteksi berjalan di http://{args.host}:{args.port} ({server.workers} worker)", flush=True)
+    stopped = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            asyncio.get_running_loop().add_signal_handler(sig, stopped.set)
+        except NotImplementedError:  # Windows: Ctrl+C tetap lewat KeyboardInterrupt
+            pass
+    try:
+        await stopped.wait()
+    finally:
+        await server.close()
+        print("Layanan dihentikan.", flush=True)
+
+
+def main(args):
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Layanan HTTP deteksi Kerapu Sunu")
+    add_arguments(parser)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,367 @@
+"""
+Run ter-shard dan bisa dilanjutkan untuk manifest citra berukuran besar
+(mis. menilai ulang seluruh arsip dengan ambang baru).
+
+    python detect_sunu.py shard run arsip.txt --shards 8 --shard 0 --out run_ambang_15/ \\
+        --set min_total_spot_area_percent=1.5
+    ...                                         # shard 1..7 di proses/mesin lain
+    python detect_sunu.py shard merge run_ambang_15/ -o hasil.csv
+
+Manifest berisi satu path citra per baris (baris kosong dan `#` diabaikan;
+path relatif dihitung dari folder manifest), atau sebuah folder citra. Item
+dibagi ke shard berdasarkan hash teks item, jadi pembagian tetap sama di
+semua mesin dan tidak bergeser bila manifest diurutkan ulang atau ditambah.
+
+Setiap shard menulis log `shard-KKK-of-NNN.jsonl` di folder keluaran
+(bersama, mis. NFS): baris pertama header run (parameter yang memengaruhi
+hasil dan jumlah item shard), lalu satu baris JSON per item yang selesai,
+ditambahkan di akhir dan di-flush per item. Menjalankan ulang perintah yang
+sama setelah crash melewati item yang sudah ada di log; baris terakhir yang
+terpotong dibuang. Log dengan parameter berbeda ditolak agar hasil dua
+ambang tidak tercampur; opsi yang hanya memengaruhi kecepatan/memori
+(`--memory-budget`, `--color-lut`, jumlah worker) boleh berubah antar resume.
+`merge` menggabungkan semua log menjadi satu CSV/JSONL dan melaporkan shard
+yang belum ada lognya atau jumlah itemnya kurang dari yang diharapkan.
+"""
+import contextlib
+import csv
+import dataclasses
+import functools
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import batch
+import pipeline
+import result_cache
+import sweep
+
+try:
+    import fcntl
+except ImportError:  # Windows: tanpa penguncian log
+    fcntl = None
+
+# Jumlah chunk per worker yang boleh menunggu di pool (membatasi memori untuk manifest besar)
+CHUNKS_PER_WORKER = 4
+# fsync log setiap N item (flush ke OS tetap per item)
+SYNC_EVERY = 64
+LOG_PATTERN = "shard-{shard:03d}-of-{shards:03d}.jsonl"
+RECORD_FIELDS = ("item", "path", "is_kerapu_sunu", "spot_percent", "total_spot_area", "fish_area", "num_fish",
+                 "result_text", "error")
+
+
+def read_manifest(manifest):
+    """Daftar `(item, path)`; `item` = teks baris manifest (kunci shard dan resume), `path` = path yang dibuka."""
+    if os.path.isdir(manifest):
+        return [(os.path.basename(p), p) for p in batch.list_images(manifest)]
+    base = os.path.dirname(os.path.abspath(manifest))
+    entries = []
+    with open(manifest, encoding="utf-8") as f:
+        for line in f:
+            item = line.strip()
+            if item and not item.startswith("#"):
+                entries.append((item, item if os.path.isabs(item) else os.path.join(base, item)))
+    return entries
+
+
+def shard_of(item, shards):
+    """Nomor shard (0..shards-1) untuk `item`; stabil antar proses dan mesin."""
+    return int.from_bytes(hashlib.sha1(item.encode("utf-8")).digest()[:8], "big") % shards
+
+
+def run_header(shard, shards, items, config, options):
+    """
+    Header log. `run` (parameter yang memengaruhi hasil) harus sama di semua
+    shard dan di setiap resume; `items` = jumlah item shard menurut manifest.
+    """
+    return {"shard": shard, "shards": shards, "items": items,
+            "run": {"config": dataclasses.asdict(config), "options": options}}
+
+
+def result_options(decode_scale=1, **detect_options):
+    """Opsi deteksi yang memengaruhi hasil (lihat `result_cache.RESULT_OPTIONS`) ditambah `decode_scale`."""
+    options = {name: detect_options.get(name, default) for name, default in result_cache.RESULT_OPTIONS.items()}
+    options["decode_scale"] = decode_scale
+    return options
+
+
+def _json_normalized(value):
+    return json.loads(json.dumps(value))  # tuple -> list, agar header dari file bisa dibandingkan
+
+
+class CheckpointLog:
+    """
+    Log hasil append-only satu shard. `completed` berisi item yang sudah
+    tercatat; `append` menulis satu baris JSON dan langsung mem-flush-nya.
+    """
+
+    def __init__(self, path, header):
+        self.path = path
+        self.completed = set()
+        self.items = header["items"]
+        self._since_sync = 0
+        self._file = open(path, "a+b")
+        try:
+            if fcntl is not None:
+                # Kunci POSIX (lockf): tidak diwarisi worker hasil fork, jadi lepas begitu proses ini mati.
+                # Semua baca/tulis lewat file ini saja; menutup fd lain ke file yang sama melepas kuncinya.
+                try:
+                    fcntl.lockf(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    raise RuntimeError(f"{path} sedang dipakai proses lain (shard yang sama dijalankan dua kali?)")
+            self._file.seek(0)
+            data = self._file.read()
+            if data:
+                self._load(data, header)
+            else:
+                self._write(header)
+                self.sync()
+        except Exception:
+            self._file.close()
+            raise
+
+    def _load(self, data, header):
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            # Proses mati saat menulis baris terakhir: buang potongannya sebelum menambah baris baru
+            self._file.truncate(end)
+        lines = data[:end].decode("utf-8").splitlines()
+        if not lines:
+            raise ValueError(f"{self.path}: log rusak (tanpa header)")
+        existing = json.loads(lines[0])
+        expected = _json_normalized(header)
+        if {**existing, "items": None} != {**expected, "items": None}:
+            raise ValueError(f"{self.path} dibuat dengan parameter atau pembagian shard yang berbeda; "
+                             "pakai folder keluaran lain untuk run baru")
+        logged_items = existing["items"]
+        for line in lines[1:]:
+            record = json.loads(line)
+            if "item" in record:
+                self.completed.add(record["item"])
+            else:
+                logged_items = record["items"]
+        if logged_items != self.items:
+            # Manifest berubah sejak run sebelumnya: catat jumlah item baru agar `merge` memakainya
+            self._write({"items": self.items})
+
+    def _write(self, record):
+        self._file.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+        self._file.flush()
+
+    def append(self, record):
+        self._write(record)
+        self.completed.add(record["item"])
+        self._since_sync += 1
+        if self._since_sync >= SYNC_EVERY:
+            self.sync()
+
+    def sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._since_sync = 0
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def make_record(item, path, summary, error):
+    record = dict.fromkeys(RECORD_FIELDS)
+    record.update(item=item, path=path, error=error)
+    if summary is not None:
+        record.update((name, summary[name]) for name in RECORD_FIELDS if name in summary)
+    return record
+
+
+def process_chunk(paths, **options):
+    """Worker: `batch.try_process_file` untuk setiap path di `paths`."""
+    return [batch.try_process_file(path, **options) for path in paths]
+
+
+def iter_processed(paths, workers=1, chunksize=8, **options):
+    """
+    `(path, ringkasan, error)` sesuai urutan `paths`. Paling banyak
+    `CHUNKS_PER_WORKER` chunk per worker yang diantrekan, jadi manifest
+    ratusan ribu item tidak membuat ratusan ribu future sekaligus.
+    """
+    if workers == 1:
+        for path in paths:
+            yield batch.try_process_file(path, **options)
+        return
+    chunks = (paths[i:i + chunksize] for i in range(0, len(paths), chunksize))
+    worker = functools.partial(process_chunk, **options)
+    pool = ProcessPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for chunk in chunks:
+            pending.append(pool.submit(worker, chunk))
+            if len(pending) >= workers * CHUNKS_PER_WORKER:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        # Dihentikan di tengah (Ctrl+C): jangan kerjakan chunk yang hasilnya tidak akan dicatat
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def run_shard(manifest, shard, shards, out_dir, workers=1, chunksize=8, decode_scale=1, log=print,
+              **detect_options):
+    """Proses item milik `shard` yang belum ada di log-nya; kembalikan `(selesai, total item shard)`."""
+    if not 0 <= shard < shards:
+        raise ValueError(f"--shard harus di 0..{shards - 1}")
+    config = detect_options.get("config") or pipeline.DEFAULT_CONFIG
+    options = result_options(decode_scale, **detect_options)
+    items = [(item, path) for item, path in read_manifest(manifest) if shard_of(item, shards) == shard]
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, LOG_PATTERN.format(shard=shard, shards=shards))
+    with CheckpointLog(path, run_header(shard, shards, len(items), config, options)) as checkpoint:
+        todo = [(item, p) for item, p in items if item not in checkpoint.completed]
+        log(f"Shard {shard}/{shards}: {len(items)} item, {len(items) - len(todo)} sudah selesai, "
+            f"{len(todo)} diproses -> {path}")
+        start = time.perf_counter()
+        results = iter_processed([p for _, p in todo], workers, chunksize, decode_scale=decode_scale,
+                                 **detect_options)
+        with contextlib.closing(results):
+            for done, ((item, _), (p, summary, error)) in enumerate(zip(todo, results), start=1):
+                checkpoint.append(make_record(item, p, summary, error))
+                if done % 1000 == 0:
+                    log(f"  {done}/{len(todo)} ({done / (time.perf_counter() - start):.1f} citra/detik)")
+        return len(checkpoint.completed), len(items)
+
+
+def shard_logs(out_dir):
+    pattern = re.compile(r"shard-(\d+)-of-(\d+)\.jsonl$")
+    logs = []
+    for path in sorted(glob.glob(os.path.join(out_dir, "shard-*-of-*.jsonl"))):
+        match = pattern.search(path)
+        if match:
+            logs.append((int(match.group(1)), int(match.group(2)), path))
+    return logs
+
+
+def read_log(path):
+    """
+    `(header, {item: record})`; record terakhir menang bila item tercatat
+    lebih dari sekali. `header["items"]` diperbarui bila jumlah item shard
+    dicatat ulang setelah manifest berubah.
+    """
+    records = {}
+    with open(path, encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        for line in f:
+            if not line.endswith("\n"):
+                break  # baris terakhir terpotong (shard masih berjalan atau crash)
+            record = json.loads(line)
+            if "item" in record:
+                records[record["item"]] = record
+            else:
+                header["items"] = record["items"]
+    return header, records
+
+
+def merge_shards(out_dir, output, log=print):
+    """
+    Gabungkan log semua shard ke `output` (.csv atau .jsonl), ditulis per
+    shard. Kembalikan `{shard: (tercatat, diharapkan)}` untuk shard yang
+    belum lengkap; `(0, None)` bila lognya belum ada.
+    """
+    logs = shard_logs(out_dir)
+    if not logs:
+        raise ValueError(f"Tidak ada log shard di {out_dir}")
+    shards = {n for _, n, _ in logs}
+    if len(shards) > 1:
+        raise ValueError(f"Log di {out_dir} berasal dari pembagian shard berbeda: {sorted(shards)}")
+    shards = shards.pop()
+
+    run = None
+    incomplete = {}
+    counts = {"total": 0, "sunu": 0, "error": 0}
+    jsonl = output.lower().endswith(".jsonl")
+    with open(output, "w", newline="", encoding="utf-8") as f:
+        writer = None if jsonl else csv.DictWriter(f, fieldnames=RECORD_FIELDS)
+        if writer is not None:
+            writer.writeheader()
+        for shard, _, path in logs:
+            header, records = read_log(path)
+            if run is None:
+                run = header["run"]
+            elif header["run"] != run:
+                raise ValueError(f"{path} dibuat dengan parameter berbeda dari shard lain")
+            for record in records.values():
+                if jsonl:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                else:
+                    writer.writerow(record)
+                counts["total"] += 1
+                counts["sunu"] += bool(record["is_kerapu_sunu"])
+                counts["error"] += record["error"] is not None
+            log(f"  shard {shard}: {len(records)}/{header['items']} item")
+            if len(records) < header["items"]:
+                incomplete[shard] = (len(records), header["items"])
+    for shard in set(range(shards)) - {shard for shard, _, _ in logs}:
+        incomplete[shard] = (0, None)
+    log(f"Digabung: {counts['total']} item, {counts['sunu']} Kerapu Sunu, {counts['error']} gagal -> {output}")
+    return dict(sorted(incomplete.items()))
+
+
+def add_arguments(parser):
+    actions = parser.add_subparsers(dest="action", required=True)
+    run = actions.add_parser("run", help="Jalankan (atau lanjutkan) satu shard")
+    run.add_argument("manifest", help="File manifest (satu path citra per baris) atau folder citra")
+    run.add_argument("--shards", type=int, default=1, help="Jumlah shard total (default: %(default)s)")
+    run.add_argument("--shard", type=int, default=0, help="Nomor shard yang dijalankan, 0..shards-1")
+    run.add_argument("--out", required=True, help="Folder log shard (bersama untuk semua shard)")
+    run.add_argument("-j", "--workers", type=int, default=None, help="Jumlah proses worker (default: jumlah CPU)")
+    run.add_argument("--chunksize", type=int, default=8, help="Citra per tugas worker (default: %(default)s)")
+    run.add_argument("--set", dest="settings", action="append", default=[], metavar="NAMA=NILAI",
+                     help="Ubah parameter DetectionConfig untuk run ini (boleh diulang)")
+    run.add_argument("--decode-scale", type=float, default=1.0,
+                     help="Decode citra pada skala ini (mis. 0.5) memakai IMREAD_REDUCED_COLOR_*")
+    batch.add_detect_arguments(run)
+    merge = actions.add_parser("merge", help="Gabungkan log semua shard menjadi satu file")
+    merge.add_argument("out", help="Folder log shard")
+    merge.add_argument("-o", "--output", default="hasil_gabungan.csv", help="File hasil (.csv atau .jsonl)")
+
+
+def main(args):
+    if args.action == "merge":
+        try:
+            incomplete = merge_shards(args.out, args.output)
+        except ValueError as e:
+            print(e)
+            return 1
+        for shard, (done, expected) in incomplete.items():
+            if expected is None:
+                print(f"Peringatan: belum ada log untuk shard {shard}")
+            else:
+                print(f"Peringatan: shard {shard} belum lengkap ({done}/{expected} item)")
+        return 2 if incomplete else 0
+
+    try:
+        settings = dict(sweep.parse_setting(s) for s in args.settings)
+        if any(len(values) != 1 for values in settings.values()):
+            raise ValueError("--set hanya menerima satu nilai per parameter (untuk banyak nilai pakai `sweep`)")
+        config = dataclasses.replace(pipeline.DEFAULT_CONFIG, **{k: v[0] for k, v in settings.items()})
+        workers = args.workers or os.cpu_count() or 1
+        done, total = run_shard(args.manifest, args.shard, args.shards, args.out, workers, args.chunksize,
+                                args.decode_scale, config=config, **batch.detect_options(args))
+    except (ValueError, RuntimeError) as e:
+        print(e)
+        return 1
+    except KeyboardInterrupt:
+        print("Dihentikan; jalankan perintah yang sama untuk melanjutkan dari checkpoint.")
+        return 130
+    print(f"Shard {args.shard}/{args.shards} selesai: {done}/{total} item tercatat.")
+    return 0
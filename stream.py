@@ -0,0 +1,364 @@
+"""
+Mode streaming: deteksi pada file video atau kamera (`cv2.VideoCapture`).
+
+Tiga tahap berjalan di thread terpisah, dihubungkan antrian terbatas:
+
+    capture -> [antrian frame] -> deteksi -> [antrian hasil] -> pemakai (GUI / CLI)
+
+Bila deteksi tertinggal, frame tertua di antrian frame dibuang (capture tidak
+pernah menunggu), jadi hasil yang tampil selalu dari frame terbaru. Dengan
+`realtime=False` file video dibaca secepat deteksi dan tidak ada frame dibuang.
+
+Pelacakan ROI: setelah ikan ditemukan, frame berikutnya hanya disegmentasi
+di sekitar bbox ikan sebelumnya (diperlebar `track_margin`). Deteksi seluruh
+frame dijalankan lagi bila pelacakan hilang (tidak ada ikan di ROI, atau ikan
+menyentuh tepi ROI) dan setiap `redetect_interval` frame agar ikan baru di
+luar ROI tetap tertangkap. Hasil pada ROI adalah aproksimasi (threshold
+adaptif dan komponen terbesar dihitung pada potongan frame).
+"""
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+
+import cv2
+import numpy as np
+
+import batch
+import pipeline
+
+DEFAULT_QUEUE_SIZE = 2
+DEFAULT_REDETECT_INTERVAL = 30
+DEFAULT_TRACK_MARGIN = 0.25
+# Ikan yang bbox-nya sedekat ini (piksel) ke tepi ROI dianggap keluar ROI
+EDGE_TOLERANCE = 2
+
+_END = object()
+
+
+@dataclass
+class FrameResult:
+    """Hasil deteksi satu frame; koordinat di `result` selalu relatif terhadap frame penuh."""
+    index: int
+    frame: np.ndarray
+    result: pipeline.DetectionResult
+    roi: tuple = None       # (x, y, w, h) ROI pelacakan; None = seluruh frame
+    latency: float = 0.0    # detik sejak frame dibaca sampai hasil siap
+
+
+@dataclass
+class StreamStats:
+    frames_read: int = 0
+    frames_processed: int = 0
+    frames_dropped: int = 0
+    frames_tracked: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def fps(self):
+        elapsed = time.perf_counter() - self.started
+        return self.frames_processed / elapsed if elapsed > 0 else 0.0
+
+
+def open_source(source):
+    """`cv2.VideoCapture` untuk indeks kamera (int atau string angka) atau path/URL video."""
+    if isinstance(source, str) and source.isdigit():
+        source = int(source)
+    capture = cv2.VideoCapture(source)
+    if not capture.isOpened():
+        raise ValueError(f"Gagal membuka sumber video {source!r}")
+    return capture
+
+
+def shift_result(result, dx, dy):
+    """Geser koordinat setiap ikan (bbox dan kotak bintik) sebesar `(dx, dy)`, in-place."""
+    for fish in result.fishes:
+        x, y, w, h = fish.bbox
+        fish.bbox = (x + dx, y + dy, w, h)
+        if len(fish.spot_boxes):
+            fish.spot_boxes = fish.spot_boxes + np.array([dx, dy, 0, 0], fish.spot_boxes.dtype)
+    return result
+
+
+def tracking_roi(fishes, shape, margin=DEFAULT_TRACK_MARGIN):
+    """Gabungan bbox ikan diperlebar `margin` x ukurannya di tiap sisi, dipotong ke frame; None jika tidak ada ikan."""
+    if not fishes:
+        return None
+    boxes = np.array([fish.bbox for fish in fishes])
+    x0, y0 = boxes[:, 0].min(), boxes[:, 1].min()
+    x1, y1 = (boxes[:, 0] + boxes[:, 2]).max(), (boxes[:, 1] + boxes[:, 3]).max()
+    mx, my = int((x1 - x0) * margin), int((y1 - y0) * margin)
+    height, width = shape[:2]
+    x0, y0 = max(0, x0 - mx), max(0, y0 - my)
+    x1, y1 = min(width, x1 + mx), min(height, y1 + my)
+    return int(x0), int(y0), int(x1 - x0), int(y1 - y0)
+
+
+def touches_edge(fishes, roi, shape):
+    """True jika ada ikan yang menyentuh tepi ROI yang bukan tepi frame (ikan mungkin terpotong)."""
+    x, y, w, h = roi
+    height, width = shape[:2]
+    for fish in fishes:
+        fx, fy, fw, fh = fish.bbox
+        if ((fx - x <= EDGE_TOLERANCE and x > 0) or (fy - y <= EDGE_TOLERANCE and y > 0)
+                or (x + w - (fx + fw) <= EDGE_TOLERANCE and x + w < width)
+                or (y + h - (fy + fh) <= EDGE_TOLERANCE and y + h < height)):
+            return True
+    return False
+
+
+class FishTracker:
+    """Deteksi per frame yang memakai ulang bbox ikan dari frame sebelumnya sebagai ROI."""
+
+    def __init__(self, track_margin=DEFAULT_TRACK_MARGIN, redetect_interval=DEFAULT_REDETECT_INTERVAL,
+                 **detect_options):
+        self.track_margin = track_margin
+        self.redetect_interval = redetect_interval
+        self.detect_options = detect_options
+        self.roi = None
+        self._since_full = 0
+
+    def reset(self):
+        self.roi = None
+        self._since_full = 0
+
+    def detect(self, frame):
+        """`(DetectionResult, roi)` untuk `frame`; `roi` None berarti seluruh frame diproses."""
+        workspace = pipeline.workspace_for(frame.shape)
+        used_roi = None
+        result = None
+        if self.roi is not None and self._since_full < self.redetect_interval:
+            x, y, w, h = self.roi
+            crop = np.ascontiguousarray(frame[y:y + h, x:x + w])
+            result = pipeline.detect(crop, keep_steps=False, workspace=workspace.view(crop.shape),
+                                     **self.detect_options)
+            shift_result(result, x, y)
+            if result.fishes and not touches_edge(result.fishes, self.roi, frame.shape):
+                used_roi = self.roi
+                self._since_full += 1
+            else:
+                result = None  # pelacakan hilang: ulangi pada seluruh frame
+        if result is None:
+            result = pipeline.detect(frame, keep_steps=False, workspace=workspace, **self.detect_options)
+            self._since_full = 0
+        self.roi = tracking_roi(result.fishes, frame.shape, self.track_margin)
+        return result, used_roi
+
+
+class StreamDetector:
+    """
+    Menjalankan capture dan deteksi di thread latar; iterasi menghasilkan `FrameResult`.
+
+        with StreamDetector("konveyor.mp4") as stream:
+            for frame_result in stream:
+                ...
+
+    `source` berupa indeks kamera, path/URL video, atau `cv2.VideoCapture`
+    yang sudah dibuka. `realtime` (default True) membaca file video sesuai
+    FPS-nya dan membuang frame saat deteksi tertinggal, seperti kamera.
+    `detect_options` diteruskan ke `pipeline.detect` lewat `FishTracker`.
+    """
+
+    def __init__(self, source, queue_size=DEFAULT_QUEUE_SIZE, realtime=True, track_margin=DEFAULT_TRACK_MARGIN,
+                 redetect_interval=DEFAULT_REDETECT_INTERVAL, **detect_options):
+        self.capture = source if isinstance(source, cv2.VideoCapture) else open_source(source)
+        self.realtime = realtime
+        self.tracker = FishTracker(track_margin, redetect_interval, **detect_options)
+        self.stats = StreamStats()
+        self._frames = queue.Queue(maxsize=max(1, queue_size))
+        self._results = queue.Queue(maxsize=max(1, queue_size))
+        self._stop = threading.Event()
+        self._error = None
+        self._threads = []
+
+    def start(self):
+        self.stats = StreamStats()
+        self._threads = [threading.Thread(target=self._capture_loop, name="stream-capture", daemon=True),
+                         threading.Thread(target=self._detect_loop, name="stream-detect", daemon=True)]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def __iter__(self):
+        while True:
+            item = self._results.get()
+            if item is _END:
+                break
+            yield item
+        if self._error is not None:
+            raise self._error
+
+    def _put(self, q, item):
+        """Put yang menunggu, tetapi berhenti bila `stop()` dipanggil."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _put_dropping(self, item):
+        """Masukkan frame; bila antrian penuh, buang frame tertua."""
+        while True:
+            try:
+                self._frames.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._frames.get_nowait()
+                    self.stats.frames_dropped += 1
+                except queue.Empty:
+                    pass
+
+    def _capture_loop(self):
+        fps = self.capture.get(cv2.CAP_PROP_FPS)
+        # Kamera sudah berjalan pada laju sensornya; hanya file yang perlu dijeda
+        frame_count = self.capture.get(cv2.CAP_PROP_FRAME_COUNT)
+        interval = 1 / fps if self.realtime and fps > 0 and frame_count > 0 else 0
+        next_time = time.perf_counter()
+        index = 0
+        try:
+            while not self._stop.is_set():
+                ok, frame = self.capture.read()
+                if not ok:
+                    break
+                if interval:
+                    next_time += interval
+                    delay = next_time - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                self.stats.frames_read += 1
+                item = (index, time.perf_counter(), frame)
+                index += 1
+                if self.realtime:
+                    self._put_dropping(item)
+                elif not self._put(self._frames, item):
+                    break
+        except Exception as e:
+            self._error = e
+        finally:
+            self.capture.release()
+            self._put(self._frames, _END)
+
+    def _detect_loop(self):
+        try:
+            while not self._stop.is_set():
+                try:
+                    item = self._frames.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is _END:
+                    break
+                index, read_time, frame = item
+                result, roi = self.tracker.detect(frame)
+                self.stats.frames_processed += 1
+                if roi is not None:
+                    self.stats.frames_tracked += 1
+                if not self._put(self._results, FrameResult(index, frame, result, roi, time.perf_counter() - read_time)):
+                    break
+        except Exception as e:
+            self._error = e
+            self._stop.set()
+        finally:
+            if not self._put(self._results, _END):
+                self._force_end()
+
+    def _force_end(self):
+        """Setelah `stop()`: pemakai yang masih menunggu harus menerima akhir stream walaupun antrian penuh."""
+        while True:
+            try:
+                self._results.put_nowait(_END)
+                return
+            except queue.Full:
+                try:
+                    self._results.get_nowait()
+                except queue.Empty:
+                    pass
+
+
+def render_frame(frame_result):
+    """Frame dengan kotak ikan Sunu (hijau) dan ROI pelacakan (abu-abu) bila dipakai."""
+    image = pipeline.render_detections(frame_result.frame, frame_result.result.fishes)
+    if frame_result.roi is not None:
+        x, y, w, h = frame_result.roi
+        cv2.rectangle(image, (x, y), (x + w, y + h), (160, 160, 160), 1)
+    return image
+
+
+def synthesize_video(image_paths, output_path, fps=10, seconds_per_image=2.0, size=(960, 720), shift=0.15):
+    """
+    Tulis video uji (MJPG .avi) dari citra dataset: tiap citra diskalakan ke `size`,
+    lalu digeser horizontal sejauh `shift` x lebar selama tampil (seperti di konveyor).
+    """
+    width, height = size
+    writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    if not writer.isOpened():
+        raise ValueError(f"Gagal menulis video {output_path}")
+    frames_per_image = max(1, int(round(fps * seconds_per_image)))
+    try:
+        for path in image_paths:
+            image = cv2.imread(path)
+            if image is None:
+                continue
+            h, w = image.shape[:2]
+            scale = min(width / w, height / h) * (1 - shift)
+            image = cv2.resize(image, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+            h, w = image.shape[:2]
+            for i in range(frames_per_image):
+                dx = (width - w) / 2 + (i / max(1, frames_per_image - 1) - 0.5) * shift * width
+                matrix = np.float32([[1, 0, dx], [0, 1, (height - h) / 2]])
+                # Tepi direplikasi agar latar frame menyatu dengan latar citra
+                writer.write(cv2.warpAffine(image, matrix, (width, height), borderMode=cv2.BORDER_REPLICATE))
+    finally:
+        writer.release()
+    return output_path
+
+
+def add_arguments(parser):
+    parser.add_argument("source", help="Indeks kamera (mis. 0) atau path/URL video")
+    parser.add_argument("--no-realtime", dest="realtime", action="store_false",
+                        help="Proses setiap frame file video (tanpa jeda FPS dan tanpa membuang frame)")
+    parser.add_argument("--queue", type=int, default=DEFAULT_QUEUE_SIZE, help="Panjang antrian frame dan hasil")
+    parser.add_argument("--redetect", type=int, default=DEFAULT_REDETECT_INTERVAL,
+                        help="Deteksi seluruh frame setiap N frame walaupun pelacakan berhasil")
+    parser.add_argument("--track-margin", type=float, default=DEFAULT_TRACK_MARGIN,
+                        help="Pelebaran ROI pelacakan relatif terhadap ukuran bbox ikan")
+    parser.add_argument("--synthesize", metavar="FOLDER",
+                        help="Buat dulu video uji di `source` dari citra di FOLDER, lalu jalankan stream")
+    batch.add_detect_arguments(parser)
+
+
+def main(args):
+    if args.synthesize:
+        synthesize_video(batch.list_images(args.synthesize), args.source)
+        print(f"Video uji ditulis ke {args.source}")
+    try:
+        stream = StreamDetector(args.source, args.queue, args.realtime, args.track_margin, args.redetect,
+                                **batch.detect_options(args))
+    except ValueError as e:
+        print(e)
+        return 1
+    with stream:
+        for frame_result in stream:
+            result = frame_result.result
+            mode = "lacak" if frame_result.roi is not None else "penuh"
+            verdict = "SUNU" if result.is_kerapu_sunu else "BUKAN"
+            print(f"frame {frame_result.index}\t{verdict}\t{result.spot_percent:.2f}%\t{mode}\t"
+                  f"{frame_result.latency * 1000:.1f} ms", flush=True)
+    stats = stream.stats
+    print(f"Selesai: {stats.frames_processed} frame diproses, {stats.frames_dropped} dibuang, "
+          f"{stats.frames_tracked} lewat ROI pelacakan, {stats.fps:.1f} frame/detik.")
+    return 0
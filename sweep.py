@@ -0,0 +1,175 @@
+"""
+Sweep parameter pipeline dengan komputasi ulang inkremental.
+
+Setiap citra menyimpan hasil antara per tahap. Kunci tiap tahap adalah field
+`DetectionConfig` yang dibaca tahap itu dan semua tahap sebelumnya:
+
+    objek      blur_size, object_block_size, object_threshold_c     -> mask objek (langkah 4)
+    mask ikan  + red_hsv_ranges, close_size                         -> kandidat ikan (bentuk + mask tubuh)
+    bintik     + spot_block_size, spot_threshold_c, spot_median_size -> statistik CCL bintik per ikan
+    vonis      ambang persentase dan min_fish_contour_area         -> selalu dihitung ulang (murah)
+
+Jadi mengubah batas area bintik hanya menjalankan filter vonis di atas
+statistik `connectedComponentsWithStats` yang sudah ada. Hasilnya identik
+dengan `pipeline.detect(image, config=...)`.
+"""
+import dataclasses
+import itertools
+import os
+import time
+from collections import Counter
+
+import cv2
+import numpy as np
+
+import pipeline
+from batch import list_images
+
+STAGE_FIELDS = (
+    ("objek", ("blur_size", "object_block_size", "object_threshold_c")),
+    ("mask ikan", ("red_hsv_ranges", "close_size")),
+    ("bintik", ("spot_block_size", "spot_threshold_c", "spot_median_size")),
+)
+
+
+def stage_key(config, stage):
+    """Nilai semua field yang memengaruhi `stage` (termasuk tahap-tahap sebelumnya)."""
+    key = []
+    for name, fields in STAGE_FIELDS:
+        key.extend(getattr(config, f) for f in fields)
+        if name == stage:
+            return tuple(key)
+    raise KeyError(stage)
+
+
+class ImageSweep:
+    """Hasil antara satu citra untuk dievaluasi dengan banyak `DetectionConfig`."""
+
+    def __init__(self, image):
+        self.image = image
+        self.gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        self.hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+        self.stage_runs = Counter()
+        self._object_masks = {}
+        self._candidates = {}
+        self._spot_stats = {}
+
+    def object_mask(self, config):
+        key = stage_key(config, "objek")
+        if key not in self._object_masks:
+            self.stage_runs["objek"] += 1
+            # Salin: hasil segment_object adalah view ke Workspace sementara (termasuk buffer label)
+            self._object_masks[key] = pipeline.segment_object(self.gray, config=config)[2].copy()
+        return self._object_masks[key]
+
+    def candidates(self, config):
+        """Kontur yang lolos filter bentuk: daftar `(area, circularity, aspect_ratio, bbox, mask tubuh)`."""
+        key = stage_key(config, "mask ikan")
+        if key not in self._candidates:
+            object_mask = self.object_mask(config)
+            self.stage_runs["mask ikan"] += 1
+            color_mask = pipeline.red_color_mask(self.hsv, ranges=config.red_hsv_ranges)
+            fish_color = cv2.bitwise_and(color_mask, object_mask)
+            kernel = np.ones((config.close_size, config.close_size), np.uint8)
+            final_mask_ikan = cv2.morphologyEx(fish_color, cv2.MORPH_CLOSE, kernel)
+            contours, _ = cv2.findContours(final_mask_ikan, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            candidates = []
+            for contour in contours:
+                shape = pipeline.contour_shape(contour)
+                if shape is None:
+                    continue
+                area, circularity, aspect_ratio, bbox = shape
+                bbox, body_mask_roi = pipeline.fish_body_roi(bbox, final_mask_ikan, self.image.shape)
+                candidates.append((area, circularity, aspect_ratio, bbox, body_mask_roi))
+            self._candidates[key] = candidates
+        return self._candidates[key]
+
+    def spot_stats(self, config, index):
+        candidates = self.candidates(config)
+        key = (stage_key(config, "bintik"), index)
+        if key not in self._spot_stats:
+            self.stage_runs["bintik"] += 1
+            _, _, _, bbox, body_mask_roi = candidates[index]
+            self._spot_stats[key] = pipeline.spot_components(self.image, body_mask_roi, bbox, self.hsv, config=config)
+        return self._spot_stats[key]
+
+    def evaluate(self, config=pipeline.DEFAULT_CONFIG):
+        """`DetectionResult` (tanpa citra langkah) untuk `config`, memakai ulang tahap yang sudah ada."""
+        result = pipeline.DetectionResult(config=config)
+        for index, (area, circularity, aspect_ratio, bbox, _) in enumerate(self.candidates(config)):
+            if area < config.min_fish_contour_area:
+                continue
+            spot_stats = self.spot_stats(config, index)
+            result.fishes.append(pipeline.classify_spots(spot_stats, area, circularity, aspect_ratio, bbox, config))
+        return pipeline.summarize_fishes(result)
+
+
+def grid(base=pipeline.DEFAULT_CONFIG, **values):
+    """Semua kombinasi nilai: `grid(spot_block_size=[9, 11], min_total_spot_area_percent=[0.5, 1])`."""
+    names = list(values)
+    return [dataclasses.replace(base, **dict(zip(names, combo))) for combo in itertools.product(*values.values())]
+
+
+def run_sweep(paths, configs):
+    """
+    Evaluasi setiap citra dengan setiap konfigurasi.
+
+    Mengembalikan `(verdicts, stage_runs)`: `verdicts[i][j]` = ringkasan citra
+    `paths[j]` dengan `configs[i]` (None jika gagal dimuat) dan jumlah
+    eksekusi tiap tahap. Citra diproses satu per satu, jadi hanya hasil antara
+    satu citra yang ada di memori.
+    """
+    verdicts = [[None] * len(paths) for _ in configs]
+    stage_runs = Counter()
+    for j, path in enumerate(paths):
+        image = cv2.imread(path)
+        if image is None:
+            continue
+        image_sweep = ImageSweep(image)
+        for i, config in enumerate(configs):
+            verdicts[i][j] = image_sweep.evaluate(config).summary()
+        stage_runs.update(image_sweep.stage_runs)
+    return verdicts, stage_runs
+
+
+def parse_setting(text):
+    """`"nama=v1,v2"` -> `(nama, [v1, v2])` dengan tipe sesuai field `DetectionConfig`."""
+    name, _, values = text.partition("=")
+    fields = {f.name: f for f in dataclasses.fields(pipeline.DetectionConfig)}
+    if name not in fields or fields[name].type not in (int, float):
+        choices = ", ".join(f.name for f in fields.values() if f.type in (int, float))
+        raise ValueError(f"Parameter '{name}' tidak bisa di-sweep (pilihan: {choices})")
+    return name, [fields[name].type(v) for v in values.split(",") if v]
+
+
+def add_arguments(parser):
+    parser.add_argument("directory", help="Folder berisi citra (*.png, *.jpg, *.jpeg)")
+    parser.add_argument("--set", dest="settings", action="append", default=[], metavar="NAMA=V1,V2,...",
+                        help="Nilai parameter DetectionConfig yang dicoba (boleh diulang)")
+
+
+def main(args):
+    try:
+        values = dict(parse_setting(s) for s in args.settings)
+    except ValueError as e:
+        print(e)
+        return 1
+    paths = list_images(args.directory)
+    if not paths:
+        print(f"Tidak ada citra di {args.directory}")
+        return 1
+    configs = grid(**values)
+
+    start = time.perf_counter()
+    verdicts, stage_runs = run_sweep(paths, configs)
+    elapsed = time.perf_counter() - start
+
+    print("Urutan citra: " + " ".join(os.path.basename(p) for p in paths))
+    for config, row in zip(configs, verdicts):
+        params = " ".join(f"{name}={getattr(config, name)}" for name in values) or "default"
+        n_sunu = sum(1 for s in row if s and s["is_kerapu_sunu"])
+        marks = "".join("E" if s is None else "S" if s["is_kerapu_sunu"] else "." for s in row)
+        print(f"{params}\t{n_sunu} Sunu\t{marks}")
+    runs = ", ".join(f"{name}: {stage_runs[name]}x" for name, _ in STAGE_FIELDS)
+    print(f"Selesai: {len(configs)} konfigurasi x {len(paths)} citra dalam {elapsed:.2f} s ({runs}).")
+    return 0
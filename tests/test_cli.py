@@ -0,0 +1,23 @@
+"""Pemilihan sub-perintah `detect_sunu.py`."""
+import pytest
+
+import detect_sunu
+
+
+@pytest.mark.parametrize("argv, command", [
+    ([], None),
+    (["batch", "dataset"], "batch"),
+    (["--stream", "batch"], None),
+    (["--stream=batch"], None),
+    (["--stream", "0", "sweep", "dataset"], "sweep"),
+    (["--stream", "video.avi"], None),
+    (["batch", "serve"], "batch"),
+    (["-h"], None),
+])
+def test_command_is_first_positional(argv, command):
+    assert detect_sunu.command_of(argv) == command
+
+
+def test_stream_source_named_like_a_command_opens_no_subcommand():
+    args = detect_sunu.build_parser(detect_sunu.command_of(["--stream", "batch"])).parse_args(["--stream", "batch"])
+    assert args.command is None and args.stream == "batch"
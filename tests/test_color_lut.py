@@ -0,0 +1,37 @@
+"""Jalur tabel BGR (`color_lut=True`) identik dengan cvtColor HSV + inRange."""
+import glob
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+import pipeline
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dataset")
+PATHS = sorted(glob.glob(os.path.join(DATASET, "*.png")))
+
+
+def hsv_mask(image):
+    return pipeline.red_color_mask(cv2.cvtColor(image, cv2.COLOR_BGR2HSV)).copy()
+
+
+@pytest.mark.parametrize("path", PATHS, ids=os.path.basename)
+def test_lut_mask_equals_inrange(path):
+    image = cv2.imread(path)
+    assert np.array_equal(pipeline.red_color_mask_lut(image), hsv_mask(image))
+
+
+def test_lut_mask_equals_inrange_on_random_colors():
+    image = np.random.default_rng(0).integers(0, 256, (512, 512, 3), np.uint8)
+    assert np.array_equal(pipeline.red_color_mask_lut(image), hsv_mask(image))
+
+
+@pytest.mark.parametrize("path", PATHS, ids=os.path.basename)
+def test_detect_with_lut_equals_detect(path):
+    image = cv2.imread(path)
+    expected = pipeline.detect(image)
+    result = pipeline.detect(image, color_lut=True)
+    assert result.summary() == expected.summary()
+    for title in pipeline.STEP_TITLES:
+        assert np.array_equal(result.steps[title], expected.steps[title]), title
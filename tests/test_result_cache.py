@@ -0,0 +1,80 @@
+"""`result_cache.ResultCache`: cache hit identik dengan run baru; cache disk yang gagal tidak menggagalkan deteksi."""
+import glob
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+import pipeline
+import result_cache
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dataset")
+PATHS = sorted(glob.glob(os.path.join(DATASET, "*.png")))
+
+
+def load(name):
+    image = cv2.imread(os.path.join(DATASET, name))
+    assert image is not None
+    return image
+
+
+def assert_same_result(result, expected):
+    assert result.summary() == expected.summary()
+    for fish, expected_fish in zip(result.fishes, expected.fishes):
+        assert np.array_equal(fish.spot_boxes, expected_fish.spot_boxes)
+
+
+@pytest.mark.parametrize("path", PATHS, ids=os.path.basename)
+def test_disk_cache_hit_equals_fresh_run(path, tmp_path):
+    image = cv2.imread(path)
+    expected = pipeline.detect(image)
+    result_cache.ResultCache(str(tmp_path)).detect(image)
+
+    # Cache baru di folder yang sama: entri diambil dari disk, bukan dari LRU memori
+    cache = result_cache.ResultCache(str(tmp_path))
+    steps = {}
+    result = cache.detect(image, on_step=lambda index, title, step: steps.__setitem__(title, step))
+    assert (cache.hits, cache.misses) == (1, 0)
+    assert_same_result(result, expected)
+    for title in pipeline.STEP_TITLES:
+        assert np.array_equal(result.steps[title], expected.steps[title]), title
+        assert np.array_equal(steps[title], expected.steps[title]), title
+
+
+@pytest.mark.parametrize("path", PATHS, ids=os.path.basename)
+def test_verdict_only_hit_equals_fresh_run(path):
+    image = cv2.imread(path)
+    cache = result_cache.ResultCache()
+    cache.detect(image, keep_steps=False)
+    result = cache.detect(image, keep_steps=False)
+    assert cache.hits == 1
+    assert_same_result(result, pipeline.detect(image, keep_steps=False))
+
+
+def test_uncreatable_directory_falls_back_to_memory(tmp_path):
+    blocker = tmp_path / "bukan_folder"
+    blocker.write_bytes(b"")
+    messages = []
+    cache = result_cache.ResultCache(str(blocker / "cache"), log=messages.append)
+    assert cache.directory is None and len(messages) == 1
+
+    image = load("sunu2.png")
+    first = cache.detect(image, keep_steps=False)
+    second = cache.detect(image, keep_steps=False)
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert second.is_kerapu_sunu == first.is_kerapu_sunu and second.spot_percent == first.spot_percent
+
+
+def test_failed_disk_write_keeps_result(tmp_path, monkeypatch):
+    messages = []
+    cache = result_cache.ResultCache(str(tmp_path / "cache"), log=messages.append)
+
+    def disk_full(*args, **kwargs):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(result_cache.tempfile, "mkstemp", disk_full)
+    result = cache.detect(load("sunu2.png"), keep_steps=False)
+    assert result.is_kerapu_sunu
+    assert cache.directory is None and len(messages) == 1
+    assert not os.listdir(tmp_path / "cache")
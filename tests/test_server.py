@@ -0,0 +1,31 @@
+"""`server.DetectionServer.close` menjawab semua permintaan yang masih menunggu."""
+import asyncio
+import os
+
+import server
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dataset")
+
+
+def test_close_resolves_pending_requests():
+    with open(os.path.join(DATASET, "sunu2.png"), "rb") as f:
+        data = f.read()
+
+    async def scenario():
+        detector = server.DetectionServer(workers=1, concurrency=1, max_batch=2, max_queue=64)
+        await detector.start(port=0)
+        requests = [asyncio.create_task(detector.detect(data)) for _ in range(20)]
+        await asyncio.sleep(0.05)  # batch pertama sedang berjalan, sisanya di antrian
+        await asyncio.wait_for(detector.close(), 30)
+        results = await asyncio.wait_for(asyncio.gather(*requests, return_exceptions=True), 5)
+        try:
+            await detector.detect(data)
+        except server.ServerClosed:
+            pass
+        else:
+            raise AssertionError("detect setelah close harus ditolak")
+        return results
+
+    results = asyncio.run(scenario())
+    assert any(isinstance(r, server.ServerClosed) for r in results)
+    assert all(isinstance(r, (dict, server.ServerClosed)) for r in results)
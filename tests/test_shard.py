@@ -0,0 +1,77 @@
+"""Resume dan merge `shard.py` pada dataset/."""
+import csv
+import json
+import os
+
+import shard
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dataset")
+
+
+def quiet(*args):
+    pass
+
+
+def write_manifest(tmp_path):
+    manifest = tmp_path / "arsip.txt"
+    names = sorted(n for n in os.listdir(DATASET) if n.endswith(".png"))
+    manifest.write_text("".join(os.path.join(DATASET, n) + "\n" for n in names), encoding="utf-8")
+    return manifest, names
+
+
+def log_lines(path):
+    return path.read_text(encoding="utf-8").splitlines()
+
+
+def test_resume_skips_logged_items_and_drops_torn_line(tmp_path):
+    manifest, names = write_manifest(tmp_path)
+    out = tmp_path / "run"
+    done, total = shard.run_shard(str(manifest), 0, 1, str(out), log=quiet)
+    assert done == total == len(names)
+
+    log_path = out / shard.LOG_PATTERN.format(shard=0, shards=1)
+    lines = log_lines(log_path)
+    assert json.loads(lines[0])["items"] == len(names)
+    # Simulasi crash: dua item terakhir hilang, baris terakhir terpotong di tengah
+    log_path.write_text("\n".join(lines[:-2]) + "\n" + lines[-2][:10], encoding="utf-8")
+
+    processed = []
+    done, total = shard.run_shard(str(manifest), 0, 1, str(out), log=processed.append)
+    assert done == total == len(names)
+    assert "2 diproses" in processed[0]
+    items = [json.loads(line)["item"] for line in log_lines(log_path)[1:]]
+    assert sorted(items) == sorted(os.path.join(DATASET, n) for n in names)
+
+
+def test_resume_allows_speed_options_but_refuses_other_parameters(tmp_path):
+    manifest, _ = write_manifest(tmp_path)
+    out = tmp_path / "run"
+    shard.run_shard(str(manifest), 0, 2, str(out), log=quiet)
+    shard.run_shard(str(manifest), 0, 2, str(out), log=quiet, memory_budget=512 * 1024 * 1024, color_lut=True)
+    try:
+        shard.run_shard(str(manifest), 0, 2, str(out), log=quiet, pyramid_scale=0.5)
+    except ValueError as e:
+        assert "berbeda" in str(e)
+    else:
+        raise AssertionError("resume dengan pyramid_scale berbeda harus ditolak")
+
+
+def test_merge_reports_short_and_missing_shards(tmp_path):
+    manifest, names = write_manifest(tmp_path)
+    out = tmp_path / "run"
+    for n in range(2):
+        shard.run_shard(str(manifest), n, 2, str(out), log=quiet)
+    output = tmp_path / "hasil.csv"
+    assert shard.merge_shards(str(out), str(output), log=quiet) == {}
+    with open(output, newline="", encoding="utf-8") as f:
+        assert len(list(csv.DictReader(f))) == len(names)
+
+    log_path = out / shard.LOG_PATTERN.format(shard=1, shards=2)
+    lines = log_lines(log_path)
+    log_path.write_text("\n".join(lines[:-1]) + "\n", encoding="utf-8")
+    expected = len(lines) - 1
+    assert shard.merge_shards(str(out), str(output), log=quiet) == {1: (expected - 1, expected)}
+
+    (out / shard.LOG_PATTERN.format(shard=0, shards=2)).unlink()
+    incomplete = shard.merge_shards(str(out), str(output), log=quiet)
+    assert incomplete == {0: (0, None), 1: (expected - 1, expected)}
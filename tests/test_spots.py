@@ -0,0 +1,92 @@
+"""Filter bintik tervektorisasi dan `polylines` identik dengan loop per label dan `cv2.rectangle` semula."""
+import glob
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+import pipeline
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dataset")
+PATHS = sorted(glob.glob(os.path.join(DATASET, "*.png")))
+CONFIG = pipeline.DEFAULT_CONFIG
+
+
+def loop_classify(stats, area, bbox):
+    """Filter bintik versi loop (sebelum vektorisasi): `(total_spot_area, spot_boxes)`."""
+    x, y, _, _ = bbox
+    required_max_area_per_spot = area * (CONFIG.max_area_per_spot_percent / 100)
+    required_min_area_per_spot = area * (CONFIG.min_area_per_spot_percent / 100)
+    total_spot_area = 0
+    spot_boxes = []
+    for i in range(1, len(stats)):
+        spot_area = stats[i, cv2.CC_STAT_AREA]
+        if spot_area > required_min_area_per_spot and spot_area < required_max_area_per_spot:
+            total_spot_area += spot_area
+            sx, sy, sw, sh = stats[i, :4]
+            spot_boxes.append((x + sx, y + sy, sw, sh))
+    return int(total_spot_area), np.array(spot_boxes, np.int32).reshape(-1, 4)
+
+
+def rectangle_visual(shape, fishes):
+    """Langkah 8 versi semula: satu `cv2.rectangle` per bintik."""
+    visual = np.zeros(shape, np.uint8)
+    for fish in fishes:
+        for sx, sy, sw, sh in fish.spot_boxes:
+            cv2.rectangle(visual, (int(sx), int(sy)), (int(sx + sw), int(sy + sh)), (0, 0, 255), 1)
+    return visual
+
+
+def spot_stats(image):
+    """Statistik CCL bintik terang (seperti `pipeline.spot_mask`) pada seluruh citra, termasuk label 0."""
+    v = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)[:, :, 2]
+    mask = cv2.adaptiveThreshold(v, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY,
+                                 CONFIG.spot_block_size, CONFIG.spot_threshold_c)
+    return cv2.connectedComponentsWithStats(cv2.medianBlur(mask, CONFIG.spot_median_size), 8, cv2.CV_32S)[2]
+
+
+def assert_same_classification(stats, area, bbox):
+    fish = pipeline.classify_spots(stats[1:], area, 0.5, 2.0, bbox)
+    total_spot_area, spot_boxes = loop_classify(stats, area, bbox)
+    assert fish.total_spot_area == total_spot_area
+    assert np.array_equal(fish.spot_boxes, spot_boxes)
+    assert fish.is_kerapu_sunu == (total_spot_area > area * CONFIG.min_total_spot_area_percent / 100)
+
+
+@pytest.mark.parametrize("path", PATHS, ids=os.path.basename)
+def test_vectorized_filter_equals_loop(path):
+    image = cv2.imread(path)
+    stats = spot_stats(image)
+    h, w = image.shape[:2]
+    for area in (h * w / 50, h * w / 10, float(h * w)):
+        assert_same_classification(stats, area, (7, 11, w, h))
+
+
+def test_vectorized_filter_equals_loop_random():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        n = int(rng.integers(1, 60))
+        stats = rng.integers(0, 400, (n, 5)).astype(np.int32)
+        bbox = tuple(int(v) for v in rng.integers(0, 300, 4))
+        assert_same_classification(stats, float(rng.uniform(100, 20000)), bbox)
+
+
+def test_polylines_equals_rectangles_random():
+    rng = np.random.default_rng(1)
+    shape = (240, 320, 3)
+    for _ in range(200):
+        fishes = []
+        for _ in range(int(rng.integers(1, 4))):
+            n = int(rng.integers(0, 30))
+            boxes = np.c_[rng.integers(-20, 330, n), rng.integers(-20, 250, n),
+                          rng.integers(0, 40, n), rng.integers(0, 40, n)].astype(np.int32)
+            fishes.append(pipeline.FishResult((0, 0, 1, 1), 1.0, 0.5, 2.0, 0, 0.0, False, boxes.reshape(-1, 4)))
+        assert np.array_equal(pipeline.render_spot_visual(shape, fishes), rectangle_visual(shape, fishes))
+
+
+@pytest.mark.parametrize("path", PATHS, ids=os.path.basename)
+def test_spot_visual_equals_rectangles_on_dataset(path):
+    image = cv2.imread(path)
+    result = pipeline.detect(image)
+    assert np.array_equal(result.steps[pipeline.STEP_TITLES[7]], rectangle_visual(image.shape, result.fishes))
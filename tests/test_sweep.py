@@ -0,0 +1,36 @@
+"""`sweep.ImageSweep.evaluate` identik dengan `pipeline.detect(image, config=...)`."""
+import glob
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+import pipeline
+import sweep
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dataset")
+PATHS = sorted(glob.glob(os.path.join(DATASET, "*.png")))
+# Setiap tahap sweep (objek, mask ikan, bintik, vonis) mendapat minimal dua nilai
+CONFIGS = sweep.grid(
+    object_threshold_c=[8, 10],
+    close_size=[3, 5],
+    spot_block_size=[9, 11],
+    min_total_spot_area_percent=[0.5, 1, 2],
+    min_fish_contour_area=[pipeline.DEFAULT_CONFIG.min_fish_contour_area, 5000],
+)
+
+
+@pytest.mark.parametrize("path", PATHS, ids=os.path.basename)
+def test_evaluate_equals_detect(path):
+    image = cv2.imread(path)
+    image_sweep = sweep.ImageSweep(image)
+    for config in CONFIGS:
+        result = image_sweep.evaluate(config)
+        expected = pipeline.detect(image, keep_steps=False, config=config)
+        assert result.summary() == expected.summary(), config
+        for fish, expected_fish in zip(result.fishes, expected.fishes):
+            assert np.array_equal(fish.spot_boxes, expected_fish.spot_boxes)
+    # Tahap yang kuncinya tidak berubah tidak dijalankan ulang
+    assert image_sweep.stage_runs["objek"] == 2
+    assert image_sweep.stage_runs["mask ikan"] == 4
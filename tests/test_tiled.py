@@ -0,0 +1,40 @@
+"""Mode tile (`memory_budget`) identik dengan mode biasa dan menolak anggaran yang tidak bisa dipenuhi."""
+import glob
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+import pipeline
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dataset")
+PATHS = sorted(glob.glob(os.path.join(DATASET, "*.png")))
+
+
+@pytest.mark.parametrize("pyramid_scale", [1, 0.5])
+@pytest.mark.parametrize("path", PATHS, ids=os.path.basename)
+def test_tiled_equals_untiled(path, pyramid_scale):
+    image = cv2.imread(path)
+    expected = pipeline.detect(image, pyramid_scale=pyramid_scale)
+    # Anggaran minimum (dihitung seperti `detect`): strip TILE_MIN_ROWS baris, banyak strip per citra
+    work = pipeline.downscale(image, pyramid_scale)
+    fixed_bytes = image.nbytes
+    if pyramid_scale != 1:
+        extra_pixels = image.shape[0] * image.shape[1] - work.shape[0] * work.shape[1]
+        fixed_bytes += work.nbytes + extra_pixels * pipeline.TILE_SPOT_BYTES_PER_PIXEL
+    budget = pipeline.min_memory_budget(work.shape, fixed_bytes)
+    assert pipeline.tile_rows(work.shape, budget, fixed_bytes) == pipeline.TILE_MIN_ROWS
+    for workspace in (None, pipeline.workspace_for(image.shape)):
+        result = pipeline.detect(image, pyramid_scale=pyramid_scale, memory_budget=budget, workspace=workspace)
+        assert result.summary() == expected.summary()
+        for title in pipeline.STEP_TITLES:
+            assert np.array_equal(result.steps[title], expected.steps[title]), title
+
+
+def test_budget_below_minimum_is_rejected():
+    image = cv2.imread(PATHS[0])
+    minimum = pipeline.min_memory_budget(image.shape, image.nbytes)
+    with pytest.raises(ValueError, match="terlalu kecil"):
+        pipeline.detect(image, memory_budget=minimum - 1)
+    pipeline.detect(image, memory_budget=minimum)
@@ -0,0 +1,35 @@
+"""`tradeoff`: throughput hanya menghitung citra yang dideteksi; rekomendasi membandingkan himpunan Sunu dan FP."""
+import itertools
+import os
+import types
+
+import tradeoff
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dataset")
+
+
+def test_unloadable_images_do_not_inflate_throughput(tmp_path, monkeypatch):
+    broken = tmp_path / "sunu_rusak.png"
+    broken.write_bytes(b"bukan citra")
+    labeled_paths = [(os.path.join(DATASET, "sunu2.png"), True), (str(broken), True),
+                     (os.path.join(DATASET, "ikan.png"), False)]
+    # Setiap citra yang dideteksi "memakan" tepat 1 detik
+    ticks = itertools.count()
+    monkeypatch.setattr(tradeoff, "time", types.SimpleNamespace(perf_counter=lambda: float(next(ticks))))
+    evaluation = tradeoff.evaluate_setting(tradeoff.Setting(), labeled_paths, rounds=2)
+    assert evaluation.images_per_second == 1.0
+    assert evaluation.tp + evaluation.fn + evaluation.fp + evaluation.tn == 2
+
+
+def test_recommend_requires_same_sunu_and_no_extra_false_positives():
+    def evaluation(decode, detected, fp, speed):
+        e = tradeoff.Evaluation(tradeoff.Setting(decode=decode), tp=len(detected), fp=fp, images_per_second=speed)
+        e.detected = set(detected)
+        return e
+
+    reference = evaluation(1, {"a", "b"}, 1, 10)
+    swapped = evaluation(2, {"a", "c"}, 1, 50)          # kehilangan b, menemukan c
+    flags_everything = evaluation(4, {"a", "b", "c"}, 6, 80)
+    keeps = evaluation(8, {"a", "b"}, 0, 30)
+    assert tradeoff.recommend([reference, swapped, flags_everything, keeps]) is keeps
+    assert tradeoff.recommend([reference, swapped]) is reference
@@ -0,0 +1,38 @@
+"""`watch.FolderWatcher`: file yang gagal dibaca tidak menghentikan daemon."""
+import os
+import shutil
+
+import watch
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dataset")
+
+
+def test_unreadable_file_is_logged_and_retried(tmp_path, monkeypatch):
+    folder = tmp_path / "kamera"
+    folder.mkdir()
+    for name in ("sunu2.png", "ikan.png"):
+        shutil.copy(os.path.join(DATASET, name), folder / name)
+    broken = str(folder / "ikan.png")
+    real_hash = watch.file_hash
+
+    def flaky_hash(path):
+        if path == broken:
+            raise PermissionError(13, "Permission denied", path)
+        return real_hash(path)
+
+    monkeypatch.setattr(watch, "file_hash", flaky_hash)
+    messages = []
+    with watch.ResultDatabase(str(tmp_path / "hasil.sqlite")) as database:
+        watcher = watch.FolderWatcher(str(folder), database, workers=1, settle=0, log=messages.append)
+        watcher.run(once=True)
+        assert watcher.processed == 1
+        assert sum("Gagal membaca file" in m for m in messages) == 1
+
+        # Masih gagal: tidak dicatat ulang di log; setelah bisa dibaca, diproses pada polling berikutnya
+        watcher.run(once=True)
+        assert sum("Gagal membaca file" in m for m in messages) == 1
+        monkeypatch.setattr(watch, "file_hash", real_hash)
+        watcher.run(once=True)
+        assert watcher.processed == 2
+        database.flush()
+        assert database.counts()[0] == 2
@@ -0,0 +1,214 @@
+"""
+Evaluasi trade-off kecepatan vs akurasi untuk pengaturan performa pipeline.
+
+Label sebenarnya diambil dari nama file dataset: `sunu*` = Kerapu Sunu,
+`kerapu*`, `cantang*`, `ikan*` = bukan Sunu (file lain diabaikan). Setiap
+pengaturan adalah kombinasi dari:
+
+    decode      faktor reduksi decode JPEG/PNG (IMREAD_REDUCED_COLOR_2/4/8)
+    pyramid     `pyramid_scale` untuk segmentasi tubuh ikan (mode piramida)
+    crop        `crop_to_object` (ROI objek) aktif atau tidak
+    visual      citra langkah dirender (`keep_steps=True`) atau dilewati
+
+Untuk tiap pengaturan dicatat confusion matrix dan throughput (citra/detik,
+termasuk decode, satu proses). Pengaturan di front Pareto (tidak ada
+pengaturan lain yang lebih cepat sekaligus lebih akurat) ditandai, dan
+pengaturan tercepat yang tetap mendeteksi setiap citra Sunu yang terdeteksi
+pengaturan acuan (pengaturan pertama), tanpa false positive lebih banyak
+dari acuan, direkomendasikan.
+"""
+import dataclasses
+import itertools
+import os
+import time
+
+import batch
+import loader
+import pipeline
+import profiling
+
+POSITIVE_PREFIXES = ("sunu",)
+NEGATIVE_PREFIXES = ("kerapu", "cantang", "ikan")
+
+
+def label_from_filename(path):
+    """True (Sunu), False (bukan Sunu) atau None (label tidak diketahui) dari nama file."""
+    name = os.path.basename(path).lower()
+    if name.startswith(POSITIVE_PREFIXES):
+        return True
+    if name.startswith(NEGATIVE_PREFIXES):
+        return False
+    return None
+
+
+@dataclasses.dataclass(frozen=True)
+class Setting:
+    """Satu kombinasi pengaturan performa."""
+    decode: int = 1
+    pyramid_scale: float = 1
+    crop_to_object: bool = True
+    keep_steps: bool = True
+
+    @property
+    def label(self):
+        return (f"decode 1/{self.decode}, piramida {self.pyramid_scale:g}, "
+                f"crop {'ya' if self.crop_to_object else 'tidak'}, visual {'ya' if self.keep_steps else 'tidak'}")
+
+    @property
+    def decode_scale(self):
+        return 1 / self.decode
+
+
+@dataclasses.dataclass
+class Evaluation:
+    setting: Setting
+    tp: int = 0
+    fn: int = 0
+    fp: int = 0
+    tn: int = 0
+    images_per_second: float = 0.0
+    pareto: bool = False
+    detected: set = dataclasses.field(default_factory=set)  # path citra Sunu yang terdeteksi benar (TP)
+
+    @property
+    def accuracy(self):
+        total = self.tp + self.fn + self.fp + self.tn
+        return (self.tp + self.tn) / total if total else 0.0
+
+    def add(self, path, truth, predicted):
+        if truth:
+            if predicted:
+                self.tp += 1
+                self.detected.add(path)
+            else:
+                self.fn += 1
+        elif predicted:
+            self.fp += 1
+        else:
+            self.tn += 1
+
+    def to_row(self):
+        return dict(dataclasses.asdict(self.setting), tp=self.tp, fn=self.fn, fp=self.fp, tn=self.tn,
+                    accuracy=self.accuracy, images_per_second=self.images_per_second, pareto=self.pareto)
+
+
+def settings_grid(decode=(1,), pyramid_scale=(1,), crop_to_object=(True,), keep_steps=(True,)):
+    return [Setting(*combo) for combo in itertools.product(decode, pyramid_scale, crop_to_object, keep_steps)]
+
+
+def evaluate_setting(setting, labeled_paths, rounds=1, config=pipeline.DEFAULT_CONFIG):
+    """Jalankan `setting` pada semua citra berlabel sebanyak `rounds` kali (vonis dari putaran pertama)."""
+    evaluation = Evaluation(setting)
+    # Decode tereduksi memperkecil citra; ambang piksel absolut ikut diskalakan agar ikan yang sama tidak tersaring
+    config = loader.scaled_config(config, setting.decode_scale)
+    elapsed = 0.0
+    detected = 0
+    for round_index in range(rounds):
+        for path, truth in labeled_paths:
+            start = time.perf_counter()
+            image = loader.load_image(path, setting.decode_scale)
+            if image is None:
+                continue
+            result = pipeline.detect(image, keep_steps=setting.keep_steps, crop_to_object=setting.crop_to_object,
+                                     pyramid_scale=setting.pyramid_scale, config=config)
+            elapsed += time.perf_counter() - start
+            detected += 1
+            if round_index == 0:
+                evaluation.add(path, truth, result.is_kerapu_sunu)
+    # Hanya citra yang benar-benar dideteksi: citra gagal dimuat tidak boleh menaikkan throughput
+    evaluation.images_per_second = detected / elapsed if elapsed else 0.0
+    return evaluation
+
+
+def mark_pareto(evaluations):
+    """Tandai evaluasi yang tidak didominasi pada (throughput, TP, -FP)."""
+    for e in evaluations:
+        e.pareto = not any(
+            o.images_per_second >= e.images_per_second and o.tp >= e.tp and o.fp <= e.fp
+            and (o.images_per_second > e.images_per_second or o.tp > e.tp or o.fp < e.fp)
+            for o in evaluations
+        )
+
+
+def recommend(evaluations):
+    """
+    Pengaturan tercepat yang mendeteksi semua citra Sunu yang dideteksi acuan
+    (`evaluations[0]`) dan FP-nya tidak lebih banyak; throughput sama -> FP
+    lebih sedikit, lalu akurasi lebih tinggi. Acuan sendiri selalu memenuhi.
+    """
+    reference = evaluations[0]
+    keeping = [e for e in evaluations if e.detected >= reference.detected and e.fp <= reference.fp]
+    return max(keeping, key=lambda e: (e.images_per_second, -e.fp, e.accuracy))
+
+
+def run_tradeoff(directory, settings, rounds=1, log=print):
+    paths = batch.list_images(directory)
+    labeled_paths = [(p, label_from_filename(p)) for p in paths]
+    labeled_paths = [(p, truth) for p, truth in labeled_paths if truth is not None]
+    if not labeled_paths:
+        raise ValueError(f"Tidak ada citra berlabel (sunu*/kerapu*/cantang*/ikan*) di {directory}")
+    # Pemanasan: cache file OS dan inisialisasi OpenCV tidak ikut terukur di pengaturan pertama
+    evaluate_setting(settings[0], labeled_paths[:1])
+    evaluations = []
+    for setting in settings:
+        evaluations.append(evaluate_setting(setting, labeled_paths, rounds))
+        log(f"  {setting.label}: {evaluations[-1].images_per_second:.1f} citra/detik")
+    mark_pareto(evaluations)
+    return evaluations
+
+
+def format_table(evaluations):
+    lines = [f"{'Pengaturan':<54}{'TP':>4}{'FN':>4}{'FP':>4}{'TN':>4}{'Akurasi':>9}{'citra/s':>9}  Pareto"]
+    for e in sorted(evaluations, key=lambda e: -e.images_per_second):
+        lines.append(f"{e.setting.label:<54}{e.tp:>4}{e.fn:>4}{e.fp:>4}{e.tn:>4}{e.accuracy:>9.2f}"
+                     f"{e.images_per_second:>9.1f}  {'*' if e.pareto else ''}")
+    return "\n".join(lines)
+
+
+def format_confusion(e):
+    return (f"                 Prediksi Sunu  Prediksi bukan\n"
+            f"Sunu             {e.tp:>13}  {e.fn:>14}\n"
+            f"Bukan Sunu       {e.fp:>13}  {e.tn:>14}")
+
+
+def _values(text, type_):
+    return [type_(v) for v in text.split(",") if v]
+
+
+def _bools(text):
+    return [v.strip().lower() in ("1", "ya", "true", "yes") for v in text.split(",") if v]
+
+
+def add_arguments(parser):
+    parser.add_argument("directory", nargs="?", default="dataset", help="Folder dataset berlabel (default: dataset)")
+    parser.add_argument("--decode", default="1,2,4", help="Faktor reduksi decode: 1, 2, 4, 8 (default: %(default)s)")
+    parser.add_argument("--pyramid", default="1,0.5", help="Nilai pyramid_scale (default: %(default)s)")
+    parser.add_argument("--crop", default="ya,tidak", help="crop_to_object: ya/tidak (default: %(default)s)")
+    parser.add_argument("--visual", default="ya,tidak", help="Render citra langkah: ya/tidak (default: %(default)s)")
+    parser.add_argument("--rounds", type=int, default=3, help="Putaran per pengaturan untuk throughput")
+    parser.add_argument("-o", "--output", help="Simpan tabel ke file CSV atau JSON")
+
+
+def main(args):
+    decode = _values(args.decode, int)
+    if any(d not in loader.DECODE_FLAGS for d in decode):
+        print(f"Faktor decode harus salah satu dari {sorted(loader.DECODE_FLAGS)}")
+        return 1
+    # Pengaturan pertama (nilai pertama tiap opsi) menjadi acuan
+    settings = settings_grid(decode, _values(args.pyramid, float), _bools(args.crop), _bools(args.visual))
+    try:
+        evaluations = run_tradeoff(args.directory, settings, args.rounds)
+    except ValueError as e:
+        print(e)
+        return 1
+
+    print(format_table(evaluations))
+    best = recommend(evaluations)
+    print(f"\nAcuan: {evaluations[0].setting.label} ({evaluations[0].images_per_second:.1f} citra/detik)")
+    print(f"Rekomendasi (tercepat tanpa kehilangan deteksi Sunu acuan dan tanpa FP tambahan): {best.setting.label} "
+          f"({best.images_per_second:.1f} citra/detik)")
+    print(format_confusion(best))
+    if args.output:
+        profiling.dump_rows([e.to_row() for e in evaluations], args.output)
+        print(f"Tabel disimpan ke {args.output}")
+    return 0
@@ -0,0 +1,311 @@
+"""
+Mode daemon: memantau folder tempat kamera menaruh foto, mendeteksi setiap
+citra baru di process pool, dan mencatat hasilnya ke database SQLite.
+
+    python detect_sunu.py watch /srv/kamera --db hasil.sqlite -j 4
+
+Folder diperiksa ulang setiap `--interval` detik (polling, tanpa dependensi
+tambahan). File dianggap selesai ditulis bila mtime-nya sudah lebih lama
+dari `--settle` detik. Setiap file di-hash (SHA-256 isi file) sebelum
+diproses; hash yang sudah ada di database dilewati, jadi daemon yang
+di-restart tidak mengulang pekerjaan dan salinan file yang sama hanya
+dideteksi sekali. File yang gagal dibaca (izin, I/O error) dicatat di log
+sekali lalu dicoba lagi pada polling berikutnya tanpa menghentikan daemon.
+
+Backpressure: paling banyak `--max-pending` citra yang sedang diproses. Saat
+batas itu tercapai folder tidak di-hash atau diantrekan lagi sampai ada
+slot kosong; file yang belum terambil tetap di folder dan ikut pada polling
+berikutnya, jadi memori tidak bertambah walau kamera lebih cepat dari
+detektor. Hasil ditulis per batch transaksi (`--batch-size` baris atau
+setiap `--flush-interval` detik).
+"""
+import functools
+import hashlib
+import json
+import os
+import signal
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import batch
+import batch_report
+
+DEFAULT_INTERVAL = 2.0
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_FLUSH_INTERVAL = 1.0
+# Faktor `max_pending` terhadap jumlah worker: cukup untuk menjaga worker tetap sibuk
+PENDING_PER_WORKER = 4
+HASH_CHUNK = 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hasil (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL UNIQUE,
+    path TEXT NOT NULL,
+    file_mtime REAL,
+    detected_at REAL NOT NULL,
+    is_kerapu_sunu INTEGER,
+    spot_percent REAL,
+    total_spot_area INTEGER,
+    fish_area REAL,
+    num_fish INTEGER,
+    fishes TEXT,
+    result_text TEXT,
+    error TEXT,
+    elapsed_ms REAL,
+    report_path TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_hasil_detected_at ON hasil (detected_at);
+CREATE INDEX IF NOT EXISTS idx_hasil_vonis ON hasil (is_kerapu_sunu, detected_at);
+"""
+COLUMNS = ("content_hash", "path", "file_mtime", "detected_at", "is_kerapu_sunu", "spot_percent", "total_spot_area",
+           "fish_area", "num_fish", "fishes", "result_text", "error", "elapsed_ms", "report_path")
+
+
+def file_hash(path):
+    """SHA-256 (hex) isi file `path`."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultDatabase:
+    """
+    Tabel `hasil` di SQLite (mode WAL). `add` menampung baris; baris ditulis
+    dalam satu transaksi setiap `batch_size` baris atau `flush_interval` detik.
+    """
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._rows = []
+        self._last_flush = time.monotonic()
+        self._insert = (f"INSERT OR IGNORE INTO hasil ({', '.join(COLUMNS)}) "
+                        f"VALUES ({', '.join('?' * len(COLUMNS))})")
+
+    def has_hash(self, content_hash):
+        if any(row[0] == content_hash for row in self._rows):
+            return True
+        return self._conn.execute("SELECT 1 FROM hasil WHERE content_hash = ?", (content_hash,)).fetchone() is not None
+
+    def add(self, row):
+        self._rows.append(tuple(row.get(name) for name in COLUMNS))
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush_if_due(self):
+        if self._rows and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self._rows:
+            with self._conn:  # satu transaksi untuk seluruh batch
+                self._conn.executemany(self._insert, self._rows)
+            self._rows = []
+        self._last_flush = time.monotonic()
+
+    def counts(self):
+        """`(total, sunu, gagal)` baris yang sudah ditulis."""
+        return self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(is_kerapu_sunu = 1), 0), COALESCE(SUM(error IS NOT NULL), 0) FROM hasil"
+        ).fetchone()
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _ignore_sigint():
+    """Initializer worker: Ctrl+C ditangani proses utama, worker menyelesaikan citra yang sedang diproses."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def detect_path(path, decode_scale=1, report_dir=None, detect_options=None):
+    """Worker: deteksi satu file -> `(ringkasan, pesan error, ms)`; ringkasan None bila gagal."""
+    start = time.perf_counter()
+    _, summary, error = batch.try_process_file(path, decode_scale=decode_scale, report_dir=report_dir,
+                                               **(detect_options or {}))
+    return summary, error, (time.perf_counter() - start) * 1000
+
+
+def result_row(path, content_hash, file_mtime, summary, error, elapsed_ms):
+    row = dict(content_hash=content_hash, path=path, file_mtime=file_mtime, detected_at=time.time(), error=error,
+               elapsed_ms=elapsed_ms)
+    if summary is not None:
+        row.update(is_kerapu_sunu=int(summary["is_kerapu_sunu"]), spot_percent=summary["spot_percent"],
+                   total_spot_area=summary["total_spot_area"], fish_area=summary["fish_area"],
+                   num_fish=summary["num_fish"], fishes=json.dumps(summary["fishes"]),
+                   result_text=summary["result_text"], report_path=summary.get("detail") or None)
+    return row
+
+
+class FolderWatcher:
+    """Polling `directory`, antrekan citra baru ke process pool, dan catat hasil ke `ResultDatabase`."""
+
+    def __init__(self, directory, database, workers=None, interval=DEFAULT_INTERVAL, settle=None, max_pending=None,
+                 decode_scale=1, report_dir=None, log=print, **detect_options):
+        self.directory = directory
+        self.database = database
+        self.workers = workers or os.cpu_count() or 1
+        self.interval = interval
+        self.settle = interval if settle is None else settle
+        self.max_pending = max_pending or self.workers * PENDING_PER_WORKER
+        self.decode_scale = decode_scale
+        self.report_dir = report_dir
+        self.log = log
+        self.detect_options = detect_options
+        self.processed = 0
+        self.skipped = 0
+        self._stop = threading.Event()
+        self._pending = {}  # future -> (path, hash, mtime)
+        self._handled = {}  # path -> (ukuran, mtime_ns) file yang sudah dicatat atau sedang diproses
+        self._unreadable = {}  # path -> (ukuran, mtime_ns) file yang gagal dibaca (dicoba lagi tiap polling)
+        self._throttled = False
+        if report_dir is not None:
+            batch_report.prepare_dir(report_dir)
+
+    def stop(self):
+        self._stop.set()
+
+    def scan(self):
+        """File citra yang sudah stabil dan belum ditangani, terlama lebih dulu: `[(path, stat)]`."""
+        now = time.time()
+        candidates = []
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError as e:  # folder hilang atau share sementara tidak bisa dibaca: coba lagi nanti
+            if not isinstance(e, FileNotFoundError):
+                self.log(f"Gagal membaca folder {self.directory}: {e}")
+            return []
+        for entry in entries:
+            if not entry.name.lower().endswith(batch.IMAGE_EXTENSIONS):
+                continue
+            try:
+                st = entry.stat()
+                if not entry.is_file() or now - st.st_mtime < self.settle:
+                    continue
+            except OSError:  # dihapus di antara scandir dan stat, atau tidak bisa di-stat: coba lagi nanti
+                continue
+            if self._handled.get(entry.path) == (st.st_size, st.st_mtime_ns):
+                continue
+            candidates.append((entry.path, st))
+        current = {entry.path for entry in entries}
+        for handled in (self._handled, self._unreadable):
+            for path in [p for p in handled if p not in current]:
+                del handled[path]  # file dipindah/dihapus: lupakan agar peta tidak tumbuh
+        candidates.sort(key=lambda item: item[1].st_mtime)
+        return candidates
+
+    def _submit_new(self, pool):
+        """Antrekan file baru selama masih ada slot; kembalikan True bila masih ada file yang tertunda."""
+        for path, st in self.scan():
+            if len(self._pending) >= self.max_pending:
+                if not self._throttled:
+                    self.log(f"Antrian penuh ({self.max_pending} citra); file baru menunggu slot kosong.")
+                    self._throttled = True
+                return True
+            try:
+                content_hash = file_hash(path)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                # Satu file rusak/tanpa izin tidak boleh menghentikan daemon; dicoba lagi pada polling berikutnya
+                version = (st.st_size, st.st_mtime_ns)
+                if self._unreadable.get(path) != version:
+                    self.log(f"{path}\tERROR\tGagal membaca file: {e}")
+                    self._unreadable[path] = version
+                continue
+            self._unreadable.pop(path, None)
+            self._handled[path] = (st.st_size, st.st_mtime_ns)
+            in_flight = any(h == content_hash for _, h, _ in self._pending.values())
+            if in_flight or self.database.has_hash(content_hash):
+                self.skipped += 1
+                continue
+            future = pool.submit(detect_path, path, self.decode_scale, self.report_dir, self.detect_options)
+            self._pending[future] = (path, content_hash, st.st_mtime)
+        self._throttled = False
+        return False
+
+    def _collect(self, futures):
+        for future in futures:
+            path, content_hash, mtime = self._pending.pop(future)
+            summary, error, elapsed_ms = future.result()
+            self.database.add(result_row(path, content_hash, mtime, summary, error, elapsed_ms))
+            self.processed += 1
+            self.log(batch.format_line(path, summary) if summary is not None else f"{path}\tERROR\t{error}")
+
+    def run(self, once=False):
+        """
+        Jalankan sampai `stop()` dipanggil. Dengan `once=True` berhenti setelah
+        semua file yang ada saat ini (yang sudah stabil) selesai diproses.
+        """
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_ignore_sigint) as pool:
+            while not self._stop.is_set():
+                backlog = self._submit_new(pool)
+                if once and not backlog and not self._pending:
+                    break
+                if self._pending:
+                    done, _ = wait(list(self._pending), timeout=self.interval, return_when=FIRST_COMPLETED)
+                    self._collect(done)
+                else:
+                    self._stop.wait(self.interval)
+                self.database.flush_if_due()
+            # Selesaikan citra yang sudah diantrekan agar tidak diproses ulang dari awal setelah restart
+            self._collect(wait(list(self._pending)).done)
+        self.database.flush()
+
+
+def add_arguments(parser):
+    parser.add_argument("directory", help="Folder yang dipantau (tidak rekursif)")
+    parser.add_argument("--db", default="hasil_deteksi.sqlite", help="File database SQLite (default: %(default)s)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Jumlah proses deteksi (default: jumlah CPU)")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                        help="Jeda polling folder dalam detik (default: %(default)s)")
+    parser.add_argument("--settle", type=float, default=None,
+                        help="Umur mtime minimum (detik) agar file dianggap selesai ditulis (default: sama dengan --interval)")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help=f"Citra maksimal yang sedang diproses (default: {PENDING_PER_WORKER} x jumlah worker)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Baris per transaksi database (default: %(default)s)")
+    parser.add_argument("--flush-interval", type=float, default=DEFAULT_FLUSH_INTERVAL,
+                        help="Tulis baris tertunda paling lambat setiap N detik (default: %(default)s)")
+    parser.add_argument("--report-dir", metavar="FOLDER",
+                        help="Tulis thumbnail dan laporan 9 langkah citra Sunu ke FOLDER (path laporan masuk database)")
+    parser.add_argument("--decode-scale", type=float, default=1.0,
+                        help="Decode citra pada skala ini (mis. 0.5) memakai IMREAD_REDUCED_COLOR_*")
+    parser.add_argument("--once", action="store_true", help="Proses isi folder saat ini lalu keluar")
+    batch.add_detect_arguments(parser)
+
+
+def main(args):
+    if not os.path.isdir(args.directory):
+        print(f"Folder tidak ditemukan: {args.directory}")
+        return 1
+    with ResultDatabase(args.db, args.batch_size, args.flush_interval) as database:
+        watcher = FolderWatcher(args.directory, database, args.workers, args.interval, args.settle, args.max_pending,
+                                args.decode_scale, args.report_dir, functools.partial(print, flush=True),
+                                **batch.detect_options(args))
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: watcher.stop())
+        mode = "sekali jalan" if args.once else f"polling setiap {args.interval:g} detik"
+        print(f"Memantau {args.directory} ({mode}, {watcher.workers} worker) -> {args.db}", flush=True)
+        watcher.run(once=args.once)
+        total, n_sunu, n_error = database.counts()
+    print(f"Selesai: {watcher.processed} citra baru diproses, {watcher.skipped} dilewati (sudah tercatat). "
+          f"Database: {total} citra, {n_sunu} Kerapu Sunu, {n_error} gagal.")
+    return 0